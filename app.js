@@ -42,30 +42,63 @@ const accessories = [
     { id: 6, name: "Lens Filter Set", price: 800 }
 ];
 
+// Content-hashed URLs of the data files, set by index.html in a dist/ build
+// (`yume-tools build`); a plain checkout loads the files by name
+const ASSET_URLS = window.YUME_ASSETS || {};
+
+function assetUrl(path) {
+    return ASSET_URLS[path] || path;
+}
+
+// Fetch optimized image variants (srcset manifest); the app works without it
+async function fetchImageVariants() {
+    try {
+        const response = await fetch(assetUrl('images/variants.json'));
+        return response.ok ? await response.json() : {};
+    } catch (error) {
+        return {};
+    }
+}
+
+// Fetch the grid sprite atlases and offsets; cards fall back to <picture> without it
+async function fetchSprites() {
+    try {
+        const response = await fetch(assetUrl('images/sprites.json'));
+        return response.ok ? await response.json() : { atlases: [], sprites: {} };
+    } catch (error) {
+        return { atlases: [], sprites: {} };
+    }
+}
+
 // Fetch camera data from our JSON file
 async function fetchCameraData() {
     try {
-        const response = await fetch('camera-data.json');
+        const [response, variants, sprites] = await Promise.all([
+            fetch(assetUrl('camera-data.json')),
+            fetchImageVariants(),
+            fetchSprites()
+        ]);
         if (!response.ok) {
             throw new Error('Failed to fetch camera data');
         }
         
         const data = await response.json();
         
-        // Process camera data to add more details
-        cameras = data.map((camera, index) => {
-            // Generate price and specs based on camera name to make up for missing metadata
-            const priceBase = 1000 + (index % 7) * 500;
-            const typeKeywords = ['DSLR', 'Mirrorless', 'Medium Format', 'Compact', 'Film', 'Action'];
-            const typeIndex = index % typeKeywords.length;
+        // Ids, categories and prices come from the catalog store, so they
+        // match /api/cameras/:id; products no longer on the site are hidden
+        cameras = data.filter(camera => camera.available !== false).map(camera => {
+            const sprite = sprites.sprites[camera.image];
             
             return {
-                id: index + 1,
+                id: camera.id,
                 name: camera.name,
-                specs: `${typeKeywords[typeIndex]} Camera`,
-                description: `Professional ${typeKeywords[typeIndex]} camera for photography enthusiasts.`,
-                price: priceBase,
-                image: `images/${camera.image}`
+                specs: `${camera.category} Camera`,
+                description: `Professional ${camera.category} camera for photography enthusiasts.`,
+                price: camera.price,
+                image: `images/${camera.image}`,
+                placeholder: camera.placeholder || null,
+                variants: variants[camera.image] || null,
+                sprite: sprite ? { ...sprite, atlas: sprites.atlases[sprite.atlas] } : null
             };
         });
         
@@ -77,6 +110,145 @@ async function fetchCameraData() {
     }
 }
 
+// BlurHash placeholders (https://blurha.sh): decoded once per image into a
+// tiny data: URL that is painted while the real image loads
+const BLURHASH_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~';
+const PLACEHOLDER_WIDTH = 32;
+const placeholderUrls = new Map();
+
+function decode83(text) {
+    let value = 0;
+    for (const char of text) {
+        value = value * 83 + BLURHASH_CHARS.indexOf(char);
+    }
+    return value;
+}
+
+function srgbToLinear(value) {
+    const v = value / 255;
+    return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+}
+
+function linearToSrgb(value) {
+    const v = Math.max(0, Math.min(1, value));
+    return Math.round((v <= 0.0031308 ? v * 12.92 : 1.055 * Math.pow(v, 1 / 2.4) - 0.055) * 255);
+}
+
+function placeholderUrl(placeholder) {
+    const { blurhash } = placeholder;
+    if (placeholderUrls.has(blurhash)) {
+        return placeholderUrls.get(blurhash);
+    }
+    
+    const sizeFlag = decode83(blurhash[0]);
+    const numX = (sizeFlag % 9) + 1;
+    const numY = Math.floor(sizeFlag / 9) + 1;
+    const maxValue = (decode83(blurhash[1]) + 1) / 166;
+    
+    const dc = decode83(blurhash.substring(2, 6));
+    const colors = [[srgbToLinear(dc >> 16), srgbToLinear((dc >> 8) & 255), srgbToLinear(dc & 255)]];
+    for (let i = 1; i < numX * numY; i++) {
+        const ac = decode83(blurhash.substring(4 + i * 2, 6 + i * 2));
+        colors.push([Math.floor(ac / 361), Math.floor(ac / 19) % 19, ac % 19].map(quantised => {
+            const value = (quantised - 9) / 9;
+            return Math.sign(value) * value * value * maxValue;
+        }));
+    }
+    
+    // Decode at the image's aspect ratio; the browser scales it up smoothly
+    const width = PLACEHOLDER_WIDTH;
+    const height = Math.max(1, Math.round(width * placeholder.height / placeholder.width));
+    const canvas = document.createElement('canvas');
+    canvas.width = width;
+    canvas.height = height;
+    const context = canvas.getContext('2d');
+    const imageData = context.createImageData(width, height);
+    
+    for (let y = 0; y < height; y++) {
+        for (let x = 0; x < width; x++) {
+            const pixel = [0, 0, 0];
+            for (let j = 0; j < numY; j++) {
+                for (let i = 0; i < numX; i++) {
+                    const basis = Math.cos(Math.PI * x * i / width) * Math.cos(Math.PI * y * j / height);
+                    const color = colors[i + j * numX];
+                    pixel[0] += color[0] * basis;
+                    pixel[1] += color[1] * basis;
+                    pixel[2] += color[2] * basis;
+                }
+            }
+            const offset = 4 * (x + y * width);
+            imageData.data[offset] = linearToSrgb(pixel[0]);
+            imageData.data[offset + 1] = linearToSrgb(pixel[1]);
+            imageData.data[offset + 2] = linearToSrgb(pixel[2]);
+            imageData.data[offset + 3] = 255;
+        }
+    }
+    
+    context.putImageData(imageData, 0, 0);
+    const url = canvas.toDataURL();
+    placeholderUrls.set(blurhash, url);
+    return url;
+}
+
+// Prefix a srcset manifest entry with the images directory
+function imageSrcset(srcset) {
+    return srcset.split(', ').map(candidate => `images/${candidate}`).join(', ');
+}
+
+// Build the markup for a camera image, using AVIF/WebP/JPEG variants when available.
+// The blurred placeholder is the image's background until the image loads.
+function cameraImageHtml(camera, sizes, style = '') {
+    let className = 'camera-image';
+    let onload = '';
+    if (camera.placeholder) {
+        className += ' has-placeholder';
+        style = `${style} background-image: url(${placeholderUrl(camera.placeholder)});`.trim();
+        onload = ` onload="this.style.backgroundImage = 'none'"`;
+    }
+    const styleAttr = style ? ` style="${style}"` : '';
+    const variants = camera.variants;
+    
+    if (!variants) {
+        return `<img src="${camera.image}" alt="${camera.name}" class="${className}"${styleAttr}${onload} loading="lazy" decoding="async">`;
+    }
+    
+    // AVIF and WebP are left out of the manifest when the build could not encode them
+    const sources = [['avif', 'image/avif'], ['webp', 'image/webp']]
+        .filter(([format]) => variants[format])
+        .map(([format, type]) => `<source type="${type}" srcset="${imageSrcset(variants[format])}" sizes="${sizes}">`)
+        .join('\n            ');
+
+    return `
+        <picture>
+            ${sources}
+            <img src="images/${variants.src}" srcset="${imageSrcset(variants.jpeg)}" sizes="${sizes}"
+                 width="${variants.width}" height="${variants.height}"
+                 alt="${camera.name}" class="${className}"${styleAttr}${onload} loading="lazy" decoding="async">
+        </picture>
+    `;
+}
+
+// Build the markup for a grid thumbnail cut from a sprite atlas (WebP with a JPEG fallback),
+// drawn over the blurred placeholder until the atlas arrives
+function cameraSpriteHtml(camera) {
+    const { atlas, x, y, width, height } = camera.sprite;
+    const placeholder = camera.placeholder
+        ? `; background-image: url(${placeholderUrl(camera.placeholder)})`
+        : '';
+    const style = [
+        `background-image: url(images/${atlas.jpeg})`,
+        `background-image: image-set(url(images/${atlas.webp}) type("image/webp"), url(images/${atlas.jpeg}) type("image/jpeg"))`,
+        `background-size: ${atlas.width}px ${atlas.height}px`,
+        `background-position: -${x}px -${y}px`
+    ].join('; ');
+    
+    return `
+        <div class="camera-image camera-sprite" role="img" aria-label="${camera.name}">
+            <span style="width: ${width}px; height: ${height}px${placeholder}"><span style='${style}'></span></span>
+        </div>
+    `;
+}
+
 // Render the camera list
 function renderCameraList() {
     cameraListEl.innerHTML = '';
@@ -87,7 +259,7 @@ function renderCameraList() {
         cameraCard.dataset.id = camera.id;
         
         cameraCard.innerHTML = `
-            <img src="${camera.image}" alt="${camera.name}" class="camera-image">
+            ${camera.sprite ? cameraSpriteHtml(camera) : cameraImageHtml(camera, '(min-width: 768px) 200px, 150px')}
             <div class="camera-info">
                 <div class="camera-name">${camera.name}</div>
                 <div class="camera-specs">${camera.specs}</div>
@@ -134,7 +306,7 @@ function selectCamera(camera) {
     
     // Display selected camera info
     selectedCameraEl.innerHTML = `
-        <img src="${camera.image}" alt="${camera.name}" class="camera-image" style="max-height: 150px; object-fit: contain;">
+        ${cameraImageHtml(camera, '150px', 'max-height: 150px; object-fit: contain;')}
         <div>
             <h3>${camera.name}</h3>
             <p>${camera.specs}</p>
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from yume_tools.standin import ERROR_KINDS, StandinConfig, start_standin
+from yume_tools.trace import TRACE_ENV
+from yume_tools.urls import STANDIN_ENV
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Scenario name -> script and arguments, run from a scratch directory
+SCENARIOS = {
+    'parse-yume-images': ['parse-yume-images.py'],
+    'scrape-static': ['parse-yume-data.py', '--full'],
+    'scrape-selenium': ['parse-yume-data.py', '--full', '--browser'],
+    'download-camera': ['download-camera-images.py'],
+    'download-direct': ['download-direct-images.py'],
+    'download-unsplash': ['download-unsplash-images.py'],
+    'download-mirrors': ['download-images.sh'],
+}
+
+
+def chrome_available():
+    return any(shutil.which(name) for name in ('google-chrome', 'chromium', 'chromium-browser', 'chrome'))
+
+
+def run_scenario(name, args, config, base_url, verbose=False, trace_dir=None):
+    """Run one script against the stand-in in a fresh scratch directory and measure it."""
+    workdir = tempfile.mkdtemp(prefix=f"yume-bench-{name}-")
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, **{STANDIN_ENV: base_url})
+    if trace_dir:
+        env[TRACE_ENV] = os.path.join(trace_dir, f"{name}.jsonl")
+        if os.path.exists(env[TRACE_ENV]):
+            os.remove(env[TRACE_ENV])
+    config.reset()
+
+    start = time.perf_counter()
+    script = os.path.join(REPO_DIR, args[0])
+    command = ['bash', script] if script.endswith('.sh') else [sys.executable, script]
+    process = subprocess.Popen([*command, *args[1:]],
+                               cwd=workdir, env=env,
+                               stdout=None if verbose else subprocess.DEVNULL,
+                               stderr=None if verbose else subprocess.DEVNULL)
+    # wait4 reports the peak RSS of this child alone (in KB on Linux)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    # os.waitstatus_to_exitcode needs Python 3.9
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'wall_time': elapsed,
+        'requests': config.requests,
+        'bytes': config.bytes_sent,
+        'throughput': config.bytes_sent / elapsed if elapsed else 0.0,
+        'peak_rss_kb': usage.ru_maxrss,
+        'exit_code': process.returncode,
+        'injected': dict(config.injected),
+    }
+
+
+def percent_change(current, previous):
+    return (current - previous) / previous * 100 if previous else 0.0
+
+
+def print_report(results, baseline=None):
+    print(f"\n{'scenario':<20} {'wall (s)':>9} {'reqs':>5} {'errors':>6} {'KB':>9} {'KB/s':>9} {'peak MB':>8}  exit")
+    for name, result in results.items():
+        if result is None:
+            print(f"{name:<20} {'skipped (no Chrome found)':>51}")
+            continue
+        print(f"{name:<20} {result['wall_time']:>9.2f} {result['requests']:>5} "
+              f"{sum(result['injected'].values()):>6} "
+              f"{result['bytes'] / 1024:>9.1f} {result['throughput'] / 1024:>9.1f} "
+              f"{result['peak_rss_kb'] / 1024:>8.1f}  {result['exit_code']}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            print(f"{'  vs baseline':<20} "
+                  f"{percent_change(result['wall_time'], previous['wall_time']):>+8.0f}% {'':>5} {'':>6} "
+                  f"{percent_change(result['bytes'], previous['bytes']):>+8.0f}% {'':>9} "
+                  f"{percent_change(result['peak_rss_kb'], previous['peak_rss_kb']):>+7.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrape and download scripts against a local stand-in for yume.rent and the image CDNs.")
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added before every response (default: 0.05)")
+    parser.add_argument('--bandwidth', type=float, default=None, help="per-connection bandwidth cap in KB/s")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests that get an injected error")
+    parser.add_argument('--errors', default=','.join(ERROR_KINDS), help=f"comma-separated error kinds to inject ({', '.join(ERROR_KINDS)})")
+    parser.add_argument('--slow-host', action='append', default=[], metavar='HOST=SECONDS',
+                        help="latency for one host instead of --latency (repeatable), e.g. upload.wikimedia.org=3")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for error injection")
+    parser.add_argument('--save', metavar='FILE', help="write results as JSON (e.g. to keep as a baseline)")
+    parser.add_argument('--compare', metavar='FILE', help="show changes relative to a saved baseline")
+    parser.add_argument('--trace', metavar='DIR', help="write a timing trace per scenario to DIR/<scenario>.jsonl (see trace-report.py)")
+    parser.add_argument('--verbose', action='store_true', help="show script output")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    host_latency = {}
+    for item in args.slow_host:
+        host, _, seconds = item.partition('=')
+        try:
+            host_latency[host] = float(seconds)
+        except ValueError:
+            parser.error(f"--slow-host expects HOST=SECONDS, got {item!r}")
+
+    config = StandinConfig(root=REPO_DIR, latency=args.latency, host_latency=host_latency,
+                           bandwidth=args.bandwidth * 1024 if args.bandwidth else None,
+                           error_rate=args.error_rate,
+                           errors=[kind for kind in args.errors.split(',') if kind],
+                           seed=args.seed)
+    if args.trace:
+        args.trace = os.path.abspath(args.trace)
+        os.makedirs(args.trace, exist_ok=True)
+    server, base_url = start_standin(config)
+    print(f"Stand-in serving page_source.html and {len(config.images)} images at {base_url}")
+
+    results = {}
+    try:
+        for name in args.scenarios or SCENARIOS:
+            if name == 'scrape-selenium' and not chrome_available():
+                results[name] = None
+                continue
+            print(f"Running {name}...")
+            results[name] = run_scenario(name, SCENARIOS[name], config, base_url, args.verbose, args.trace)
+    finally:
+        server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'config': {'latency': args.latency, 'slow_hosts': host_latency, 'bandwidth': args.bandwidth,
+                           'error_rate': args.error_rate, 'errors': args.errors, 'seed': args.seed},
+                'results': results,
+            }, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
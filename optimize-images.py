@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+# Kept for existing cron jobs and docs; same as `yume-tools optimize`
+import sys
+
+from yume_tools.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(['optimize', *sys.argv[1:]]))
@@ -11,83 +11,126 @@ app.use(cors());
 // Parse JSON request body
 app.use(express.json());
 
-// Serve static files
-app.use(express.static(path.join(__dirname)));
+// `yume-tools build` copies the app to dist/ with content-hashed file names
+// (see yume_tools/fingerprint.py). When it exists it is served instead of the
+// checkout: every file its manifest lists can never change under its name and
+// is cached for a year without revalidation, so reopening the app requests
+// nothing but index.html. Everything else is revalidated on every request.
+const DIST_DIR = path.join(__dirname, 'dist');
+const STATIC_DIR = fs.existsSync(path.join(DIST_DIR, 'index.html')) ? DIST_DIR : __dirname;
+const IMMUTABLE = 'public, max-age=31536000, immutable';
+let fingerprinted = new Set();
 
-// API route to get all cameras
-app.get('/api/cameras', (req, res) => {
+function loadAssetManifest() {
+    try {
+        const manifest = JSON.parse(fs.readFileSync(path.join(DIST_DIR, 'asset-manifest.json'), 'utf8'));
+        fingerprinted = new Set(Object.values(manifest).map(file => path.join(DIST_DIR, file)));
+    } catch (error) {
+        fingerprinted = new Set();
+    }
+}
+
+if (STATIC_DIR === DIST_DIR) {
+    loadAssetManifest();
+    fs.watch(DIST_DIR, (eventType, filename) => {
+        if (filename === 'asset-manifest.json') {
+            loadAssetManifest();
+        }
+    });
+}
+
+// Serve static files (older mime tables don't know AVIF, used by optimized images).
+// Directories are not redirected, so /api/cameras reaches its route below
+// instead of becoming /api/cameras/ for the api/cameras shard directory.
+express.static.mime.define({ 'image/avif': ['avif'] });
+app.use(express.static(STATIC_DIR, {
+    redirect: false,
+    setHeaders: (res, filePath) => {
+        res.set('Cache-Control', fingerprinted.has(filePath) ? IMMUTABLE : 'no-cache');
+    }
+}));
+
+// Precomputed API responses, written by `yume-tools sync` (see yume_tools/api.py).
+// Every body is held in memory with its gzip/brotli copies and ETags, so a
+// request is answered without reading, parsing or enriching the catalog.
+const API_DIR = path.join(__dirname, 'api');
+const ENCODING_SUFFIXES = { br: '.br', gzip: '.gz' };
+let apiResponses = new Map();
+
+function loadApiResponses() {
     try {
-        const cameraData = fs.readFileSync(path.join(__dirname, 'camera-data.json'), 'utf8');
-        const cameras = JSON.parse(cameraData);
+        const index = JSON.parse(fs.readFileSync(path.join(API_DIR, 'index.json'), 'utf8'));
+        const responses = new Map();
         
-        // Add more details to each camera
-        const enhancedCameras = cameras.map((camera, index) => {
-            const priceBase = 1000 + (index % 7) * 500;
-            const typeKeywords = ['DSLR', 'Mirrorless', 'Medium Format', 'Compact', 'Film', 'Action'];
-            const typeIndex = index % typeKeywords.length;
-            
-            return {
-                id: index + 1,
-                name: camera.name,
-                specs: `${typeKeywords[typeIndex]} Camera`,
-                description: `Professional ${typeKeywords[typeIndex]} camera for photography enthusiasts.`,
-                price: priceBase,
-                image: `images/${camera.image}`
-            };
-        });
+        for (const [route, entry] of Object.entries(index)) {
+            const file = path.join(API_DIR, entry.file);
+            const variants = { identity: { etag: entry.etag, body: fs.readFileSync(file) } };
+            for (const [encoding, encoded] of Object.entries(entry.encodings)) {
+                variants[encoding] = { etag: encoded.etag, body: fs.readFileSync(file + ENCODING_SUFFIXES[encoding]) };
+            }
+            responses.set(route, variants);
+        }
         
-        res.json(enhancedCameras);
+        apiResponses = responses;
+        console.log(`Loaded ${responses.size} precomputed API responses`);
     } catch (error) {
-        console.error('Error reading camera data:', error);
-        res.status(500).json({ error: 'Failed to load camera data' });
+        console.error('Error loading precomputed API responses:', error.message);
+    }
+}
+
+loadApiResponses();
+
+// Reload when a sync rewrites the index (it is written after every other file).
+// api/ is not committed, so it is created for a checkout that has not built it yet.
+fs.mkdirSync(API_DIR, { recursive: true });
+let reloadTimer = null;
+fs.watch(API_DIR, (eventType, filename) => {
+    if (filename === 'index.json') {
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(loadApiResponses, 100);
     }
 });
 
+// Send a precomputed response in the best encoding the client accepts.
+// res.send answers 304 when If-None-Match matches the ETag set here.
+function sendApiResponse(req, res, route, notFound) {
+    const variants = apiResponses.get(route);
+    
+    if (!variants) {
+        return apiResponses.size
+            ? res.status(404).json({ error: notFound })
+            : res.status(500).json({ error: 'Failed to load camera data' });
+    }
+    
+    const encoding = req.acceptsEncodings(...Object.keys(variants).filter(name => name !== 'identity'), 'identity') || 'identity';
+    const { etag, body } = variants[encoding];
+    
+    res.set({
+        'Content-Type': 'application/json; charset=utf-8',
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        'ETag': etag
+    });
+    if (encoding !== 'identity') {
+        res.set('Content-Encoding', encoding);
+    }
+    res.send(body);
+}
+
+// API route to get all cameras
+app.get('/api/cameras', (req, res) => {
+    sendApiResponse(req, res, '/api/cameras', 'Camera data not found');
+});
+
 // API route to get colors
 app.get('/api/colors', (req, res) => {
-    try {
-        const colorData = fs.readFileSync(path.join(__dirname, 'yume-colors.json'), 'utf8');
-        const colors = JSON.parse(colorData);
-        res.json(colors);
-    } catch (error) {
-        console.error('Error reading color data:', error);
-        res.status(500).json({ error: 'Failed to load color data' });
-    }
+    sendApiResponse(req, res, '/api/colors', 'Color data not found');
 });
 
 // API route to get a single camera by ID
 app.get('/api/cameras/:id', (req, res) => {
-    try {
-        const cameraId = parseInt(req.params.id);
-        const cameraData = fs.readFileSync(path.join(__dirname, 'camera-data.json'), 'utf8');
-        const cameras = JSON.parse(cameraData);
-        
-        // Find the camera with the specified ID
-        const camera = cameras.find((c, index) => index + 1 === cameraId);
-        
-        if (!camera) {
-            return res.status(404).json({ error: 'Camera not found' });
-        }
-        
-        // Add more details to the camera
-        const typeKeywords = ['DSLR', 'Mirrorless', 'Medium Format', 'Compact', 'Film', 'Action'];
-        const typeIndex = (cameraId - 1) % typeKeywords.length;
-        const priceBase = 1000 + ((cameraId - 1) % 7) * 500;
-        
-        const enhancedCamera = {
-            id: cameraId,
-            name: camera.name,
-            specs: `${typeKeywords[typeIndex]} Camera`,
-            description: `Professional ${typeKeywords[typeIndex]} camera for photography enthusiasts.`,
-            price: priceBase,
-            image: `images/${camera.image}`
-        };
-        
-        res.json(enhancedCamera);
-    } catch (error) {
-        console.error('Error reading camera data:', error);
-        res.status(500).json({ error: 'Failed to load camera data' });
-    }
+    const cameraId = parseInt(req.params.id);
+    sendApiResponse(req, res, `/api/cameras/${cameraId}`, 'Camera not found');
 });
 
 // Handle booking submissions
@@ -111,7 +154,8 @@ app.post('/api/bookings', (req, res) => {
 // Catch-all route to return the main index.html for any unmatched routes
 // This is important for single-page applications
 app.get('*', (req, res) => {
-    res.sendFile(path.join(__dirname, 'index.html'));
+    res.set('Cache-Control', 'no-cache');
+    res.sendFile(path.join(STATIC_DIR, 'index.html'));
 });
 
 // Start the server
@@ -0,0 +1,30 @@
+"""Shared fixtures: a scratch working directory and the local stand-in server."""
+import os
+
+import pytest
+
+from yume_tools.standin import StandinConfig, start_standin
+from yume_tools.urls import STANDIN_ENV
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run the test in an empty directory, as the CLI runs in a checkout."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """Serve page_source.html and images/ from the checkout and route every fetch to it.
+
+    Yields the StandinConfig, whose error knobs and counters tests may change.
+    """
+    config = StandinConfig(root=REPO_ROOT)
+    server, base = start_standin(config)
+    monkeypatch.setenv(STANDIN_ENV, base)
+    yield config
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,73 @@
+import math
+
+from PIL import Image
+
+from yume_tools.blurhash import encode83, placeholders
+
+
+def _reference_blurhash(pixels, width, height, cx=4, cy=3):
+    """The BlurHash reference encoder, one pixel at a time."""
+    def linear(value):
+        value /= 255
+        return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+    def srgb(value):
+        value = min(max(value, 0), 1)
+        return int((value * 12.92 if value <= 0.0031308 else 1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+    factors = []
+    for j in range(cy):
+        for i in range(cx):
+            norm = 1 if i == j == 0 else 2
+            total = [0.0, 0.0, 0.0]
+            for y in range(height):
+                for x in range(width):
+                    basis = norm * math.cos(math.pi * i * x / width) * math.cos(math.pi * j * y / height)
+                    for c in range(3):
+                        total[c] += basis * linear(pixels[x, y][c])
+            factors.append([value / (width * height) for value in total])
+
+    dc, ac = factors[0], factors[1:]
+    quantised_max = int(max(0, min(82, math.floor(max(abs(v) for f in ac for v in f) * 166 - 0.5))))
+    max_value = (quantised_max + 1) / 166
+    result = encode83((cx - 1) + (cy - 1) * 9, 1) + encode83(quantised_max, 1)
+    result += encode83((srgb(dc[0]) << 16) + (srgb(dc[1]) << 8) + srgb(dc[2]), 4)
+    for factor in ac:
+        r, g, b = (int(max(0, min(18, math.floor(math.copysign(abs(v / max_value) ** 0.5, v) * 9 + 9.5))))
+                   for v in factor)
+        result += encode83(r * 19 * 19 + g * 19 + b, 2)
+    return result
+
+
+def test_hash_encodes_the_component_count_and_mean_color(tmp_path):
+    path = str(tmp_path / 'red.png')
+    Image.new('RGB', (64, 48), (255, 0, 0)).save(path)
+
+    placeholder = placeholders([path])[path]
+
+    # 4x3 components: one size character, the max AC, four DC and two per AC component
+    assert len(placeholder['blurhash']) == 1 + 1 + 4 + 2 * 11
+    assert placeholder['blurhash'][0] == encode83(3 + 2 * 9, 1)
+    assert placeholder['blurhash'][2:6] == encode83(0xFF0000, 4)
+    assert (placeholder['width'], placeholder['height']) == (64, 48)
+
+
+def test_matches_the_reference_encoder(tmp_path):
+    img = Image.new('RGB', (32, 32))
+    img.putdata([(x * 8, y * 8, (x * y) % 256) for y in range(32) for x in range(32)])
+    path = str(tmp_path / 'gradient.png')
+    img.save(path)
+
+    assert placeholders([path])[path]['blurhash'] == _reference_blurhash(img.load(), 32, 32)
+
+
+def test_transparency_is_flattened_onto_white_and_unreadable_files_skipped(tmp_path):
+    clear = str(tmp_path / 'clear.png')
+    Image.new('RGBA', (10, 10), (0, 0, 0, 0)).save(clear)
+    broken = tmp_path / 'broken.jpg'
+    broken.write_bytes(b'not an image')
+
+    encoded = placeholders([clear, str(broken)])
+
+    assert list(encoded) == [clear]
+    assert encoded[clear]['blurhash'][2:6] == encode83(0xFFFFFF, 4)
@@ -0,0 +1,58 @@
+import pytest
+
+from yume_tools import http_cache
+from yume_tools.catalog import scrape_static, update_catalog
+from yume_tools.catalog_db import CatalogDB
+from yume_tools.sync import load_state
+
+
+@pytest.fixture
+def synced(standin, workdir):
+    """A catalog synced once from the stand-in page; returns (payload, cameras)."""
+    cache = http_cache.HttpCache()
+    payload = scrape_static(cache)
+    cameras = update_catalog(payload, cache, encode_placeholders=False)
+    assert cameras
+    return payload, cameras
+
+
+def _available(db):
+    return [camera['name'] for camera in db.rows() if camera['available']]
+
+
+def test_failed_refetch_keeps_every_product(standin, synced):
+    payload, cameras = synced
+    state = load_state()
+    standin.error_rate, standin.errors = 1.0, ('404',)
+
+    with pytest.raises(RuntimeError, match='could be downloaded'):
+        update_catalog(payload, http_cache.HttpCache(), full=True, encode_placeholders=False)
+
+    with CatalogDB() as db:
+        assert _available(db) == [camera['name'] for camera in cameras]
+    assert load_state() == state
+
+
+def test_failed_revalidation_keeps_stored_images(standin, synced):
+    payload, cameras = synced
+    standin.error_rate, standin.errors = 1.0, ('404',)
+
+    assert update_catalog(payload, http_cache.HttpCache(), encode_placeholders=False) == cameras
+
+    with CatalogDB() as db:
+        assert _available(db) == [camera['name'] for camera in cameras]
+
+
+def test_only_products_gone_from_the_page_are_withdrawn(standin, synced):
+    payload, cameras = synced
+    # Untitled products are named after their position, so the last one is dropped
+    last = max(i for i, product in enumerate(payload['products']) if product['image'])
+    del payload['products'][last]
+    gone = cameras[-1]['name']
+    standin.error_rate, standin.errors = 1.0, ('404',)
+
+    update_catalog(payload, http_cache.HttpCache(), encode_placeholders=False)
+
+    with CatalogDB() as db:
+        assert [camera['name'] for camera in db.find(available=False)] == [gone]
+        assert len(_available(db)) == len(cameras) - 1
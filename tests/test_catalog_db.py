@@ -0,0 +1,57 @@
+import pytest
+
+from yume_tools.catalog_db import CatalogDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    with CatalogDB(str(tmp_path / 'catalog.db'), seed_file=None) as db:
+        yield db
+
+
+def _cameras(*names):
+    return [{'name': name, 'image': f"{name}.jpg"} for name in names]
+
+
+def _available(db):
+    return {camera['name']: camera['available'] for camera in db.rows()}
+
+
+def test_products_missing_from_a_sync_stay_available(db):
+    db.sync(_cameras('a', 'b', 'c'))
+
+    # b's image could not be fetched this time; it is not gone from the site
+    db.sync(_cameras('a', 'c'))
+
+    assert _available(db) == {'a': True, 'b': True, 'c': True}
+
+
+def test_withdrawn_products_are_kept_but_unavailable(db):
+    db.sync(_cameras('a', 'b', 'c'))
+    ids = {camera['name']: camera['id'] for camera in db.rows()}
+
+    assert db.sync(_cameras('a', 'c'), withdrawn=['b']) == 2  # b withdrawn, c moved up
+    assert _available(db) == {'a': True, 'c': True, 'b': False}
+    assert [camera['name'] for camera in db.cameras()] == ['a', 'c']
+
+    db.sync(_cameras('a', 'b', 'c'))
+    assert _available(db) == {'a': True, 'b': True, 'c': True}
+    assert {camera['name']: camera['id'] for camera in db.rows()} == ids
+
+
+def test_listed_products_are_never_withdrawn(db):
+    db.sync(_cameras('a', 'b'))
+
+    db.sync(_cameras('a', 'b'), withdrawn=['b'])
+
+    assert _available(db) == {'a': True, 'b': True}
+
+
+def test_unchanged_sync_writes_nothing_and_ids_are_not_reused(db):
+    db.sync(_cameras('a', 'b'))
+    assert db.sync(_cameras('a', 'b')) == 0
+
+    db.conn.execute("DELETE FROM cameras WHERE name = 'b'")
+    db.sync(_cameras('a', 'c'))
+
+    assert [camera['id'] for camera in db.find(name='c')] == [3]
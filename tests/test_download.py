@@ -0,0 +1,91 @@
+import json
+import os
+import urllib.request
+
+from yume_tools import urls
+from yume_tools.download import download_batch
+from yume_tools.stream import partial_path
+
+URL = 'https://cdn.example.com/photos/camera.jpg'
+
+
+def _fetch(url):
+    """The body and ETag the stand-in serves for url."""
+    with urllib.request.urlopen(urls.resolve(url)) as response:
+        return response.read(), response.headers['ETag']
+
+
+def _leave_partial(dest, data, source):
+    """Leave dest's .part file and its source record, as an interrupted download does."""
+    with open(partial_path(dest), 'wb') as f:
+        f.write(data)
+    with open(f"{partial_path(dest)}.json", 'w') as f:
+        json.dump(source, f)
+
+
+def test_download_verifies_and_renames(standin, tmp_path):
+    body, _ = _fetch(URL)
+    [result] = download_batch({URL: 'camera.jpg'}, dest_dir=str(tmp_path))
+
+    assert result.ok and result.size == len(body) and not result.resumed
+    assert (tmp_path / 'camera.jpg').read_bytes() == body
+    assert not os.path.exists(partial_path(str(tmp_path / 'camera.jpg')))
+
+
+def test_interrupted_download_resumes_with_range(standin, tmp_path):
+    body, etag = _fetch(URL)
+    half = len(body) // 2
+    _leave_partial(str(tmp_path / 'camera.jpg'), body[:half], {'url': URL, 'validator': etag})
+    standin.reset()
+
+    [result] = download_batch({URL: 'camera.jpg'}, dest_dir=str(tmp_path))
+
+    assert result.ok and result.resumed == half
+    assert standin.bytes_sent == len(body) - half
+    assert (tmp_path / 'camera.jpg').read_bytes() == body
+
+
+def test_unsatisfiable_range_restarts_from_scratch(standin, tmp_path):
+    body, etag = _fetch(URL)
+    # A partial file as long as the body makes the Range start past the end
+    _leave_partial(str(tmp_path / 'camera.jpg'), body, {'url': URL, 'validator': etag})
+    standin.reset()
+
+    [result] = download_batch({URL: 'camera.jpg'}, dest_dir=str(tmp_path))
+
+    assert result.ok and not result.resumed
+    assert standin.requests == 2
+    assert (tmp_path / 'camera.jpg').read_bytes() == body
+
+
+def test_stale_if_range_validator_gets_the_whole_file(standin, tmp_path):
+    body, _ = _fetch(URL)
+    _leave_partial(str(tmp_path / 'camera.jpg'), b'x' * 100, {'url': URL, 'validator': '"stale"'})
+    standin.reset()
+
+    [result] = download_batch({URL: 'camera.jpg'}, dest_dir=str(tmp_path))
+
+    assert result.ok and not result.resumed
+    assert standin.bytes_sent == len(body)
+    assert (tmp_path / 'camera.jpg').read_bytes() == body
+
+
+def test_partial_from_another_url_is_not_resumed(standin, tmp_path):
+    body, etag = _fetch(URL)
+    _leave_partial(str(tmp_path / 'camera.jpg'), body[:100],
+                   {'url': 'https://other.example.com/a.jpg', 'validator': etag})
+
+    [result] = download_batch({URL: 'camera.jpg'}, dest_dir=str(tmp_path))
+
+    assert result.ok and not result.resumed
+    assert (tmp_path / 'camera.jpg').read_bytes() == body
+
+
+def test_failed_download_leaves_destination_alone(standin, tmp_path):
+    (tmp_path / 'camera.jpg').write_bytes(b'old')
+    standin.error_rate, standin.errors = 1.0, ('404',)
+
+    [result] = download_batch({URL: 'camera.jpg'}, dest_dir=str(tmp_path))
+
+    assert not result.ok and result.status == 404
+    assert (tmp_path / 'camera.jpg').read_bytes() == b'old'
@@ -0,0 +1,75 @@
+from yume_tools.pipeline import BLOCKED, FAILED, RAN, UP_TO_DATE, PipelineRunner, Stage
+
+
+def _copy_stage(name, source, target, deps=(), runs=None, **kwargs):
+    """A stage that copies source to target, counting its runs in runs[name]."""
+    def run():
+        runs[name] = runs.get(name, 0) + 1
+        with open(source) as f, open(target, 'w') as out:
+            out.write(f.read())
+    return Stage(name, run, deps, inputs=lambda: [source], outputs=lambda: [target],
+                 description=f"copy {source}", **kwargs)
+
+
+def _stages(runs, **kwargs):
+    stages = [_copy_stage('first', 'in.txt', 'mid.txt', runs=runs, **kwargs),
+              _copy_stage('second', 'mid.txt', 'out.txt', ('first',), runs=runs)]
+    return {stage.name: stage for stage in stages}
+
+
+def _run(stages, **kwargs):
+    return PipelineRunner(stages, state_path='state.json', **kwargs).run(['second'])
+
+
+def test_unchanged_stages_are_skipped(workdir):
+    (workdir / 'in.txt').write_text('one')
+    runs = {}
+    stages = _stages(runs)
+
+    assert _run(stages) == {'first': RAN, 'second': RAN}
+    assert _run(stages) == {'first': UP_TO_DATE, 'second': UP_TO_DATE}
+    assert runs == {'first': 1, 'second': 1}
+    assert (workdir / 'out.txt').read_text() == 'one'
+
+
+def test_changed_input_reruns_the_stages_it_reaches(workdir):
+    (workdir / 'in.txt').write_text('one')
+    stages = _stages({})
+    _run(stages)
+
+    (workdir / 'in.txt').write_text('three')
+
+    assert _run(stages) == {'first': RAN, 'second': RAN}
+    assert (workdir / 'out.txt').read_text() == 'three'
+
+
+def test_changed_or_missing_output_reruns_its_stage(workdir):
+    (workdir / 'in.txt').write_text('one')
+    stages = _stages({})
+    _run(stages)
+
+    (workdir / 'out.txt').unlink()
+    assert _run(stages) == {'first': UP_TO_DATE, 'second': RAN}
+
+    (workdir / 'mid.txt').write_text('edited')
+    assert _run(stages) == {'first': RAN, 'second': UP_TO_DATE}
+    assert (workdir / 'mid.txt').read_text() == 'one'
+
+
+def test_always_and_forced_stages_run(workdir):
+    (workdir / 'in.txt').write_text('one')
+    runs = {}
+    _run(_stages(runs))
+
+    assert _run(_stages(runs, always=True)) == {'first': RAN, 'second': UP_TO_DATE}
+    assert _run(_stages(runs), force={'second'}) == {'first': UP_TO_DATE, 'second': RAN}
+    assert runs == {'first': 2, 'second': 2}
+
+
+def test_failed_stage_blocks_its_dependents_and_is_retried(workdir):
+    stages = _stages({})
+
+    assert _run(stages) == {'first': FAILED, 'second': BLOCKED}
+
+    (workdir / 'in.txt').write_text('one')
+    assert _run(stages) == {'first': RAN, 'second': RAN}
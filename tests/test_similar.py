@@ -0,0 +1,37 @@
+from yume_tools.similar import ImageHash, near_duplicate_groups
+
+BASE = 0x0123456789ABCDEF
+
+
+def _hash(path, flipped_bits=0, width=100, height=100, size=1000, dhash_bits=None):
+    """An ImageHash whose hashes differ from BASE in the lowest bits."""
+    phash = BASE ^ ((1 << flipped_bits) - 1)
+    dhash = BASE ^ ((1 << (flipped_bits if dhash_bits is None else dhash_bits)) - 1)
+    return ImageHash(path, width, height, size, dhash, phash)
+
+
+def test_groups_are_ordered_best_copy_first():
+    hashes = [_hash('small.jpg', 0, 100, 100), _hash('large.jpg', 3, 200, 150),
+              _hash('heavier.jpg', 2, 100, 100, size=5000), _hash('other.jpg', 40)]
+
+    groups = near_duplicate_groups(hashes)
+
+    assert [[h.path for h in group] for group in groups] == [['large.jpg', 'heavier.jpg', 'small.jpg']]
+
+
+def test_chains_of_close_images_form_one_group():
+    # a-b and b-c are within 10 bits, a-c is 16 bits apart
+    a = _hash('a.jpg', 0)
+    b = ImageHash('b.jpg', 100, 100, 1000, BASE ^ 0xFF, BASE ^ 0xFF)
+    c = ImageHash('c.jpg', 100, 100, 1000, BASE ^ 0xFFFF, BASE ^ 0xFFFF)
+
+    assert [[h.path for h in group] for group in near_duplicate_groups([a, b, c])] == [['a.jpg', 'b.jpg', 'c.jpg']]
+    assert near_duplicate_groups([a, c]) == []
+
+
+def test_both_hashes_must_be_within_their_own_threshold():
+    hashes = [_hash('a.jpg', 0), _hash('b.jpg', 4, dhash_bits=12)]
+
+    assert near_duplicate_groups(hashes) == []
+    assert len(near_duplicate_groups(hashes, phash_threshold=4, dhash_threshold=12)) == 1
+    assert near_duplicate_groups(hashes, phash_threshold=3, dhash_threshold=12) == []
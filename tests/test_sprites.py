@@ -0,0 +1,37 @@
+import random
+
+from yume_tools.sprites import layouts, shelf_pack
+
+
+def _overlaps(a, b):
+    (ax, ay, aw, ah), (bx, by, bw, bh) = a, b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def test_shelf_pack_places_tallest_first_and_wraps():
+    positions, height = shelf_pack([(10, 5), (10, 10), (10, 7)], 20)
+
+    assert positions == [(0, 10), (0, 0), (10, 0)]
+    assert height == 15
+
+
+def test_shelf_pack_gives_an_oversized_rectangle_its_own_shelf():
+    positions, height = shelf_pack([(30, 4), (5, 3)], 20)
+
+    assert positions == [(0, 0), (0, 4)]
+    assert height == 7
+
+
+def test_layouts_cover_every_sprite_in_order_without_overlap():
+    rng = random.Random(1)
+    sizes = [(rng.randint(20, 140), rng.randint(20, 140)) for _ in range(120)]
+
+    atlases = list(layouts(sizes, max_side=512))
+
+    assert len(atlases) > 1
+    assert [i for indexes, _, _, _ in atlases for i in indexes] == list(range(len(sizes)))
+    for indexes, width, positions, height in atlases:
+        assert width <= 512 and height <= 512
+        rects = [(x, y, *sizes[i]) for i, (x, y) in zip(indexes, positions)]
+        assert all(x + w <= width and y + h <= height for x, y, w, h in rects)
+        assert not any(_overlaps(a, b) for n, a in enumerate(rects) for b in rects[n + 1:])
@@ -0,0 +1,71 @@
+from yume_tools.store import ImageStore
+from yume_tools.sync import diff_catalog
+
+
+def _store(tmp_path, *blobs):
+    store = ImageStore(str(tmp_path))
+    for blob in blobs:
+        (tmp_path / blob).write_bytes(blob.encode('utf-8'))
+    return store
+
+
+def _entry(src, image, sha256='0' * 64):
+    return {'src': src, 'image': image, 'sha256': sha256}
+
+
+def test_diff_sorts_names_by_what_changed(tmp_path):
+    store = _store(tmp_path, 'a.jpg', 'b.jpg')
+    state = {
+        'same': _entry('https://cdn/same.jpg', 'a.jpg'),
+        'moved': _entry('https://cdn/old.jpg', 'a.jpg'),
+        'lost blob': _entry('https://cdn/lost.jpg', 'missing.jpg'),
+        'gone': _entry('https://cdn/gone.jpg', 'b.jpg'),
+    }
+    candidates = [('same', 'https://cdn/same.jpg'), ('moved', 'https://cdn/new.jpg'),
+                  ('lost blob', 'https://cdn/lost.jpg'), ('new', 'https://cdn/new.jpg'),
+                  ('same', 'https://cdn/other.jpg')]
+
+    diff = diff_catalog(state, candidates, store)
+
+    assert diff.added == ['new']
+    assert diff.changed == ['moved', 'lost blob']
+    assert diff.unchanged == ['same']
+    assert diff.removed == ['gone']
+    assert diff.to_fetch == {'new', 'moved', 'lost blob'}
+
+
+def test_revalidation_refetches_only_changed_content(tmp_path):
+    store = _store(tmp_path, 'a.jpg')
+    state = {
+        'kept': _entry('https://cdn/kept.jpg', 'a.jpg', 'k' * 64),
+        'edited': _entry('https://cdn/edited.jpg', 'a.jpg', 'e' * 64),
+        'unreachable': _entry('https://cdn/down.jpg', 'a.jpg'),
+        'shared': _entry('https://cdn/kept.jpg', 'a.jpg', 'k' * 64),
+    }
+    digests = {'https://cdn/kept.jpg': 'k' * 64, 'https://cdn/edited.jpg': 'f' * 64,
+               'https://cdn/down.jpg': None}
+    asked = []
+
+    def revalidate(src):
+        asked.append(src)
+        return digests[src]
+
+    diff = diff_catalog(state, [(name, entry['src']) for name, entry in state.items()], store, revalidate)
+
+    assert diff.changed == ['edited']
+    # A URL that could not be checked keeps its stored image
+    assert diff.unchanged == ['kept', 'unreachable', 'shared']
+    assert sorted(asked) == sorted(set(digests))
+
+
+def test_refetch_still_finds_removed_products(tmp_path):
+    store = _store(tmp_path, 'a.jpg')
+    state = {'kept': _entry('https://cdn/a.jpg', 'a.jpg'), 'gone': _entry('https://cdn/b.jpg', 'a.jpg')}
+
+    diff = diff_catalog(state, [('kept', 'https://cdn/a.jpg'), ('new', 'https://cdn/c.jpg')], store,
+                        refetch=True)
+
+    assert diff.added == ['new']
+    assert diff.changed == ['kept']
+    assert diff.removed == ['gone']
+    assert not diff.unchanged
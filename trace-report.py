@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from collections import defaultdict
+
+from yume_tools.trace import TRACE_ENV, load
+
+
+def step_name(event):
+    """Group key for an event: its kind plus the detail that matters for that kind."""
+    kind = event['event']
+    if kind == 'http':
+        if event.get('probe'):
+            return 'http (probe)'
+        return 'http (304)' if event.get('cached') else 'http'
+    if kind == 'webdriver':
+        return f"webdriver {event.get('call', '?')}"
+    if kind == 'encode':
+        return f"encode {event.get('format', '?')}"
+    return kind
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def seconds(value):
+    return f"{value * 1000:>8.1f}" if value is not None else f"{'-':>8}"
+
+
+def print_steps(events):
+    groups = defaultdict(list)
+    for event in events:
+        groups[step_name(event)].append(event)
+
+    print(f"\n{'step':<26} {'count':>6} {'total ms':>10} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8} {'KB':>9} {'errors':>6}")
+    for name, group in sorted(groups.items(), key=lambda item: -sum(e['duration'] for e in item[1])):
+        durations = [e['duration'] for e in group]
+        size = sum(e.get('bytes') or 0 for e in group)
+        errors = sum(1 for e in group if e.get('error') or (e.get('status') or 0) >= 400)
+        print(f"{name:<26} {len(group):>6} {sum(durations) * 1000:>10.1f} {seconds(mean(durations))} "
+              f"{seconds(percentile(durations, 0.95))} {seconds(max(durations))} "
+              f"{size / 1024:>9.1f} {errors:>6}")
+
+
+def print_hosts(events):
+    hosts = defaultdict(list)
+    for event in events:
+        if event['event'] == 'http':
+            hosts[event['host']].append(event)
+    if not hosts:
+        return
+
+    print(f"\n{'host':<36} {'reqs':>5} {'total ms':>10} {'connect':>8} {'ttfb':>8} {'transfer':>8} {'KB':>9} {'errors':>6}")
+    print(f"{'':<36} {'':>5} {'':>10} {'(mean ms, new connections only for connect)':>44}")
+    for host, group in sorted(hosts.items(), key=lambda item: -sum(e['duration'] for e in item[1])):
+        connects = [e['connect'] for e in group if e.get('connect') is not None]
+        ttfbs = [e['ttfb'] for e in group if e.get('ttfb') is not None]
+        transfers = [e['transfer'] for e in group if e.get('transfer') is not None]
+        size = sum(e.get('bytes') or 0 for e in group)
+        errors = sum(1 for e in group if e.get('error') or (e.get('status') or 0) >= 400)
+        print(f"{host[:36]:<36} {len(group):>5} {sum(e['duration'] for e in group) * 1000:>10.1f} "
+              f"{seconds(mean(connects))} {seconds(mean(ttfbs))} {seconds(mean(transfers))} "
+              f"{size / 1024:>9.1f} {errors:>6}")
+
+
+def print_slowest(events, top):
+    print(f"\nSlowest {top} events:")
+    for event in sorted(events, key=lambda e: -e['duration'])[:top]:
+        target = event.get('url') or event.get('path') or ''
+        outcome = event.get('error') or event.get('status') or ''
+        print(f"  {event['duration'] * 1000:>9.1f} ms  {step_name(event):<24} {target} {outcome}".rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Summarize a timing trace written by the pipeline scripts with {TRACE_ENV}=FILE.")
+    parser.add_argument('trace', help="JSONL trace file")
+    parser.add_argument('--top', type=int, default=10, help="number of slowest events to list (default: 10)")
+    args = parser.parse_args()
+
+    events = load(args.trace)
+    if not events:
+        print(f"No events in {args.trace}")
+        sys.exit(1)
+
+    span = max(e['ts'] for e in events) - min(e['ts'] - e.get('duration', 0) for e in events)
+    processes = len({e['pid'] for e in events})
+    print(f"{len(events)} events from {processes} process(es) over {span:.2f}s")
+    print_steps(events)
+    print_hosts(events)
+    print_slowest(events, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared helpers for the yume.rent scraping and image download scripts."""
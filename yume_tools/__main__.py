@@ -0,0 +1,5 @@
+import sys
+
+from yume_tools.cli import main
+
+sys.exit(main())
@@ -0,0 +1,210 @@
+"""Precomputed API responses for ``server.js``.
+
+The last step of a sync renders every JSON body the API serves. That is the
+enriched camera list, one shard per camera id and the colors. Each body is
+serialized exactly as ``res.json`` would serialize it and stored next to
+gzip and brotli copies. A strong ETag is derived from the body's hash.
+``api/index.json`` maps every route to its files and ETag. The server keeps
+those bytes in memory and answers requests, including conditional ones
+with 304, without reading, parsing or enriching the catalog per request.
+
+The list and the shards come out of one pass over the catalog store, which
+also exports ``camera-data.json`` for the app. Both lists are written as
+they are produced, so neither is held in memory. A response whose ETag is
+unchanged since the last build is not compressed again.
+"""
+import gzip
+import hashlib
+import json
+import os
+import zlib
+
+import brotli
+
+from yume_tools import trace
+from yume_tools.catalog_db import DB_FILE, CatalogDB, catalog_entry
+from yume_tools.stream import HashingWriter, JsonArrayWriter, iter_file, write_atomic
+
+API_DIR = 'api'
+INDEX_FILENAME = 'index.json'
+
+CATALOG_FILE = 'camera-data.json'
+COLORS_FILE = 'yume-colors.json'
+
+# Content-Encoding name -> file suffix, in order of preference
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+# Highest levels: the files are compressed once per sync and sent many
+# times. gzip's mtime is fixed so unchanged bodies give identical files.
+COMPRESSORS = {
+    'br': lambda body: brotli.compress(body, mode=brotli.MODE_TEXT, quality=11),
+    'gzip': lambda body: gzip.compress(body, compresslevel=9, mtime=0),
+}
+
+
+# The same, for bodies compressed in pieces: each takes the file to write
+# to and returns (compress, finish). wbits 31 gives the gzip container.
+def _brotli_stream(out):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=11)
+    return (lambda data: out.write(compressor.process(data))), (lambda: out.write(compressor.finish()))
+
+
+def _gzip_stream(out):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    return (lambda data: out.write(compressor.compress(data))), (lambda: out.write(compressor.flush()))
+
+
+STREAM_COMPRESSORS = {'br': _brotli_stream, 'gzip': _gzip_stream}
+
+
+def camera_response(camera):
+    """Return the API representation of a catalog store row."""
+    response = {
+        'id': camera['id'],
+        'name': camera['name'],
+        'specs': f"{camera['category']} Camera",
+        'description': f"Professional {camera['category']} camera for photography enthusiasts.",
+        'price': camera['price'],
+        'image': f"images/{camera['image']}",
+        'available': camera['available'],
+    }
+    if 'placeholder' in camera:
+        response['placeholder'] = camera['placeholder']
+    return response
+
+
+def encode_body(data):
+    """Serialize like JSON.stringify so the bytes match what Express would send."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _route_filename(route):
+    return route.strip('/').split('/', 1)[1] + '.json'
+
+
+def _is_current(entry, output_dir):
+    """Whether the files of a previous index entry are all still in place."""
+    path = os.path.join(output_dir, entry['file'])
+    files = [(path, entry['size'])] + [(path + ENCODINGS[encoding], encoded['size'])
+                                       for encoding, encoded in entry['encodings'].items()]
+    return all(os.path.exists(file) and os.path.getsize(file) == size for file, size in files)
+
+
+def write_response(route, data, output_dir=API_DIR, previous=None):
+    """Write the identity, gzip and brotli bodies for route and return its index entry.
+
+    previous is the route's entry from the last build; if the body still
+    has its ETag and the files are in place, they are kept as they are.
+    """
+    body = encode_body(data)
+    filename = _route_filename(route)
+    path = os.path.join(output_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    entry = {'file': filename, 'etag': f'"{digest}"', 'size': len(body), 'encodings': {}}
+    if previous and previous.get('etag') == entry['etag'] and _is_current(previous, output_dir):
+        return previous
+    write_atomic(path, body, skip_unchanged=True)
+    for encoding, suffix in ENCODINGS.items():
+        with trace.span('encode', format=encoding, path=path) as event:
+            compressed = COMPRESSORS[encoding](body)
+            event['bytes'] = len(compressed)
+        # A compressed copy that is not smaller is never worth sending
+        if len(compressed) < len(body):
+            write_atomic(path + suffix, compressed, skip_unchanged=True)
+            # Strong ETags must differ between encodings of the same body
+            entry['encodings'][encoding] = {'etag': f'"{digest}-{encoding}"', 'size': len(compressed)}
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return entry
+
+
+class ResponseWriter:
+    """Streams a response body to disk as it is produced, then compresses it from the file.
+
+    For bodies too large to build in memory, such as the camera list. Use
+    as a context manager and call close() for the route's index entry.
+    """
+
+    def __init__(self, route, output_dir=API_DIR):
+        self.output_dir = output_dir
+        self.filename = _route_filename(route)
+        self.path = os.path.join(output_dir, self.filename)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.identity = HashingWriter(self.path, max_bytes=None)
+
+    def write(self, data):
+        self.identity.write(data)
+
+    def close(self, previous=None):
+        """Commit the body and its compressed copies; see write_response for previous."""
+        digest = self.identity.sha256[:32]
+        entry = {'file': self.filename, 'etag': f'"{digest}"', 'size': self.identity.size, 'encodings': {}}
+        self.identity.commit_if_changed()
+        if previous and previous.get('etag') == entry['etag'] and _is_current(previous, self.output_dir):
+            return previous
+        for encoding, suffix in ENCODINGS.items():
+            with trace.span('encode', format=encoding, path=self.path) as event, \
+                    HashingWriter(self.path + suffix, max_bytes=None) as writer:
+                compress, finish = STREAM_COMPRESSORS[encoding](writer)
+                for chunk in iter_file(self.path):
+                    compress(chunk)
+                finish()
+                event['bytes'] = writer.size
+                if writer.size < entry['size']:
+                    writer.commit_if_changed()
+                    entry['encodings'][encoding] = {'etag': f'"{digest}-{encoding}"', 'size': writer.size}
+            if encoding not in entry['encodings'] and os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        return entry
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.identity.abort()
+        return False
+
+
+def build_api(catalog_file=CATALOG_FILE, colors_file=COLORS_FILE, output_dir=API_DIR, db_path=DB_FILE):
+    """Export catalog_file and render every API response from the catalog store; return the route index.
+
+    The index is written last, so a server reloading on its change always
+    sees complete files.
+    """
+    index_path = os.path.join(output_dir, INDEX_FILENAME)
+    previous = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            previous = json.load(f)
+
+    routes = {}
+    with CatalogDB(db_path) as db, HashingWriter(catalog_file, max_bytes=None) as catalog_out, \
+            ResponseWriter('/api/cameras', output_dir) as listing:
+        catalog = JsonArrayWriter(catalog_out, indent=2)
+        cameras = JsonArrayWriter(listing, ensure_ascii=False, separators=(',', ':'))
+        for row in db.rows():
+            catalog.append(catalog_entry(row))
+            camera = camera_response(row)
+            cameras.append(camera)
+            route = f"/api/cameras/{camera['id']}"
+            routes[route] = write_response(route, camera, output_dir, previous.get(route))
+        catalog.close()
+        cameras.close()
+        catalog_out.commit_if_changed()
+        routes['/api/cameras'] = listing.close(previous.get('/api/cameras'))
+    if os.path.exists(colors_file):
+        with open(colors_file) as f:
+            routes['/api/colors'] = write_response('/api/colors', json.load(f), output_dir,
+                                                   previous.get('/api/colors'))
+
+    # Shards of cameras that are no longer in the catalog
+    shard_dir = os.path.join(output_dir, 'cameras')
+    current = {os.path.basename(entry['file']) for entry in routes.values()}
+    for filename in os.listdir(shard_dir) if os.path.isdir(shard_dir) else []:
+        if filename.split('.json')[0] + '.json' not in current:
+            os.remove(os.path.join(shard_dir, filename))
+
+    write_atomic(index_path, json.dumps(routes, indent=2, sort_keys=True).encode('utf-8'), skip_unchanged=True)
+    return routes
@@ -0,0 +1,121 @@
+"""BlurHash placeholders for catalog images.
+
+A BlurHash is a ~30 character string for a few low-frequency cosine
+components of an image. It is stored in camera-data.json, and app.js
+decodes it into a blurred preview that is painted as soon as the catalog
+arrives, while the real image or sprite atlas is still loading.
+
+Images are decoded on a thread pool into 32x32 thumbnails. The thumbnails
+are stretched, since components are computed over normalized coordinates
+and so do not depend on the aspect ratio. All components of all images are
+then computed in one NumPy contraction.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from yume_tools import trace
+
+# Thumbnail side used for encoding; a BlurHash carries no detail finer than this
+THUMB_SIZE = 32
+
+# Horizontal and vertical components (at most 9 each); 4x3 suits the mostly
+# landscape product photos
+COMPONENTS = (4, 3)
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def encode83(value, length):
+    return ''.join(BASE83[(value // 83 ** (length - 1 - i)) % 83] for i in range(length))
+
+
+def _srgb_to_linear(values):
+    values = values / 255.0
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(values):
+    values = np.clip(values, 0, 1)
+    srgb = np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+    return (srgb * 255 + 0.5).astype(np.int64)
+
+
+def _thumbnail(path):
+    """Decode one image to (width, height, 32x32x3 uint8 array), flattened onto white."""
+    with trace.span('decode', path=path, blurhash=True), Image.open(path) as img:
+        width, height = img.size
+        img.draft('RGB', (THUMB_SIZE, THUMB_SIZE))
+        if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+            # Transparent backgrounds count as white, as they are shown
+            rgba = img.convert('RGBA')
+            rgb = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            rgb.alpha_composite(rgba)
+            rgb = rgb.convert('RGB')
+        else:
+            rgb = img.convert('RGB')
+        thumb = rgb.resize((THUMB_SIZE, THUMB_SIZE), Image.BOX)
+    return width, height, np.asarray(thumb, dtype=np.uint8)
+
+
+def components_batch(thumbs, components=COMPONENTS):
+    """Cosine components of (N, H, W, 3) sRGB thumbnails as an (N, cy * cx, 3) linear array."""
+    cx, cy = components
+    _, h, w, _ = thumbs.shape
+    basis_x = np.cos(np.pi * np.arange(cx)[:, None] * np.arange(w)[None, :] / w)
+    basis_y = np.cos(np.pi * np.arange(cy)[:, None] * np.arange(h)[None, :] / h)
+    factors = np.einsum('jy,ix,nyxc->njic', basis_y, basis_x, _srgb_to_linear(thumbs.astype(np.float64)))
+    # Every component but the DC term is doubled to normalize the basis
+    scale = np.full((cy, cx), 2.0)
+    scale[0, 0] = 1.0
+    factors *= scale[None, :, :, None] / (w * h)
+    return factors.reshape(len(thumbs), cy * cx, 3)
+
+
+def encode_components(factors, components=COMPONENTS):
+    """Encode one image's (cy * cx, 3) components as a BlurHash string."""
+    cx, cy = components
+    dc, ac = factors[0], factors[1:]
+    parts = [encode83((cx - 1) + (cy - 1) * 9, 1)]
+
+    if len(ac):
+        quantised_max = int(np.clip(np.floor(np.abs(ac).max() * 166 - 0.5), 0, 82))
+        max_value = (quantised_max + 1) / 166
+    else:
+        quantised_max, max_value = 0, 1.0
+    parts.append(encode83(quantised_max, 1))
+
+    r, g, b = _linear_to_srgb(dc)
+    parts.append(encode83(int((r << 16) + (g << 8) + b), 4))
+
+    normalized = ac / max_value
+    quantised = np.clip(np.floor(np.sign(normalized) * np.sqrt(np.abs(normalized)) * 9 + 9.5), 0, 18).astype(np.int64)
+    parts.extend(encode83(int(q_r * 19 * 19 + q_g * 19 + q_b), 2) for q_r, q_g, q_b in quantised)
+    return ''.join(parts)
+
+
+def placeholders(paths, workers=None):
+    """Return {path: {"blurhash", "width", "height"}} for every readable image in paths.
+
+    Files Pillow cannot open are skipped. Decoding runs on a thread pool;
+    Pillow releases the GIL while decoding and resizing.
+    """
+    def decode(path):
+        try:
+            return path, _thumbnail(path)
+        except (OSError, ValueError) as e:
+            print(f"✗ Could not read {path}: {e}")
+            return path, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        decoded = [(path, result) for path, result in executor.map(decode, paths) if result]
+    if not decoded:
+        return {}
+
+    with trace.span('encode', format='blurhash', images=len(decoded)):
+        factors = components_batch(np.stack([result[2] for _, result in decoded]))
+        return {
+            path: {'blurhash': encode_components(image_factors), 'width': width, 'height': height}
+            for (path, (width, height, _)), image_factors in zip(decoded, factors)
+        }
@@ -0,0 +1,210 @@
+"""Pool of reusable headless Chrome sessions.
+
+Before this pool, every scrape resolved chromedriver with webdriver-manager,
+which asks the network for the latest driver version, and then launched a
+fresh Chrome for a single page. DriverPool starts up to N sessions the
+first time they are needed and lends them to worker threads. A page after
+the first then costs only a navigation, and N pages render in parallel.
+
+chromedriver is looked up locally first: the CHROMEDRIVER environment
+variable, then PATH, then the webdriver-manager and Selenium Manager
+caches. webdriver-manager downloads a driver only when none of those has
+one, or when the cached driver no longer matches the installed Chrome.
+"""
+import glob
+import os
+import queue
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from yume_tools import trace
+
+CHROMEDRIVER_ENV = 'CHROMEDRIVER'
+
+# Where webdriver-manager and Selenium Manager keep the drivers they download
+DRIVER_CACHE_PATTERNS = [
+    os.path.join('~', '.wdm', 'drivers', 'chromedriver', '**', 'chromedriver*'),
+    os.path.join('~', '.cache', 'selenium', 'chromedriver', '**', 'chromedriver*'),
+]
+DRIVER_NAMES = ('chromedriver', 'chromedriver.exe')
+
+
+def chrome_options(user_agent=None):
+    """Headless Chrome options shared by every session."""
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    # 1x screenshots are a quarter of the pixels to encode, save and cluster
+    options.add_argument("--force-device-scale-factor=1")
+    if user_agent:
+        options.add_argument(f"user-agent={user_agent}")
+    return options
+
+
+def cached_chromedriver():
+    """Return a chromedriver path that needs no network access, or None."""
+    path = os.environ.get(CHROMEDRIVER_ENV) or shutil.which('chromedriver')
+    if path:
+        return path
+    candidates = [
+        path for pattern in DRIVER_CACHE_PATTERNS
+        for path in glob.glob(os.path.expanduser(pattern), recursive=True)
+        if os.path.basename(path) in DRIVER_NAMES and os.access(path, os.X_OK)
+    ]
+    # The newest download is the most likely to match the installed Chrome
+    return max(candidates, key=os.path.getmtime, default=None)
+
+
+def download_chromedriver():
+    """Resolve chromedriver through webdriver-manager (checks the network)."""
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    with trace.span('webdriver', call='install'):
+        return ChromeDriverManager().install()
+
+
+class DriverPool:
+    """Up to size warm Chrome sessions, started on demand and reused until close().
+
+    Use as a context manager. Borrow a session with ``driver()``, or run a
+    function over many items in parallel with ``map()``.
+    """
+
+    def __init__(self, size=1, user_agent=None):
+        self.size = max(1, size)
+        self.options = chrome_options(user_agent)
+        self._idle = queue.LifoQueue()
+        self._drivers = []
+        self._open = 0
+        self._driver_path = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _resolve_driver(self, stale=None):
+        """Return the chromedriver path, downloading one if stale is the cached path."""
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = cached_chromedriver() or download_chromedriver()
+            elif self._driver_path == stale:
+                self._driver_path = download_chromedriver()
+            return self._driver_path
+
+    def _launch(self):
+        path = self._resolve_driver()
+        with trace.span('webdriver', call='launch'):
+            try:
+                driver = webdriver.Chrome(service=Service(path), options=self.options)
+            except SessionNotCreatedException:
+                # Chrome was updated past the cached driver
+                driver = webdriver.Chrome(service=Service(self._resolve_driver(stale=path)),
+                                          options=self.options)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_launch = self._open < self.size
+                if can_launch:
+                    self._open += 1
+            if can_launch:
+                try:
+                    return self._launch()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            # Every session is busy; wait for one (or for a crashed one's slot)
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _discard(self, driver):
+        with self._lock:
+            self._drivers.remove(driver)
+            self._open -= 1
+        with trace.span('webdriver', call='quit'):
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+    @contextmanager
+    def driver(self):
+        """Borrow a session, starting one if all are busy and the pool is not full.
+
+        A session that raised a WebDriver error is quit rather than reused.
+        """
+        driver = self._acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            self._discard(driver)
+            raise
+        except BaseException:
+            self._idle.put(driver)
+            raise
+        else:
+            self._idle.put(driver)
+
+    def map(self, fn, items):
+        """Return [fn(driver, item) for item in items], spread across the pool's sessions.
+
+        An item whose call raises a WebDriver error is retried once on
+        another session (the failed one is quit). If that fails as well, the
+        error is printed and its result is None, so one broken page does not
+        cost the others.
+        """
+        def run(item):
+            for attempt in range(2):
+                try:
+                    with self.driver() as driver:
+                        return fn(driver, item)
+                except WebDriverException as e:
+                    error = (e.msg or type(e).__name__).splitlines()[0]
+                    if attempt == 0:
+                        print(f"WebDriver error on {item}, retrying on another session: {error}")
+            print(f"✗ Skipped {item}: {error}")
+            return None
+
+        items = list(items)
+        with ThreadPoolExecutor(max_workers=min(self.size, len(items)) or 1) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        """Quit every session in parallel."""
+        with self._lock:
+            drivers, self._drivers, self._open = self._drivers, [], 0
+        self._idle = queue.LifoQueue()
+
+        def quit_driver(driver):
+            with trace.span('webdriver', call='quit'):
+                try:
+                    driver.quit()
+                except WebDriverException:
+                    pass
+
+        if drivers:
+            with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+                list(executor.map(quit_driver, drivers))
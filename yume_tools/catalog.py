@@ -0,0 +1,656 @@
+"""Scrape the yume.rent catalog and keep the local copy in sync.
+
+The page is parsed from its served HTML when possible and rendered in
+headless Chrome only when the HTML carries no product markup, or when
+extra pages (categories, pagination) are requested. Product images
+go into the content-addressed store, and only products that were added or
+changed since the last sync are downloaded. The catalog itself is kept in
+the SQLite store (``catalog_db``), and ``camera-data.json`` is exported
+from it along with the API responses.
+
+Selenium, aiohttp and Pillow are imported only by the steps that use them,
+so a scrape from the served HTML never loads the browser stack. Product
+images are fetched, or revalidated, in one concurrent batch with a single
+request per distinct URL.
+"""
+import os
+import time
+from urllib.parse import urljoin
+
+from yume_tools import http_cache, trace, urls
+from yume_tools.catalog_db import DB_FILE, CatalogDB
+from yume_tools.static_scrape import extract_html, page_colors
+from yume_tools.store import ImageStore, content_hash
+from yume_tools.sync import diff_catalog, load_state, save_state, write_json_atomic
+
+URL = "https://yume.rent/"
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+
+CATALOG_FILE = 'camera-data.json'
+COLORS_FILE = 'yume-colors.json'
+
+# Debug output written by every scrape
+PAGE_SOURCE_FILE = 'page_source.html'
+SCREENSHOT_FILE = 'page_screenshot.png'
+
+# Chrome sessions used when several pages are rendered; each one is a full
+# browser process, so this stays well below the core count
+DEFAULT_BROWSER_WORKERS = 4
+
+# Hidden directory in the image store where product images are downloaded
+# before they are moved into it under their content hash
+DOWNLOAD_DIR = '.downloads'
+
+# File extensions for source formats that are stored as downloaded
+SOURCE_EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+
+
+def save_image(path, image_format, store, name, digest):
+    """Move a downloaded image file into the content-addressed store and return the blob filename.
+
+    The original encoding is kept rather than re-encoded as PNG; the
+    optimization stage produces the small AVIF/WebP/JPEG variants the app
+    actually loads. Unusual formats are normalized to PNG.
+    """
+    ext = SOURCE_EXTENSIONS.get(image_format)
+    if ext is None:
+        from io import BytesIO
+        from PIL import Image
+
+        with trace.span('encode', path=path, format='png'), Image.open(path) as img:
+            buffer = BytesIO()
+            img.save(buffer, 'PNG')
+        return store.put_bytes(name, buffer.getvalue(), '.png')
+    return store.put_file(name, path, ext, move=True, digest=digest)
+
+
+def image_sizes(images, cache):
+    """Return an ImageInfo per extracted image, probing only those without a natural size."""
+    from yume_tools.probe import ImageInfo, probe_batch
+
+    unknown = [img['src'] for img in images if not img['width']]
+    probed = dict(zip(unknown, probe_batch(unknown, cache=cache))) if unknown else {}
+    return [probed.get(img['src']) or ImageInfo(img['src'], width=img['width'], height=img['height'])
+            for img in images]
+
+
+def scrape_static(cache):
+    """Extract the catalog from the served HTML without a browser.
+
+    Returns None when the HTML has no product markup (e.g. the catalog is
+    rendered client-side), in which case Chrome is needed.
+    """
+    print(f"Fetching {URL}...")
+    response = http_cache.get(URL, headers={'User-Agent': USER_AGENT}, cache=cache)
+    response.raise_for_status()
+    payload = extract_html(response.text, URL)
+    if not payload['products']:
+        return None
+
+    # Save page source for debugging
+    with open(PAGE_SOURCE_FILE, "w", encoding="utf-8") as f:
+        f.write(response.text)
+    print(f"Saved page source to {PAGE_SOURCE_FILE}")
+    return payload
+
+
+def render_page(driver, url, save_page=False):
+    """Load url in a pooled Chrome session and extract the catalog from the live DOM.
+
+    With save_page the screenshot (the palette source) and page source are
+    saved as well.
+    """
+    from yume_tools.scrape import READY_TIMEOUT, extract_page, wait_until_ready
+
+    print(f"Opening {url}...")
+    with trace.span('webdriver', call='get', url=url):
+        driver.get(urls.resolve(url))
+
+    # Wait for the app to render products instead of sleeping a fixed time
+    if not wait_until_ready(driver):
+        print(f"{url} not ready after {READY_TIMEOUT}s, extracting what has rendered...")
+
+    # Extract CSS variables, products and images in a single script call
+    payload = extract_page(driver)
+    print(f"✓ {url}: {len(payload['products'])} products")
+
+    if save_page:
+        # Take a screenshot (for debugging, and as the source of the palette)
+        with trace.span('webdriver', call='save_screenshot'):
+            driver.save_screenshot(SCREENSHOT_FILE)
+        print(f"Saved page screenshot to {SCREENSHOT_FILE}")
+
+        # Save page source for debugging
+        with trace.span('webdriver', call='page_source'):
+            page_source = driver.page_source
+        with open(PAGE_SOURCE_FILE, "w", encoding="utf-8") as f:
+            f.write(page_source)
+        print(f"Saved page source to {PAGE_SOURCE_FILE}")
+    return payload
+
+
+def merge_payloads(payloads):
+    """Combine page payloads: the first page's CSS variables and each distinct product once."""
+    merged = dict(payloads[0])
+    seen = set()
+    products = []
+    for payload in payloads:
+        for product in payload['products']:
+            key = (product['title'], product['image'] and product['image']['src'])
+            if key not in seen:
+                seen.add(key)
+                products.append(product)
+    merged['products'] = products
+    if not products:
+        images = {img['src']: img for payload in payloads for img in payload['images']}
+        merged['images'] = list(images.values())
+    return merged
+
+
+def scrape_with_chrome(pages=(), workers=None):
+    """Render the home page, plus any site paths in pages, in headless Chrome.
+
+    Pages are spread over a pool of up to workers warm sessions. Their
+    products are merged into the home page's payload. A page that fails
+    twice is skipped; only a scrape where every page failed is an error.
+    """
+    from yume_tools.browser import DriverPool
+
+    urls = list(dict.fromkeys([URL] + [urljoin(URL, page) for page in pages]))
+    with DriverPool(min(workers or DEFAULT_BROWSER_WORKERS, len(urls)), USER_AGENT) as pool:
+        payloads = pool.map(lambda driver, url: render_page(driver, url, save_page=url == URL), urls)
+    payloads = [payload for payload in payloads if payload is not None]
+    if not payloads:
+        raise RuntimeError(f"none of the {len(urls)} pages could be rendered")
+    return merge_payloads(payloads)
+
+
+def scrape_page(cache, browser=False, pages=(), workers=None):
+    """Return the extracted page payload, from the served HTML or from Chrome.
+
+    The static pass is skipped when browser is True or extra pages are
+    requested, since those are rendered in Chrome.
+    """
+    payload = None
+    if not browser and not pages:
+        try:
+            payload = scrape_static(cache)
+        except Exception as e:
+            print(f"Static fetch failed: {e}")
+
+    if payload:
+        print("Found products in the served HTML, skipping the browser")
+        return payload
+    print("Rendering the page in headless Chrome...")
+    return scrape_with_chrome(pages, workers)
+
+
+def save_colors(payload):
+    """Write the page's colors to yume-colors.json, keeping the old file if none were found.
+
+    Hex CSS variables declared by the page win; otherwise the palette is
+    extracted from the latest screenshot.
+    """
+    colors = page_colors(payload)
+    source = "CSS variables"
+    if not colors and os.path.exists(SCREENSHOT_FILE):
+        from yume_tools.palette import screenshot_colors
+
+        colors = screenshot_colors(SCREENSHOT_FILE)
+        source = SCREENSHOT_FILE
+    if colors:
+        write_json_atomic(COLORS_FILE, colors, indent=2)
+        print(f"Extracted {len(colors)} colors from {source} and saved to {COLORS_FILE}")
+    else:
+        print(f"No colors found, keeping existing {COLORS_FILE}")
+    return colors
+
+
+def select_candidates(payload, cache):
+    """Return the (name, src) pairs of the catalog images on the page."""
+    products = payload['products']
+    print(f"Found {len(products)} product elements with {payload['productLevel']} selectors")
+
+    if products:
+        candidates = []
+        for i, product in enumerate(products):
+            name = product['title'] or f"camera-{i+1}"
+            src = product['image']['src'] if product['image'] else None
+            if not src:
+                print(f"Error processing element {i}: no product image")
+                continue
+            candidates.append((name, src))
+        return candidates
+
+    # As a fallback, just get all images
+    from yume_tools.probe import is_photo
+
+    print("No product elements found, falling back to all images...")
+    print(f"Found {len(payload['images'])} image elements")
+
+    images = []
+    for i, img in enumerate(payload['images']):
+        if i > 15:  # Limit to 15 images to avoid getting icons, etc.
+            break
+
+        src = img['src']
+        if src and (src.endswith('.jpg') or src.endswith('.png') or src.endswith('.jpeg')):
+            # Try to get alt text as name, or use index
+            images.append((img['alt'] or f"camera-{i+1}", img))
+
+    # Skip small images (likely icons) before downloading them, using the
+    # natural size from the page or, for images that had not loaded yet,
+    # the first few KB of the file
+    candidates = []
+    infos = image_sizes([img for name, img in images], cache)
+    for (name, img), info in zip(images, infos):
+        if not is_photo(info):
+            print(f"Skipping small image: {info.width}x{info.height} ({img['src']})")
+            continue
+        candidates.append((name, img['src']))
+    return candidates
+
+
+def fetch_sources(srcs, store, cache):
+    """Download every URL in srcs once, in one concurrent batch, and return {src: DownloadResult}.
+
+    Requests are conditional, so a URL the HTTP cache knows costs a 304
+    and its cached body. Bodies are streamed into DOWNLOAD_DIR in the
+    store, where an interrupted transfer is resumed on the next sync.
+    """
+    from yume_tools.download import download_batch
+
+    jobs = {src: f"{content_hash(src.encode('utf-8'))[:16]}.download" for src in srcs}
+    if not jobs:
+        return {}
+    results = download_batch(jobs, dest_dir=store.path(DOWNLOAD_DIR), headers={'User-Agent': USER_AGENT},
+                             cache=cache)
+    return dict(zip(jobs, results))
+
+
+def store_image(name, result, store, check_size):
+    """Move a downloaded catalog image into the store and return its state entry, or None.
+
+    Pillow only reads the image header from disk, so memory use does not
+    depend on the image size.
+    """
+    from PIL import Image
+
+    download_path = store.path(os.path.join(DOWNLOAD_DIR, result.filename))
+    try:
+        # Only the header is parsed here; pixels are decoded by the optimizer
+        with trace.span('decode', path=download_path, header_only=True) as event, \
+                Image.open(download_path) as img_obj:
+            image_format = img_obj.format
+            width, height = img_obj.size
+            event.update(format=image_format, width=width, height=height)
+
+        # Headers the probe could not size are checked here
+        if check_size and (width < 100 or height < 100):
+            print(f"Skipping small image: {width}x{height}")
+            return None
+
+        blob = save_image(download_path, image_format, store, name, result.sha256)
+        print(f"Downloaded image for {name}: images/{blob}")
+        return {"src": result.url, "image": blob, "sha256": result.sha256}
+    except Exception as e:
+        print(f"Error storing {result.url}: {e}")
+        return None
+
+
+def sync_products(payload, store, cache, state, full=False):
+    """Bring the catalog in line with the page, fetching only added and changed products.
+
+    Every product URL is requested once, however many products share it:
+    added and changed products are downloaded, and the others are
+    revalidated and refetched when their URL now serves different content.
+    With full every product is refetched. A product whose refetch fails
+    keeps its stored image; only products never stored before are left
+    out. Returns the catalog entries in page order, the new sync state and
+    the diff against the old state.
+    """
+    candidates = select_candidates(payload, cache)
+    sources = {}
+    for name, src in candidates:
+        sources.setdefault(name, src)
+    results = fetch_sources(dict.fromkeys(sources.values()), store, cache)
+    digests = {src: result.sha256 for src, result in results.items() if result.ok}
+    diff = diff_catalog(state, candidates, store, digests.get, refetch=full)
+
+    check_size = not payload['products']
+    new_state = {}
+    by_src = {}
+    cameras = []
+    for name, src in candidates:
+        if name not in new_state:
+            if name in diff.to_fetch:
+                result = results[src]
+                # Products sharing an image share its blob
+                if src not in by_src:
+                    if result.ok:
+                        by_src[src] = store_image(name, result, store, check_size)
+                    else:
+                        print(f"Error downloading {src}: {result.error}")
+                        by_src[src] = None
+                entry = by_src[src]
+                if entry is None:
+                    diff.failed.append(name)
+                    entry = state.get(name)
+                    # A failed refetch is no reason to drop a product
+                    if entry is None or not os.path.exists(store.path(entry['image'])):
+                        continue
+                    print(f"Keeping the stored image for {name}: images/{entry['image']}")
+                store.manifest[name] = entry['image']
+            else:
+                entry = state[name]
+                store.manifest[name] = entry['image']
+            new_state[name] = entry
+        cameras.append({"name": name, "image": new_state[name]['image']})
+
+    # Bodies that were only revalidated, or failed
+    for result in results.values():
+        download_path = store.path(os.path.join(DOWNLOAD_DIR, result.filename))
+        if os.path.exists(download_path):
+            os.remove(download_path)
+
+    # Drop removed products from the name -> blob manifest
+    for name in diff.removed:
+        store.manifest.pop(name, None)
+    print(f"Catalog diff: {diff.summary()}")
+    return cameras, new_state, diff
+
+
+def _thresholds(phash_threshold, dhash_threshold):
+    """Return the (pHash, dHash) Hamming thresholds, with None meaning the default."""
+    from yume_tools import similar
+
+    return (similar.PHASH_THRESHOLD if phash_threshold is None else phash_threshold,
+            similar.DHASH_THRESHOLD if dhash_threshold is None else dhash_threshold)
+
+
+def near_duplicates(cameras, store, phash_threshold=None, dhash_threshold=None):
+    """Return {blob: best copy} for every catalog image that has a better near-duplicate."""
+    from yume_tools import similar
+
+    blobs = sorted({camera['image'] for camera in cameras})
+    hashes = similar.hash_images([store.path(blob) for blob in blobs])
+    groups = similar.near_duplicate_groups(hashes, *_thresholds(phash_threshold, dhash_threshold))
+    replacements = {}
+    for group in groups:
+        best = os.path.basename(group[0].path)
+        for member in group[1:]:
+            replacements[os.path.basename(member.path)] = best
+    return replacements
+
+
+def merge_near_duplicates(cameras, state, store, phash_threshold=None, dhash_threshold=None):
+    """Point every catalog entry whose image has a near-duplicate at the best copy.
+
+    cameras, the sync state and the store manifest are updated in place.
+    Returns {replaced blob: kept blob}.
+    """
+    replacements = near_duplicates(cameras, store, phash_threshold, dhash_threshold)
+    for camera in cameras:
+        camera['image'] = replacements.get(camera['image'], camera['image'])
+    for entry in state.values():
+        entry['image'] = replacements.get(entry['image'], entry['image'])
+    for name, blob in store.manifest.items():
+        store.manifest[name] = replacements.get(blob, blob)
+    return replacements
+
+
+def prune_blobs(blobs, store):
+    """Delete blobs the manifest no longer references, with their optimized variants."""
+    from yume_tools.optimize import OUTPUT_SUBDIR
+
+    output_dir = os.path.join(store.root, OUTPUT_SUBDIR)
+    variants = os.listdir(output_dir) if os.path.isdir(output_dir) else []
+    removed_bytes = 0
+    for blob in sorted(set(blobs) - store.blobs()):
+        stem = os.path.splitext(blob)[0]
+        paths = [store.path(blob)] + [os.path.join(output_dir, filename) for filename in variants
+                                      if filename.startswith(f"{stem}-")]
+        for path in paths:
+            if os.path.isfile(path):
+                removed_bytes += os.path.getsize(path)
+                os.remove(path)
+    return removed_bytes
+
+
+def add_placeholders(db):
+    """Encode a BlurHash placeholder for every catalog image in db that lacks one.
+
+    Placeholders are stored per image, and images are content-addressed,
+    so only new images are decoded. Returns the number of images encoded.
+    """
+    pending = db.missing_placeholders()
+    if not pending:
+        return 0
+    from yume_tools.blurhash import placeholders
+
+    encoded = placeholders([os.path.join('images', blob) for blob in pending])
+    db.set_placeholders({os.path.basename(path): placeholder for path, placeholder in encoded.items()})
+    return len(encoded)
+
+
+def find_similar(apply=False, phash_threshold=None, dhash_threshold=None):
+    """Report near-duplicate groups among all images in images/, best copy first.
+
+    Images are grouped when they are within phash_threshold bits on the
+    pHash and dhash_threshold bits on the dHash (None uses the default).
+    With apply=True the catalog is pointed at the best copy of each of its
+    images and the replaced blobs are deleted.
+    """
+    from yume_tools import similar
+
+    start = time.perf_counter()
+    hashes = similar.hash_images(similar.image_files('images'))
+    groups = similar.near_duplicate_groups(hashes, *_thresholds(phash_threshold, dhash_threshold))
+    elapsed = time.perf_counter() - start
+
+    redundant_bytes = 0
+    for group in groups:
+        best = group[0]
+        print(f"✓ Keep {best.path} ({best.width}x{best.height}, {best.size / 1024:.1f} KB)")
+        for member in group[1:]:
+            redundant_bytes += member.size
+            print(f"  - {member.path} ({member.width}x{member.height}, {member.size / 1024:.1f} KB)")
+    redundant = sum(len(group) - 1 for group in groups)
+    print(f"Hashed {len(hashes)} images in {elapsed:.2f}s: {len(groups)} near-duplicate groups, "
+          f"{redundant} redundant copies ({redundant_bytes / 1024:.1f} KB)")
+
+    if apply:
+        from yume_tools.api import build_api
+
+        store = ImageStore()
+        state = load_state()
+        with CatalogDB() as db:
+            cameras = db.cameras()
+            merged = merge_near_duplicates(cameras, state, store, phash_threshold, dhash_threshold)
+            if merged:
+                db.sync(cameras)
+                add_placeholders(db)
+        if merged:
+            store.save()
+            build_api()
+            if state:
+                save_state(state)
+            removed_bytes = prune_blobs(merged, store)
+            print(f"Merged {len(merged)} catalog images into their best copies, "
+                  f"removed {removed_bytes / 1024:.1f} KB")
+        else:
+            print("No near-duplicates among the catalog images")
+    return groups
+
+
+def dedupe_catalog():
+    """Move catalog images that are not content-addressed yet into the store.
+
+    Identical images end up as one blob. The catalog store and sync state
+    are pointed at the blobs and the old per-product files are deleted.
+    Returns {old file: blob}.
+    """
+    store = ImageStore()
+    state = load_state()
+    replaced = {}
+    with CatalogDB() as db:
+        cameras = db.cameras()
+        for camera in cameras:
+            file_path = store.path(camera['image'])
+            if camera['image'] in replaced:
+                camera['image'] = replaced[camera['image']]
+                continue
+            if not os.path.isfile(file_path):
+                print(f"✗ Missing image for {camera['name']}: {file_path}")
+                continue
+            blob = store.put_file(camera['name'], file_path)
+            if blob != camera['image']:
+                replaced[camera['image']] = blob
+                camera['image'] = blob
+        if replaced:
+            db.sync(cameras)
+            add_placeholders(db)
+
+    store.save()
+    if replaced:
+        from yume_tools.api import build_api
+
+        for entry in state.values():
+            entry['image'] = replaced.get(entry['image'], entry['image'])
+        if state:
+            save_state(state)
+        build_api()
+    removed_bytes = prune_blobs(replaced, store)
+    print(f"Stored {len(cameras)} catalog images as {len({camera['image'] for camera in cameras})} unique blobs")
+    print(f"Removed {len(replaced)} per-product files ({removed_bytes / 1024 / 1024:.1f} MB)")
+    return replaced
+
+
+def scrape_catalog(browser=False, pages=(), workers=None):
+    """Scrape the page and save its colors without touching any product image."""
+    payload = scrape_page(http_cache.HttpCache(), browser, pages, workers)
+    save_colors(payload)
+    products = payload['products']
+    sources = {product['image']['src'] for product in products if product['image']}
+    print(f"Found {len(products)} product elements with {payload['productLevel']} selectors "
+          f"({len(sources)} distinct product images)")
+    return payload
+
+
+def update_catalog(payload, cache, full=False, encode_placeholders=True):
+    """Download the page's added and changed product images and update the catalog store.
+
+    With encode_placeholders, placeholders are encoded for new images.
+    Returns the catalog entries. camera-data.json is left to build_api.
+    Raises RuntimeError, leaving the catalog as it was, when images had to
+    be fetched and not one of them could be stored.
+    """
+    # Extract camera equipment images, reusing everything that has not
+    # changed since the last run unless a full refresh was requested
+    print("Looking for camera products...")
+    store = ImageStore()
+    cameras, state, diff = sync_products(payload, store, cache, load_state(), full)
+    if diff.to_fetch and len(set(diff.failed)) == len(diff.to_fetch):
+        raise RuntimeError(f"none of the {len(diff.to_fetch)} product images could be downloaded; "
+                           f"the catalog was left unchanged")
+
+    # New images may be rescaled or re-encoded copies of ones already in
+    # the catalog. Merging deletes blobs, so it is only reported here and
+    # left to `similar --apply`
+    duplicates = near_duplicates(cameras, store) if diff.to_fetch else {}
+
+    # Write the products that changed, then the blurred previews the app
+    # paints while the images load
+    with CatalogDB() as db:
+        # Only products that are really gone from the page are withdrawn
+        changed = db.sync(cameras, withdrawn=diff.removed)
+        encoded = add_placeholders(db) if encode_placeholders else 0
+    if encoded:
+        print(f"Encoded BlurHash placeholders for {encoded} new images")
+
+    # Save the name -> blob manifest and sync state
+    store.save()
+    save_state(state)
+    print(f"Extracted data for {len(cameras)} cameras and saved to {DB_FILE} ({changed} rows changed)")
+    if duplicates:
+        print(f"{len(duplicates)} catalog images have a near-duplicate; "
+              f"review them with `yume-tools similar` and merge with `yume-tools similar --apply`")
+    return cameras
+
+
+def sync_catalog(full=False, browser=False, pages=(), workers=None):
+    """Scrape the page and bring colors, images and camera-data.json up to date.
+
+    Returns False if the sync failed.
+    """
+    try:
+        cache = http_cache.HttpCache()
+        payload = scrape_page(cache, browser, pages, workers)
+        save_colors(payload)
+        cameras = update_catalog(payload, cache, full)
+
+        # Build the AVIF/WebP/JPEG srcset variants for the app (only new
+        # images are encoded)
+        from yume_tools.optimize import optimize_all
+
+        variants = optimize_all(camera['image'] for camera in cameras)
+        print(f"Optimized {len(variants)} images and saved srcset manifest to images/variants.json")
+
+        # Pack the grid thumbnails into sprite atlases
+        from yume_tools.sprites import build_atlases
+
+        sprites = build_atlases(camera['image'] for camera in cameras)
+        print(f"Packed {len(sprites['sprites'])} thumbnails into {len(sprites['atlases'])} sprite atlas(es)")
+
+        # Export camera-data.json and precompute the API responses server.js serves
+        from yume_tools.api import build_api
+
+        routes = build_api()
+        print(f"Saved {CATALOG_FILE} and precomputed {len(routes)} API responses in api/")
+        return True
+
+    except Exception as e:
+        print(f"Error scraping data: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def optimize_catalog():
+    """Build the placeholders, srcset variants and sprite atlases for the catalog and print a size summary."""
+    from yume_tools.optimize import OUTPUT_SUBDIR, VARIANTS_FILENAME, optimize_all
+    from yume_tools.sprites import CSS_FILENAME, SPRITES_FILENAME, build_atlases
+
+    print("Optimizing catalog images...")
+
+    with CatalogDB() as db:
+        encoded = add_placeholders(db)
+        images = db.images()
+    if encoded:
+        from yume_tools.api import build_api
+
+        build_api()
+        print(f"✓ Encoded BlurHash placeholders for {encoded} images in {CATALOG_FILE}")
+
+    start = time.perf_counter()
+    variants = optimize_all(images)
+    elapsed = time.perf_counter() - start
+
+    source_bytes = sum(os.path.getsize(os.path.join('images', filename)) for filename in variants)
+    output_dir = os.path.join('images', OUTPUT_SUBDIR)
+    output_bytes = sum(os.path.getsize(os.path.join(output_dir, filename)) for filename in os.listdir(output_dir))
+
+    print(f"✓ Optimized {len(variants)} images in {elapsed:.1f}s")
+    print(f"Source images: {source_bytes / 1024:.1f} KB, all variants: {output_bytes / 1024:.1f} KB")
+    print(f"Saved srcset manifest to images/{VARIANTS_FILENAME}")
+
+    start = time.perf_counter()
+    sprites = build_atlases(images)
+    elapsed = time.perf_counter() - start
+    for atlas in sprites['atlases']:
+        sizes = ", ".join(f"{fmt.upper()} {os.path.getsize(os.path.join('images', atlas[fmt])) / 1024:.1f} KB"
+                          for fmt in ('webp', 'jpeg'))
+        print(f"✓ {atlas['webp']}: {atlas['width']:g}x{atlas['height']:g} ({sizes})")
+    print(f"Packed {len(sprites['sprites'])} thumbnails in {elapsed:.1f}s; "
+          f"saved offsets to images/{SPRITES_FILENAME} and images/{CSS_FILENAME}")
+    return variants
@@ -0,0 +1,275 @@
+"""Indexed SQLite store for the catalog.
+
+``catalog.db`` is the catalog's source of truth. It has one row per
+product, with a stable id, its position on the page, its image blob,
+category, price and availability, plus one BlurHash placeholder per
+image. A sync writes the scraped products in a single transaction and
+only touches rows whose position, image or availability changed. New
+products get an id that is never reused. Products the caller names as
+gone from the site are marked unavailable rather than deleted, so an old
+booking still resolves to the camera it was made for. Lookups by id,
+name, category, price range and image go through indexes rather than a
+scan of the whole catalog. Image blobs are named after their content
+hash, so the image index doubles as the index on the image hash.
+
+The database runs in WAL mode, so exports and pipeline stages can read it
+while a sync writes to it. ``camera-data.json`` and the API shards are
+exported from it by ``api.build_api``. A new store is seeded from an
+existing ``camera-data.json``, which keeps a fresh checkout working.
+"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from yume_tools import trace
+
+DB_FILE = 'catalog.db'
+
+# Seeds a new store, so the catalog carries over from before the store existed
+CATALOG_FILE = 'camera-data.json'
+
+# Stored in PRAGMA user_version; 0 means the database was just created.
+# Version 1 had no AUTOINCREMENT on cameras.id.
+SCHEMA_VERSION = 2
+
+SCHEMA = (
+    """CREATE TABLE cameras (
+        -- AUTOINCREMENT: the id of a deleted row is never handed out again
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        position INTEGER NOT NULL,
+        image TEXT NOT NULL,
+        category TEXT,
+        price INTEGER,
+        available INTEGER NOT NULL DEFAULT 1
+    )""",
+    """CREATE TABLE placeholders (
+        image TEXT PRIMARY KEY,
+        blurhash TEXT NOT NULL,
+        width INTEGER NOT NULL,
+        height INTEGER NOT NULL
+    ) WITHOUT ROWID""",
+    # id and name are indexed by their PRIMARY KEY and UNIQUE constraints
+    "CREATE INDEX cameras_position ON cameras (position)",
+    "CREATE INDEX cameras_category_price ON cameras (category, price)",
+    "CREATE INDEX cameras_price ON cameras (price)",
+    "CREATE INDEX cameras_image ON cameras (image)",
+)
+
+# The page lists neither a category nor a price. New products get these,
+# cycling with their id, as server.js used to derive them from the list
+# position; they can be edited in the store afterwards.
+CATEGORIES = ['DSLR', 'Mirrorless', 'Medium Format', 'Compact', 'Film', 'Action']
+BASE_PRICE = 1000
+PRICE_STEP = 500
+PRICE_TIERS = 7
+
+# Only rows that differ are written. Updates and inserts are separate
+# statements because an upsert that updates still uses up an AUTOINCREMENT id.
+UPDATE = """UPDATE cameras SET position = ?, image = ?, available = 1
+    WHERE name = ? AND (position IS NOT ? OR image IS NOT ? OR available = 0)"""
+INSERT_NEW = """INSERT INTO cameras (name, position, image)
+    SELECT name, position, image FROM live WHERE name NOT IN (SELECT name FROM cameras) ORDER BY position"""
+
+SELECT = """SELECT c.id, c.name, c.image, c.category, c.price, c.available, p.blurhash, p.width, p.height
+    FROM cameras c LEFT JOIN placeholders p ON p.image = c.image"""
+
+
+def _camera(row):
+    camera = {'id': row['id'], 'name': row['name'], 'image': row['image'], 'category': row['category'],
+              'price': row['price'], 'available': bool(row['available'])}
+    if row['blurhash'] is not None:
+        camera['placeholder'] = {'blurhash': row['blurhash'], 'width': row['width'], 'height': row['height']}
+    return camera
+
+
+def catalog_entry(camera):
+    """The camera-data.json entry for a row; app.js shows its id, category and price as they are."""
+    entry = {'id': camera['id'], 'name': camera['name'], 'image': camera['image'], 'category': camera['category'],
+             'price': camera['price'], 'available': camera['available']}
+    if 'placeholder' in camera:
+        entry['placeholder'] = camera['placeholder']
+    return entry
+
+
+class CatalogDB:
+    """Products and image placeholders in ``catalog.db``.
+
+    Use as a context manager, or call close(). Connections are not shared
+    between threads, so each thread opens its own.
+    """
+
+    def __init__(self, path=DB_FILE, seed_file=CATALOG_FILE):
+        self.path = path
+        # Transactions are opened explicitly by _write()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        # Durable as of the last checkpoint; a crash can only lose the latest sync
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        version = self._version()
+        if version == 0:
+            self._create(seed_file)
+        elif version < SCHEMA_VERSION:
+            self._migrate()
+
+    def _version(self):
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+
+    @contextmanager
+    def _write(self):
+        """One write transaction; the lock is taken up front, so it never fails half way."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def _create(self, seed_file):
+        with self._write():
+            # Another connection may have created it while this one waited
+            if self._version():
+                return
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            if seed_file and os.path.exists(seed_file):
+                with open(seed_file) as f:
+                    cameras = json.load(f)
+                # Exports carry ids, categories and prices; older files only names and images
+                self.conn.executemany(
+                    'INSERT INTO cameras (id, name, position, image, category, price, available) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    ((camera.get('id'), camera['name'], position, camera['image'], camera.get('category'),
+                      camera.get('price'), camera.get('available', True))
+                     for position, camera in enumerate(cameras)))
+                self._fill_defaults()
+                self._set_placeholders({camera['image']: camera['placeholder'] for camera in cameras
+                                        if 'placeholder' in camera})
+                print(f"Imported {len(cameras)} cameras from {seed_file} into {self.path}")
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _migrate(self):
+        """Rebuild a version 1 store with the current schema, keeping every row and id."""
+        with self._write():
+            if self._version() >= SCHEMA_VERSION:
+                return
+            self.conn.execute('ALTER TABLE cameras RENAME TO cameras_v1')
+            for statement in SCHEMA:
+                if 'placeholders' in statement:
+                    continue
+                if 'INDEX' in statement:
+                    self.conn.execute(f"DROP INDEX IF EXISTS {statement.split()[2]}")
+                self.conn.execute(statement)
+            self.conn.execute('INSERT INTO cameras SELECT * FROM cameras_v1')
+            self.conn.execute('DROP TABLE cameras_v1')
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def sync(self, cameras, withdrawn=()):
+        """Write cameras, catalog entries in page order, and mark the withdrawn names unavailable.
+
+        The first entry of a name wins. Products in neither list are left as
+        they are: a product whose image could not be fetched this time is
+        not gone from the site. Returns the number of products added,
+        changed or withdrawn.
+        """
+        with self._write():
+            return self._sync(cameras, withdrawn)
+
+    def _sync(self, cameras, withdrawn):
+        entries = {}
+        for camera in cameras:
+            entries.setdefault(camera['name'], camera['image'])
+
+        with trace.span('db', op='sync', path=self.path, rows=len(entries)) as event:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS live '
+                              '(name TEXT PRIMARY KEY, position INTEGER, image TEXT)')
+            self.conn.execute('DELETE FROM live')
+            rows = [(name, position, image) for position, (name, image) in enumerate(entries.items())]
+            self.conn.executemany('INSERT INTO live (name, position, image) VALUES (?, ?, ?)', rows)
+
+            before = self.conn.total_changes
+            self.conn.executemany(UPDATE, ((position, image, name, position, image) for name, position, image in rows))
+            self.conn.execute(INSERT_NEW)
+            self.conn.executemany('UPDATE cameras SET available = 0 WHERE available = 1 AND name = ?',
+                                  ((name,) for name in withdrawn if name not in entries))
+            changed = self.conn.total_changes - before
+            event['changed'] = changed
+
+            self._fill_defaults()
+            # Placeholders of images no product uses any more
+            self.conn.execute('DELETE FROM placeholders WHERE image NOT IN (SELECT image FROM cameras)')
+        return changed
+
+    def _fill_defaults(self):
+        """Give new products their generated category and price."""
+        new_ids = [row[0] for row in self.conn.execute('SELECT id FROM cameras WHERE category IS NULL')]
+        self.conn.executemany(
+            'UPDATE cameras SET category = ?, price = ? WHERE id = ?',
+            ((CATEGORIES[(camera_id - 1) % len(CATEGORIES)],
+              BASE_PRICE + (camera_id - 1) % PRICE_TIERS * PRICE_STEP, camera_id) for camera_id in new_ids))
+
+    def set_placeholders(self, placeholders):
+        """Store {image: {"blurhash", "width", "height"}}."""
+        with self._write():
+            self._set_placeholders(placeholders)
+
+    def _set_placeholders(self, placeholders):
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO placeholders (image, blurhash, width, height) VALUES (?, ?, ?, ?)',
+            ((image, placeholder['blurhash'], placeholder['width'], placeholder['height'])
+             for image, placeholder in placeholders.items()))
+
+    def missing_placeholders(self):
+        """Images of available products that have no placeholder yet."""
+        return [row[0] for row in self.conn.execute(
+            'SELECT DISTINCT image FROM cameras WHERE available = 1 '
+            'AND image NOT IN (SELECT image FROM placeholders) ORDER BY image')]
+
+    def rows(self):
+        """Yield every product as it is read: available ones in page order, then withdrawn ones."""
+        for row in self.conn.execute(f'{SELECT} ORDER BY c.available DESC, c.position'):
+            yield _camera(row)
+
+    def cameras(self):
+        """The available products as (name, image) catalog entries, in page order."""
+        return [{'name': row['name'], 'image': row['image']} for row in self.conn.execute(
+            'SELECT name, image FROM cameras WHERE available = 1 ORDER BY position')]
+
+    def images(self):
+        """Image blobs of available products, each once, in the order they first appear on the page."""
+        return [row[0] for row in self.conn.execute(
+            'SELECT image FROM cameras WHERE available = 1 GROUP BY image ORDER BY MIN(position)')]
+
+    def find(self, camera_id=None, name=None, category=None, min_price=None, max_price=None, image=None,
+             available=None):
+        """Products matching every given filter, in page order."""
+        filters = [('c.id = ?', camera_id), ('c.name = ?', name), ('c.category = ?', category),
+                   ('c.price >= ?', min_price), ('c.price <= ?', max_price), ('c.image = ?', image),
+                   ('c.available = ?', None if available is None else int(available))]
+        filters = [(clause, value) for clause, value in filters if value is not None]
+        where = f" WHERE {' AND '.join(clause for clause, _ in filters)}" if filters else ''
+        query = f'{SELECT}{where} ORDER BY c.available DESC, c.position'
+        return [_camera(row) for row in self.conn.execute(query, [value for _, value in filters])]
+
+    def checkpoint(self):
+        """Copy every committed write from the WAL into catalog.db and empty the WAL.
+
+        Waits for readers like any write, so the file on its own then holds
+        the whole store, e.g. for hashing or copying it.
+        """
+        with trace.span('db', op='checkpoint', path=self.path):
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        # The last connection to close checkpoints the WAL into catalog.db
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
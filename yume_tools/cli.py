@@ -0,0 +1,229 @@
+"""``yume-tools`` command line: scrape, sync, download, palette, dedupe, similar, optimize, api, query, build and pipeline.
+
+Only argparse is loaded at startup. Each subcommand imports its own
+modules when it runs, so ``download`` never loads Selenium (nor lxml,
+except for the ``yume`` source), and ``--help`` loads none of them.
+"""
+import argparse
+import sys
+
+
+def _scrape(args):
+    from yume_tools.catalog import scrape_catalog
+
+    scrape_catalog(browser=args.browser, pages=args.pages, workers=args.workers)
+    return 0
+
+
+def _sync(args):
+    from yume_tools.catalog import sync_catalog
+
+    return 0 if sync_catalog(full=args.full, browser=args.browser, pages=args.pages,
+                             workers=args.workers) else 1
+
+
+def _download(args):
+    from yume_tools.sources import download_source
+
+    for source in args.sources:
+        download_source(source)
+    return 0
+
+
+def _optimize(args):
+    from yume_tools.catalog import optimize_catalog
+
+    optimize_catalog()
+    return 0
+
+
+def _dedupe(args):
+    from yume_tools.catalog import dedupe_catalog
+
+    dedupe_catalog()
+    return 0
+
+
+def _similar(args):
+    from yume_tools.catalog import find_similar
+
+    find_similar(apply=args.apply, phash_threshold=args.phash_threshold,
+                 dhash_threshold=args.dhash_threshold)
+    return 0
+
+
+def _palette(args):
+    from yume_tools.api import build_api
+    from yume_tools.catalog import COLORS_FILE
+    from yume_tools.palette import screenshot_colors
+    from yume_tools.sync import write_json_atomic
+
+    colors = screenshot_colors(args.screenshot, args.colors)
+    write_json_atomic(COLORS_FILE, colors, indent=2)
+    for name, value in colors.items():
+        print(f"✓ {name}: {value}")
+    print(f"Saved {len(colors)} colors to {COLORS_FILE}")
+    build_api()
+    return 0
+
+
+def _api(args):
+    from yume_tools.api import API_DIR, CATALOG_FILE, INDEX_FILENAME, build_api
+
+    routes = build_api()
+    identity = sum(entry['size'] for entry in routes.values())
+    brotli = sum(entry['encodings'].get('br', entry)['size'] for entry in routes.values())
+    print(f"✓ Precomputed {len(routes)} API responses: {identity / 1024:.1f} KB, {brotli / 1024:.1f} KB with brotli")
+    print(f"Saved route index to {API_DIR}/{INDEX_FILENAME} and exported {CATALOG_FILE}")
+    return 0
+
+
+def _query(args):
+    from yume_tools.catalog_db import DB_FILE, CatalogDB
+
+    with CatalogDB() as db:
+        cameras = db.find(camera_id=args.id, name=args.name, category=args.category,
+                          min_price=args.min_price, max_price=args.max_price,
+                          available=True if args.available else None)
+    for camera in cameras:
+        status = "" if camera['available'] else ", unavailable"
+        print(f"✓ {camera['id']}: {camera['name']} ({camera['category']}, {camera['price']}{status}) images/{camera['image']}")
+    print(f"Found {len(cameras)} cameras in {DB_FILE}")
+    return 0
+
+
+def _build(args):
+    from yume_tools.fingerprint import MANIFEST_FILENAME, build_dist
+
+    manifest = build_dist(output_dir=args.output)
+    renamed = sum(1 for name, target in manifest.items() if name != target)
+    print(f"✓ Copied {len(manifest)} assets to {args.output}/ ({renamed} renamed with content hashes)")
+    print(f"Saved asset manifest to {args.output}/{MANIFEST_FILENAME}")
+    return 0
+
+
+def _pipeline(args):
+    unknown = [target for target in args.targets if target not in PIPELINE_STAGES]
+    if unknown:
+        print(f"Unknown stage(s): {', '.join(unknown)} (choose from {', '.join(PIPELINE_STAGES)})")
+        return 2
+
+    from yume_tools.pipeline import run_pipeline
+
+    return 0 if run_pipeline(args.targets, force=args.force, full=args.full, jobs=args.jobs,
+                             browser=args.browser, pages=args.pages, workers=args.workers,
+                             deploy_command=args.deploy_command) else 1
+
+
+# Kept here rather than imported from sources so --help stays import-free
+DOWNLOAD_SOURCES = {
+    'yume': "product photos from yume.rent, or Wikimedia Commons if none are found",
+    'camera': "Pixabay sample images",
+    'direct': "Flickr sample images, with drawn placeholders for failures",
+    'unsplash': "Unsplash sample images",
+    'mirrors': "each sample image from whichever of Wikimedia, Flickr, Pixabay and Unsplash answers first",
+}
+
+
+# Stages of `yume-tools pipeline`, in order (see yume_tools/pipeline.py)
+PIPELINE_STAGES = ['scrape', 'colors', 'download', 'placeholders', 'optimize', 'sprites', 'api', 'manifest', 'deploy']
+
+
+def _add_browser_arguments(parser):
+    parser.add_argument('--browser', action='store_true',
+                        help="skip the static HTML pass and always render the page in Chrome")
+    parser.add_argument('--pages', nargs='+', default=[], metavar='PATH',
+                        help="also render these site paths (e.g. /cameras /optics) in Chrome and merge their products")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Chrome sessions to render pages with in parallel (default: 4)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='yume-tools',
+                                     description="Scrape the yume.rent catalog and prepare its images for the app.")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="append a JSONL timing trace to FILE (same as setting YUME_TRACE)")
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    scrape = subparsers.add_parser('scrape', help="scrape the page and save its colors, without downloading images")
+    _add_browser_arguments(scrape)
+    scrape.set_defaults(handler=_scrape)
+
+    sync = subparsers.add_parser('sync', help="bring the catalog, colors and images up to date with the site")
+    sync.add_argument('--full', action='store_true',
+                      help="ignore the saved sync state and refetch every product image")
+    _add_browser_arguments(sync)
+    sync.set_defaults(handler=_sync)
+
+    download = subparsers.add_parser(
+        'download', help="download the five sample camera images from one or more sources",
+        description="Sources: " + "; ".join(f"{name}: {text}" for name, text in DOWNLOAD_SOURCES.items()))
+    download.add_argument('sources', nargs='+', choices=list(DOWNLOAD_SOURCES), metavar='source',
+                          help=f"one of {', '.join(DOWNLOAD_SOURCES)}")
+    download.set_defaults(handler=_download)
+
+    palette = subparsers.add_parser('palette', help="rebuild yume-colors.json from the page screenshot")
+    palette.add_argument('screenshot', nargs='?', default='page_screenshot.png',
+                         help="screenshot to extract colors from (default: page_screenshot.png)")
+    palette.add_argument('--colors', type=int, default=8, help="number of palette clusters (default: 8)")
+    palette.set_defaults(handler=_palette)
+
+    dedupe = subparsers.add_parser('dedupe', help="move catalog images into the content-addressed store")
+    dedupe.set_defaults(handler=_dedupe)
+
+    similar = subparsers.add_parser('similar', help="find near-duplicate images by perceptual hash")
+    similar.add_argument('--apply', action='store_true',
+                         help="point the catalog at the best copy of each image and delete the others")
+    similar.add_argument('--phash-threshold', type=int, default=None,
+                         help="maximum pHash Hamming distance (of 64 bits) for a near-duplicate (default: 10)")
+    similar.add_argument('--dhash-threshold', type=int, default=None,
+                         help="maximum dHash Hamming distance (of 64 bits) for a near-duplicate (default: 10)")
+    similar.set_defaults(handler=_similar)
+
+    optimize = subparsers.add_parser('optimize', help="build placeholders, srcset variants and sprite atlases for camera-data.json")
+    optimize.set_defaults(handler=_optimize)
+
+    api = subparsers.add_parser('api', help="export camera-data.json and the compressed API responses server.js serves")
+    api.set_defaults(handler=_api)
+
+    query = subparsers.add_parser('query', help="list the cameras in the catalog store that match every filter")
+    query.add_argument('--id', type=int, default=None, help="camera id, as in /api/cameras/:id")
+    query.add_argument('--name', default=None, help="exact product name")
+    query.add_argument('--category', default=None, help="category, e.g. DSLR")
+    query.add_argument('--min-price', type=int, default=None, help="lowest price")
+    query.add_argument('--max-price', type=int, default=None, help="highest price")
+    query.add_argument('--available', action='store_true', help="leave out products no longer on the site")
+    query.set_defaults(handler=_query)
+
+    build = subparsers.add_parser('build', help="copy the app to dist/ under content-hashed names for immutable caching")
+    build.add_argument('--output', default='dist', help="output directory (default: dist)")
+    build.set_defaults(handler=_build)
+
+    pipeline = subparsers.add_parser(
+        'pipeline', help="run the refresh stages, skipping those whose inputs have not changed",
+        description="Stages: " + " ".join(PIPELINE_STAGES) + ". With no targets, everything up to api and manifest runs.")
+    # Checked in _pipeline: argparse rejects an empty list when nargs='*' has choices
+    pipeline.add_argument('targets', nargs='*', metavar='stage',
+                          help="stages to bring up to date, with the stages they depend on")
+    pipeline.add_argument('--force', action='store_true', help="run every selected stage even if it is up to date")
+    pipeline.add_argument('--full', action='store_true',
+                          help="ignore the saved sync state and refetch every product image")
+    pipeline.add_argument('--jobs', type=int, default=None, help="stages to run at once (default: no limit)")
+    pipeline.add_argument('--deploy-command', default=None,
+                          help="command the deploy stage runs (default: $YUME_DEPLOY_COMMAND)")
+    _add_browser_arguments(pipeline)
+    pipeline.set_defaults(handler=_pipeline)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        from yume_tools import trace
+        trace.configure(args.trace)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
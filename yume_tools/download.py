@@ -0,0 +1,406 @@
+"""Concurrent image download engine shared by the fetch scripts.
+
+All downloads in a batch go through one aiohttp session, so connections to
+each host are pooled and kept alive between files. Concurrency is bounded
+both overall and per host so a single CDN is never flooded, and bodies are
+streamed to disk so memory use does not grow with file size.
+
+Each body goes to a fixed ``.<name>.part`` file. An interrupted transfer
+leaves it behind, and the next run asks for the remaining bytes with a
+Range request. A finished file is checked (length, hash, image header)
+before it is renamed over the destination, so images/ only ever holds
+complete files.
+
+A hedged batch knows several mirrors for each file. It asks the first one
+and, if no valid image has arrived within the hedge delay, the next one as
+well, keeping the first valid file and cancelling the rest. One slow or
+failing mirror then costs at most the delay, not its whole timeout.
+"""
+import asyncio
+import base64
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from yume_tools import http_cache, ratelimit, trace
+from yume_tools.stream import CHUNK_SIZE, MAX_BYTES, HashingWriter, SizeLimitExceeded, iter_file, partial_path
+
+# User agent to mimic a browser
+DEFAULT_HEADERS = {
+    'User-Agent': http_cache.USER_AGENT
+}
+
+DEFAULT_CONCURRENCY = 8
+
+# Per-host concurrency is adapted by ratelimit.LIMITER; per_host only caps it
+DEFAULT_PER_HOST = None
+DEFAULT_TIMEOUT = 30
+
+# Seconds a hedged download waits for one mirror before also asking the next
+DEFAULT_HEDGE_DELAY = 1.0
+
+# Hidden directory under dest_dir where each mirror's copy is assembled
+HEDGE_DIR = '.mirrors'
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of downloading a single file."""
+    url: str
+    filename: str
+    ok: bool
+    status: Optional[int] = None
+    size: int = 0
+    error: Optional[str] = None
+    cached: bool = False
+    sha256: Optional[str] = None
+    # Bytes that were already on disk from an interrupted earlier attempt
+    resumed: int = 0
+    # Hedged downloads: the mirror that won and how many were asked
+    mirror: Optional[str] = None
+    mirrors_tried: int = 0
+
+
+@dataclass
+class Mirror:
+    """One place a file can be fetched from, and what counts as a valid copy there."""
+    name: str
+    url: str
+    headers: dict = field(default_factory=dict)
+    min_size: int = 0
+    require_image: bool = False
+
+
+def expected_digest(headers):
+    """Return the hex SHA-256 the server declares for the whole file, if any.
+
+    Understands ``Repr-Digest: sha-256=:<base64>:`` (RFC 9530) and the older
+    ``Digest: SHA-256=<base64>``.
+    """
+    for name in ('Repr-Digest', 'Digest'):
+        for item in headers.get(name, '').split(','):
+            algorithm, _, value = item.strip().partition('=')
+            if algorithm.lower() == 'sha-256' and value:
+                try:
+                    return base64.b64decode(value.strip(':')).hex()
+                except ValueError:
+                    return None
+    return None
+
+
+def check_image(path):
+    """Return None if Pillow can parse path as an image, else the reason it cannot."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            img.verify()
+    except Exception as e:
+        return f"not a valid image ({e or type(e).__name__})"
+    return None
+
+
+def _content_range(header):
+    """Parse ``bytes start-end/total`` into (start, total); total is None for ``*``."""
+    try:
+        unit, _, spec = header.partition(' ')
+        span, _, total = spec.partition('/')
+        return int(span.split('-')[0]), None if total == '*' else int(total)
+    except ValueError:
+        return None, None
+
+
+def _validator(headers):
+    """The ETag (strong only) or Last-Modified an If-Range request can use."""
+    etag = headers.get('ETag', '')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return headers.get('Last-Modified')
+
+
+async def _download_one(session, semaphore, url, filename, dest_dir, min_size, require_image,
+                        cache, max_bytes, verify_image, sha256, headers=None):
+    """Stream one URL to dest_dir/filename through a resumable, size-capped temp file.
+
+    A partial file left by an interrupted run is continued with a Range
+    request. The finished file is checked (length, hash, image header)
+    before it is renamed into place.
+    """
+    path = os.path.join(dest_dir, filename)
+    cached = False
+    resumed = 0
+    async with semaphore:
+        with trace.http_span(url) as event:
+            timing = {}
+            timer = trace.HttpTimer(event)
+            try:
+                with HashingWriter(path, max_bytes, resume=True) as writer:
+                    if writer.size and writer.source.get('url') != url:
+                        writer.restart()
+                    # A second attempt is only made when the server rejects the range
+                    for attempt in range(2):
+                        # Ranges count encoded bytes, so bodies are always fetched unencoded
+                        request_headers = {**(headers or {}), 'Accept-Encoding': 'identity'}
+                        if writer.size:
+                            request_headers['Range'] = f"bytes={writer.size}-"
+                            if writer.source.get('validator'):
+                                request_headers['If-Range'] = writer.source['validator']
+                        elif cache is not None:
+                            request_headers.update(cache.conditional_headers(url))
+                        async with ratelimit.get_async(session, url, headers=request_headers,
+                                                       trace_request_ctx=timing) as response:
+                            timer.headers_received(response.status)
+                            if response.status == 416 and writer.size and attempt == 0:
+                                writer.restart()
+                                continue
+                            meta = cache.lookup(url) if cache is not None and response.status == 304 else None
+                            expected_size = None
+                            if meta:
+                                # Not modified: reuse the cached body
+                                content_type = meta.get('Content-Type', '')
+                                cached = event['cached'] = True
+                            elif response.status == 206 and writer.size:
+                                start, expected_size = _content_range(response.headers.get('Content-Range', ''))
+                                if start != writer.size:
+                                    writer.restart()
+                                    return DownloadResult(url, filename, False, response.status,
+                                                          error="server returned the wrong range")
+                                resumed = event['resumed'] = writer.size
+                                content_type = response.headers.get('Content-Type', '')
+                            elif response.status != 200:
+                                # Errors such as 429 or 503 are usually transient
+                                writer.keep()
+                                return DownloadResult(url, filename, False, response.status,
+                                                      error=f"HTTP {response.status}")
+                            else:
+                                # A full body: the range was ignored or the file changed
+                                writer.restart()
+                                content_type = response.headers.get('Content-Type', '')
+                                if 'Content-Encoding' not in response.headers:
+                                    expected_size = response.content_length
+
+                            # Check if it's an actual image by examining content type
+                            if require_image and 'image' not in content_type:
+                                return DownloadResult(url, filename, False, response.status,
+                                                      error="URL did not return an image")
+
+                            if cached:
+                                for chunk in iter_file(cache.body_path(url)):
+                                    writer.write(chunk)
+                            else:
+                                if not resumed:
+                                    writer.begin({'url': url, 'validator': _validator(response.headers)})
+                                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                                    writer.write(chunk)
+                            timer.body_received(writer.size - resumed)
+                            break
+
+                    # Verify the complete file before it replaces anything
+                    writer.close()
+                    if expected_size is not None and writer.size != expected_size:
+                        # Kept for the next run to resume
+                        writer.keep()
+                        return DownloadResult(url, filename, False, response.status, writer.size,
+                                              error=f"incomplete body ({writer.size} of {expected_size} bytes)")
+                    digest = sha256 or (None if cached else expected_digest(response.headers))
+                    if digest and writer.sha256 != digest:
+                        return DownloadResult(url, filename, False, response.status, writer.size,
+                                              error="SHA-256 does not match")
+                    if writer.size < max(min_size, 1):
+                        return DownloadResult(url, filename, False, 200, writer.size,
+                                              error=f"file is too small ({writer.size / 1024:.1f} KB)")
+                    reason = check_image(writer.tmp_path) if verify_image else None
+                    if reason:
+                        return DownloadResult(url, filename, False, 200, writer.size, error=reason)
+
+                    writer.commit()
+                if cache is not None and not cached:
+                    cache.store_file(url, response.headers, path)
+            except (aiohttp.ClientError, asyncio.TimeoutError, SizeLimitExceeded) as e:
+                event['error'] = str(e) or type(e).__name__
+                return DownloadResult(url, filename, False, error=event['error'], resumed=resumed)
+            finally:
+                if 'connect' in timing:
+                    event['connect'] = timing['connect']
+
+    return DownloadResult(url, filename, True, 200, writer.size, cached=cached,
+                          sha256=writer.sha256, resumed=resumed)
+
+
+def limit_hosts(urls, per_host):
+    """Cap the adaptive concurrency of every host in urls at per_host (if given)."""
+    if per_host:
+        for host in {urlsplit(url).netloc for url in urls}:
+            ratelimit.LIMITER.configure(host, max_concurrency=per_host)
+
+
+async def download_batch_async(jobs, dest_dir='images', headers=None,
+                               concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                               timeout=DEFAULT_TIMEOUT, min_size=0, require_image=False,
+                               cache=None, max_bytes=MAX_BYTES, verify_image=True, checksums=None):
+    """Download every URL in jobs (URL -> filename) and return one result per file.
+
+    Results are returned in the same order as jobs. Bodies are streamed to
+    disk and files larger than max_bytes are rejected. When an HttpCache is
+    given, requests are sent conditionally and 304 responses reuse the
+    cached body. Requests wait for their host's rate limiter and throttled
+    or failed attempts are retried with backoff. A file replaces its destination only once its length
+    matches the response, its SHA-256 matches checksums[url] (or the
+    server's Repr-Digest) and, with verify_image, Pillow can parse it.
+    Interrupted transfers are resumed on the next call.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    limit_hosts(jobs, per_host)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host or 0,
+                                     keepalive_timeout=30)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers=headers or DEFAULT_HEADERS,
+                                     trace_configs=trace.aiohttp_trace_configs()) as session:
+        tasks = [
+            _download_one(session, semaphore, url, filename, dest_dir, min_size, require_image,
+                          cache, max_bytes, verify_image, (checksums or {}).get(url))
+            for url, filename in jobs.items()
+        ]
+        return await asyncio.gather(*tasks)
+
+
+def download_batch(jobs, **kwargs):
+    """Blocking wrapper around download_batch_async for the command-line scripts."""
+    return asyncio.run(download_batch_async(jobs, **kwargs))
+
+
+def _discard_partial(path):
+    for leftover in (partial_path(path), f"{partial_path(path)}.json"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+async def _download_hedged(session, semaphore, filename, mirrors, dest_dir, hedge_delay, cache, max_bytes):
+    """Fetch filename from the first mirror that delivers a valid image.
+
+    Mirrors are asked in order. The next one starts when the current ones
+    have not finished within hedge_delay, or at once when one fails. Each
+    mirror writes to its own directory under HEDGE_DIR; the winning file is
+    renamed into dest_dir and the other transfers are cancelled. A file
+    with no mirrors fails without a request.
+    """
+    if not mirrors:
+        return DownloadResult(None, filename, False, error="no mirrors to download from")
+
+    staging = os.path.join(dest_dir, HEDGE_DIR)
+    # Mirrors whose host is backing off go last
+    remaining = sorted(mirrors, key=lambda mirror: ratelimit.LIMITER.blocked_for(mirror.url) > 0)
+    pending, started, failures = {}, [], []
+    start = time.perf_counter()
+
+    def start_next():
+        mirror = remaining.pop(0)
+        mirror_dir = os.path.join(staging, mirror.name)
+        os.makedirs(mirror_dir, exist_ok=True)
+        if started:
+            # duration: how long the earlier mirrors had before this one was asked
+            trace.record('hedge', path=filename, mirror=mirror.name,
+                         duration=round(time.perf_counter() - start, 6))
+        started.append(mirror.name)
+        task = asyncio.ensure_future(_download_one(
+            session, semaphore, mirror.url, filename, mirror_dir, mirror.min_size, mirror.require_image,
+            cache, max_bytes, True, None, headers=mirror.headers))
+        pending[task] = mirror
+
+    winner = None
+    start_next()
+    try:
+        while pending and winner is None:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay if remaining else None,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                mirror = pending.pop(task)
+                result = task.result()
+                if result.ok and winner is None:
+                    winner = (mirror, result)
+                elif not result.ok:
+                    failures.append((mirror, result))
+            # A timeout or a failure brings in the next mirror
+            if winner is None and remaining:
+                start_next()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if winner is None:
+        mirror, result = failures[-1]
+        errors = '; '.join(f"{mirror.name}: {result.error}" for mirror, result in failures)
+        return DownloadResult(result.url, filename, False, result.status,
+                              error=f"all {len(failures)} mirrors failed ({errors})", mirrors_tried=len(started))
+
+    mirror, result = winner
+    os.replace(os.path.join(staging, mirror.name, filename), os.path.join(dest_dir, filename))
+    for name in started:
+        _discard_partial(os.path.join(staging, name, filename))
+    result.mirror, result.mirrors_tried = mirror.name, len(started)
+    return result
+
+
+async def download_hedged_async(jobs, dest_dir='images', headers=None, hedge_delay=DEFAULT_HEDGE_DELAY,
+                                timeout=DEFAULT_TIMEOUT, cache=None, max_bytes=MAX_BYTES):
+    """Download every file in jobs (filename -> [Mirror, ...]) from its fastest valid mirror.
+
+    Returns one result per file, in the order of jobs; a successful result
+    names the mirror it came from. Every mirror's copy is verified like a
+    download_batch file, so an error page or truncated body never wins.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    # Every mirror of every file may be in flight at once; the rate limiter
+    # still bounds each host
+    semaphore = asyncio.Semaphore(sum(len(mirrors) for mirrors in jobs.values()) or 1)
+    connector = aiohttp.TCPConnector(keepalive_timeout=30)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers=headers or DEFAULT_HEADERS,
+                                     trace_configs=trace.aiohttp_trace_configs()) as session:
+        results = await asyncio.gather(*(
+            _download_hedged(session, semaphore, filename, mirrors, dest_dir, hedge_delay, cache, max_bytes)
+            for filename, mirrors in jobs.items()
+        ))
+
+    # Leave no empty staging directories behind
+    staging = os.path.join(dest_dir, HEDGE_DIR)
+    mirror_dirs = [os.path.join(staging, name) for name in os.listdir(staging)] if os.path.isdir(staging) else []
+    for directory in mirror_dirs + [staging]:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+    return results
+
+
+def download_hedged(jobs, **kwargs):
+    """Blocking wrapper around download_hedged_async."""
+    return asyncio.run(download_hedged_async(jobs, **kwargs))
+
+
+def print_report(results):
+    """Print one ✓/✗ line per file and return the number of successful downloads."""
+    for result in results:
+        if result.ok and result.cached:
+            print(f"✓ {result.filename} not modified, reused cached copy ({result.size / 1024:.1f} KB)")
+        elif result.ok and result.resumed:
+            print(f"✓ Resumed {result.filename} after {result.resumed / 1024:.1f} KB ({result.size / 1024:.1f} KB)")
+        elif result.ok and result.mirror:
+            print(f"✓ Downloaded {result.filename} from {result.mirror} ({result.size / 1024:.1f} KB, "
+                  f"{result.mirrors_tried} mirror{'s' if result.mirrors_tried != 1 else ''} asked)")
+        elif result.ok:
+            print(f"✓ Successfully downloaded {result.filename} ({result.size / 1024:.1f} KB)")
+        else:
+            source = f" from {result.url}" if result.url else ""
+            print(f"✗ Failed to download {result.filename}{source}: {result.error}")
+    return sum(1 for result in results if result.ok)
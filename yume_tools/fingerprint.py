@@ -0,0 +1,217 @@
+"""Content-hashed copies of the app for immutable caching.
+
+The app is served under stable names (``style.css``, ``app.js``,
+``camera-data.json``, ``images/optimized/<blob>-320.webp``), so a client
+must revalidate each of them on every open or risk showing stale files.
+``build_dist`` copies the app to ``dist/``, giving every asset a name that
+contains a hash of its contents. Files whose names already contain their
+hash, such as store blobs and sprite atlases, keep them. References are
+rewritten on the way: url() in stylesheets, paths in the variants and
+sprite manifests, images in the catalog, and the script and stylesheet in
+``index.html``. Files are processed leaves first, so a changed image also
+changes the name of every file that points at it.
+
+Only ``index.html`` keeps its name. It gets the fingerprinted URLs of the
+data files ``app.js`` fetches as an inline ``window.YUME_ASSETS`` map, and
+is the only file a client revalidates. ``dist/asset-manifest.json`` maps
+every source path to its fingerprinted path, and server.js serves
+everything it lists as immutable.
+"""
+import json
+import os
+import posixpath
+import re
+
+from yume_tools.store import content_hash
+from yume_tools.stream import copy_file, hash_file, write_atomic
+
+DIST_DIR = 'dist'
+MANIFEST_FILENAME = 'asset-manifest.json'
+
+# Hex digits of the SHA-256 digest put into fingerprinted names
+HASH_LENGTH = 12
+
+INDEX_FILE = 'index.html'
+STYLESHEET = 'style.css'
+SCRIPT = 'app.js'
+CATALOG_FILE = 'camera-data.json'
+IMAGES_DIR = 'images'
+VARIANTS_FILE = 'images/variants.json'
+SPRITES_FILE = 'images/sprites.json'
+SPRITES_CSS = 'images/sprites.css'
+
+# Files app.js fetches by name; their fingerprinted URLs go into index.html
+DATA_FILES = (CATALOG_FILE, VARIANTS_FILE, SPRITES_FILE)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.avif', '.gif', '.svg', '.ico')
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)')
+HTML_REF_PATTERN = re.compile(r'\b(src|href)="([^"]+)"')
+
+
+def fingerprinted_name(path, digest):
+    """Return path with digest in its name, or path itself if its name already contains it."""
+    stem, ext = os.path.splitext(path)
+    if digest[:HASH_LENGTH] in posixpath.basename(stem):
+        return path
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+class DistBuilder:
+    """Copies files into the output directory under fingerprinted names.
+
+    manifest maps each source path (relative to the app root, with forward
+    slashes) to the path it was given in the output directory.
+    """
+
+    def __init__(self, root='.', output_dir=DIST_DIR):
+        self.root = root
+        self.output_dir = output_dir
+        self.manifest = {}
+        self.written = set()
+
+    def _output_path(self, name):
+        path = os.path.join(self.output_dir, *name.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.written.add(os.path.normpath(path))
+        return path
+
+    def add_file(self, name):
+        """Copy a file as is and return its fingerprinted name.
+
+        The copy is a hard link where possible. An existing output file is
+        left alone, since its name already identifies its contents.
+        """
+        source = os.path.join(self.root, *name.split('/'))
+        target = fingerprinted_name(name, hash_file(source))
+        path = self._output_path(target)
+        if not os.path.exists(path):
+            try:
+                os.link(source, path)
+            except OSError:
+                copy_file(source, path)
+        self.manifest[name] = target
+        return target
+
+    def add_data(self, name, data, fingerprint=True):
+        """Write rewritten contents for name and return the name they were written under."""
+        target = fingerprinted_name(name, content_hash(data)) if fingerprint else name
+        path = self._output_path(target)
+        if not fingerprint or not os.path.exists(path):
+            write_atomic(path, data)
+        if fingerprint:
+            self.manifest[name] = target
+        return target
+
+    def resolve(self, reference, base_dir=''):
+        """Map a reference relative to base_dir to its fingerprinted form (unchanged if unknown)."""
+        path, _, suffix = reference.partition('?')
+        name = posixpath.normpath(posixpath.join(base_dir, path))
+        if name not in self.manifest:
+            return reference
+        target = posixpath.relpath(self.manifest[name], base_dir or '.')
+        return f"{target}?{suffix}" if suffix else target
+
+    def resolve_srcset(self, srcset, base_dir=''):
+        candidates = []
+        for candidate in srcset.split(', '):
+            url, _, descriptor = candidate.partition(' ')
+            candidates.append(' '.join(filter(None, [self.resolve(url, base_dir), descriptor])))
+        return ', '.join(candidates)
+
+    def rewrite_css(self, css, base_dir=''):
+        return CSS_URL_PATTERN.sub(
+            lambda match: f"url({match.group(1)}{self.resolve(match.group(2), base_dir)}{match.group(1)})", css)
+
+    def read(self, name):
+        with open(os.path.join(self.root, *name.split('/')), 'rb') as f:
+            return f.read()
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.root, *name.split('/')))
+
+
+def _json_bytes(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _image_files(root):
+    """Every servable image under images/, as app-relative names (hidden files skipped)."""
+    names = []
+    for directory, subdirs, filenames in os.walk(os.path.join(root, IMAGES_DIR)):
+        subdirs[:] = sorted(subdir for subdir in subdirs if not subdir.startswith('.'))
+        relative = os.path.relpath(directory, root).replace(os.sep, '/')
+        names.extend(f"{relative}/{filename}" for filename in sorted(filenames)
+                     if filename.lower().endswith(IMAGE_EXTENSIONS) and not filename.startswith('.'))
+    return names
+
+
+def _rewrite_variants(builder, variants):
+    rewritten = {}
+    for image, entry in variants.items():
+        entry = dict(entry)
+        for key in ('avif', 'webp', 'jpeg'):
+            if key in entry:
+                entry[key] = builder.resolve_srcset(entry[key], IMAGES_DIR)
+        if 'src' in entry:
+            entry['src'] = builder.resolve(entry['src'], IMAGES_DIR)
+        rewritten[builder.resolve(image, IMAGES_DIR)] = entry
+    return rewritten
+
+
+def _rewrite_sprites(builder, sprites):
+    atlases = [{key: builder.resolve(value, IMAGES_DIR) if key in ('webp', 'jpeg') else value
+                for key, value in atlas.items()} for atlas in sprites.get('atlases', [])]
+    return {**sprites, 'atlases': atlases,
+            'sprites': {builder.resolve(image, IMAGES_DIR): sprite
+                        for image, sprite in sprites.get('sprites', {}).items()}}
+
+
+def _rewrite_index(builder, html):
+    html = HTML_REF_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{builder.resolve(match.group(2))}"', html)
+    assets = {name: builder.manifest[name] for name in DATA_FILES if name in builder.manifest}
+    # Before any script, so app.js finds it whenever it runs
+    snippet = f"<script>window.YUME_ASSETS = {json.dumps(assets, sort_keys=True)};</script>\n    "
+    position = html.find('<script')
+    position = html.find('</head>') if position < 0 else position
+    return html[:position] + snippet + html[position:]
+
+
+def build_dist(root='.', output_dir=DIST_DIR):
+    """Copy the app from root to output_dir with fingerprinted names and return the manifest."""
+    builder = DistBuilder(root, output_dir)
+
+    # Leaves first: every image, then the files that reference them
+    for name in _image_files(root):
+        builder.add_file(name)
+    if builder.exists(SPRITES_CSS):
+        css = builder.read(SPRITES_CSS).decode('utf-8')
+        builder.add_data(SPRITES_CSS, builder.rewrite_css(css, IMAGES_DIR).encode('utf-8'))
+    if builder.exists(VARIANTS_FILE):
+        variants = json.loads(builder.read(VARIANTS_FILE))
+        builder.add_data(VARIANTS_FILE, _json_bytes(_rewrite_variants(builder, variants)))
+    if builder.exists(SPRITES_FILE):
+        sprites = json.loads(builder.read(SPRITES_FILE))
+        builder.add_data(SPRITES_FILE, _json_bytes(_rewrite_sprites(builder, sprites)))
+
+    cameras = json.loads(builder.read(CATALOG_FILE))
+    cameras = [{**camera, 'image': builder.resolve(camera['image'], IMAGES_DIR)} if camera.get('image') else camera
+               for camera in cameras]
+    builder.add_data(CATALOG_FILE, _json_bytes(cameras))
+
+    builder.add_data(STYLESHEET, builder.rewrite_css(builder.read(STYLESHEET).decode('utf-8')).encode('utf-8'))
+    builder.add_file(SCRIPT)
+
+    html = _rewrite_index(builder, builder.read(INDEX_FILE).decode('utf-8'))
+    builder.add_data(INDEX_FILE, html.encode('utf-8'), fingerprint=False)
+    builder.add_data(MANIFEST_FILENAME, json.dumps(builder.manifest, indent=2, sort_keys=True).encode('utf-8'),
+                     fingerprint=False)
+
+    # Files from earlier builds that nothing references any more
+    for directory, _, filenames in os.walk(output_dir):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(directory, filename))
+            if path not in builder.written:
+                os.remove(path)
+    return builder.manifest
@@ -0,0 +1,208 @@
+"""Persistent on-disk HTTP cache with conditional revalidation.
+
+Responses are stored under ``.http-cache/`` as a body file plus a small JSON
+record of the validators (``ETag`` / ``Last-Modified``) the server sent.
+The next request for the same URL carries ``If-None-Match`` /
+``If-Modified-Since``; a ``304 Not Modified`` answer reuses the cached body,
+so refreshing an unchanged catalog costs a few small round trips instead of
+redownloading every page and image.
+
+requests is imported on first use, so the aiohttp download paths that only
+need HttpCache do not pay for it. Requests go through the shared per-host
+rate limiter (see yume_tools.ratelimit).
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from yume_tools import ratelimit, trace
+from yume_tools.stream import CHUNK_SIZE, MAX_BYTES, HashingWriter, copy_file, write_atomic
+
+CACHE_DIR = '.http-cache'
+
+# Browser User-Agent sent by the downloaders (yume_tools.download, sources)
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Response headers kept alongside the cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+@dataclass
+class FileResponse:
+    """Result of download(): the body is on disk at path, never in memory."""
+    url: str
+    status_code: int
+    path: str
+    size: int = 0
+    sha256: Optional[str] = None
+    from_cache: bool = False
+
+    def raise_for_status(self):
+        """Raise requests.HTTPError for 4xx/5xx responses, like requests does."""
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"HTTP {self.status_code} for url: {self.url}")
+
+
+@dataclass
+class CachedResponse:
+    """Minimal response object returned by get(), fresh or from the cache."""
+    url: str
+    status_code: int
+    content: bytes = b''
+    headers: dict = field(default_factory=dict)
+    from_cache: bool = False
+
+    def raise_for_status(self):
+        """Raise requests.HTTPError for 4xx/5xx responses, like requests does."""
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"HTTP {self.status_code} for url: {self.url}")
+
+    @property
+    def text(self):
+        """Body decoded with the charset from Content-Type (UTF-8 by default)."""
+        content_type = self.headers.get('Content-Type', '')
+        charset = 'utf-8'
+        if 'charset=' in content_type:
+            charset = content_type.split('charset=', 1)[1].split(';')[0].strip()
+        return self.content.decode(charset, errors='replace')
+
+
+class HttpCache:
+    """URL-keyed store of response bodies and their validators."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.root, key)
+        return f"{base}.json", f"{base}.body"
+
+    def lookup(self, url):
+        """Return the stored header record for url, or None if not cached."""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a cached url."""
+        meta = self.lookup(url)
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get('ETag'):
+            headers['If-None-Match'] = meta['ETag']
+        if meta.get('Last-Modified'):
+            headers['If-Modified-Since'] = meta['Last-Modified']
+        return headers
+
+    def body_path(self, url):
+        """Return the path of the cached body file for url."""
+        return self._paths(url)[1]
+
+    def read_body(self, url, limit=None):
+        """Return the cached body for url, or only its first limit bytes."""
+        with open(self._paths(url)[1], 'rb') as f:
+            return f.read(-1 if limit is None else limit)
+
+    def store(self, url, headers, body):
+        """Cache a 200 response if the server sent any validator."""
+        meta = {name: headers.get(name) for name in STORED_HEADERS if headers.get(name)}
+        if 'ETag' not in meta and 'Last-Modified' not in meta:
+            return False
+        meta['url'] = url
+
+        meta_path, body_path = self._paths(url)
+        # Body first, then the record, so a record always has its body
+        write_atomic(body_path, body)
+        write_atomic(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+        return True
+
+    def store_file(self, url, headers, file_path):
+        """Like store(), but streams the body from a file instead of memory."""
+        meta = {name: headers.get(name) for name in STORED_HEADERS if headers.get(name)}
+        if 'ETag' not in meta and 'Last-Modified' not in meta:
+            return False
+        meta['url'] = url
+
+        meta_path, body_path = self._paths(url)
+        copy_file(file_path, body_path)
+        write_atomic(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+        return True
+
+
+def get(url, headers=None, timeout=10, cache=None, session=None):
+    """GET url through the cache with the requests library.
+
+    Returns a CachedResponse; from_cache is True when the server answered
+    304 and the stored body was reused.
+    """
+    request_headers = dict(headers or {})
+    if cache is not None:
+        request_headers.update(cache.conditional_headers(url))
+
+    with trace.http_span(url) as event:
+        timer = trace.HttpTimer(event)
+        # Streamed only so headers and body can be timed separately
+        with ratelimit.request(url, session=session, headers=request_headers, timeout=timeout,
+                               stream=True) as response:
+            timer.headers_received(response.status_code)
+            content = response.content
+            timer.body_received(len(content))
+
+        meta = cache.lookup(url) if cache is not None and response.status_code == 304 else None
+        if meta:
+            event['cached'] = True
+            return CachedResponse(url, 200, cache.read_body(url),
+                                  {name: meta[name] for name in STORED_HEADERS if name in meta},
+                                  from_cache=True)
+
+    result = CachedResponse(url, response.status_code, content, response.headers)
+    if response.status_code == 200 and cache is not None:
+        cache.store(url, response.headers, content)
+    return result
+
+
+def download(url, dest_path, headers=None, timeout=30, cache=None, session=None,
+             max_bytes=MAX_BYTES):
+    """Stream url to dest_path through the cache with the requests library.
+
+    The body is written in chunks to a temp file (content encoding already
+    undone) with a running hash and a hard size cap, then renamed into
+    place; SizeLimitExceeded is raised for oversized bodies. Returns a
+    FileResponse; nothing is written unless the status is 200 or a 304 with
+    a cached body.
+    """
+    request_headers = dict(headers or {})
+    if cache is not None:
+        request_headers.update(cache.conditional_headers(url))
+
+    with trace.http_span(url) as event:
+        timer = trace.HttpTimer(event)
+        with ratelimit.request(url, session=session, headers=request_headers, timeout=timeout,
+                               stream=True) as response:
+            timer.headers_received(response.status_code)
+            if response.status_code == 304 and cache is not None and cache.lookup(url):
+                writer = copy_file(cache.body_path(url), dest_path, max_bytes)
+                event['cached'] = True
+                timer.body_received(writer.size)
+                return FileResponse(url, 200, dest_path, writer.size, writer.sha256, from_cache=True)
+
+            if response.status_code != 200:
+                return FileResponse(url, response.status_code, dest_path)
+
+            with HashingWriter(dest_path, max_bytes) as writer:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    writer.write(chunk)
+                timer.body_received(writer.size)
+                writer.commit()
+    if cache is not None:
+        cache.store_file(url, response.headers, dest_path)
+    return FileResponse(url, 200, dest_path, writer.size, writer.sha256)
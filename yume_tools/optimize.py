@@ -0,0 +1,168 @@
+"""Multi-format, multi-size image optimization.
+
+Every source image is resized to a few display widths and encoded as AVIF
+and WebP, plus a progressive JPEG fallback for WebViews that support
+neither. Work is spread across CPU cores with a process pool. The result is
+a variants manifest holding ready-made ``srcset`` strings that ``app.js``
+uses to let the client pick the smallest adequate file.
+
+AVIF and WebP are only produced when the installed Pillow can encode them
+(AVIF needs Pillow 11.2 or later). Without them the manifest has no such
+srcset and ``app.js`` leaves out the ``<source>``.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image
+
+from yume_tools import trace
+from yume_tools.stream import write_atomic
+from yume_tools.sync import write_json_atomic
+
+# Display widths in CSS pixels (the grid shows cards at 150-200px, the
+# booking view at 150px max-height, so "detail" covers 3x screens)
+SIZES = {
+    'thumbnail': 160,
+    'card': 320,
+    'detail': 640,
+}
+
+# Output formats in order of preference, with their encoder settings and
+# the PIL.features name of the codec they need (JPEG is always required)
+FORMATS = {
+    'avif': {'ext': '.avif', 'feature': 'avif', 'save': {'format': 'AVIF', 'quality': 55, 'speed': 6}},
+    'webp': {'ext': '.webp', 'feature': 'webp', 'save': {'format': 'WEBP', 'quality': 80, 'method': 4}},
+    'jpeg': {'ext': '.jpg', 'save': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+OUTPUT_SUBDIR = 'optimized'
+VARIANTS_FILENAME = 'variants.json'
+
+# Variant used for the plain <img src> when srcset is not supported
+FALLBACK_SIZE = 'card'
+
+
+def available_formats():
+    """FORMATS without the ones the installed Pillow cannot encode."""
+    from PIL import features
+
+    return {fmt: spec for fmt, spec in FORMATS.items() if 'feature' not in spec or features.check(spec['feature'])}
+
+
+def target_widths(source_width):
+    """Return {size name: width} for a source, never upscaling past its width."""
+    return {name: min(width, source_width) for name, width in SIZES.items()}
+
+
+def _flatten(img):
+    """Composite an RGBA image onto white for formats without alpha."""
+    if img.mode != 'RGBA':
+        return img
+    background = Image.new('RGB', img.size, (255, 255, 255))
+    background.paste(img, mask=img.getchannel('A'))
+    return background
+
+
+def optimize_image(source_path, output_dir, formats=None):
+    """Write every size/format variant of one image and return its manifest entry.
+
+    formats defaults to available_formats(). Existing variants are kept,
+    since filenames derive from the content-addressed source name and
+    therefore never go stale.
+    """
+    formats = formats or available_formats()
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    prefix = os.path.basename(output_dir)
+
+    with trace.span('decode', path=source_path) as event, Image.open(source_path) as img:
+        source_width, source_height = img.size
+        # JPEG sources are decoded at a reduced scale (1/2, 1/4, 1/8) that
+        # still covers the largest variant, which cuts decode time and memory
+        largest = max(target_widths(source_width).values())
+        img.draft('RGB', (largest, max(1, round(source_height * largest / source_width))))
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+        decoded = img.convert('RGBA') if has_alpha else img.convert('RGB')
+        event.update(format=img.format, width=decoded.width, height=decoded.height)
+
+    entry = {'width': source_width, 'height': source_height}
+    srcsets = {fmt: [] for fmt in formats}
+    seen_widths = set()
+
+    for size_name, width in target_widths(source_width).items():
+        if width in seen_widths:
+            continue
+        seen_widths.add(width)
+
+        height = max(1, round(source_height * width / source_width))
+        if decoded.size == (width, height):
+            resized = decoded
+        else:
+            with trace.span('resize', path=source_path, width=width):
+                resized = decoded.resize((width, height), Image.LANCZOS)
+
+        for fmt, spec in formats.items():
+            filename = f"{stem}-{width}{spec['ext']}"
+            path = os.path.join(output_dir, filename)
+            if not os.path.exists(path):
+                with trace.span('encode', path=path, format=fmt, width=width) as event:
+                    frame = _flatten(resized) if fmt == 'jpeg' else resized
+                    buffer = BytesIO()
+                    frame.save(buffer, **spec['save'])
+                    write_atomic(path, buffer.getvalue())
+                    event['bytes'] = buffer.tell()
+            srcsets[fmt].append(f"{prefix}/{filename} {width}w")
+
+        if size_name == FALLBACK_SIZE or 'src' not in entry:
+            entry['src'] = f"{prefix}/{stem}-{width}{FORMATS['jpeg']['ext']}"
+
+    for fmt, candidates in srcsets.items():
+        entry[fmt] = ', '.join(candidates)
+    return entry
+
+
+def load_variants(images_dir='images'):
+    """Return the current variants manifest, or {} if there is none."""
+    manifest_path = os.path.join(images_dir, VARIANTS_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def optimize_all(filenames, images_dir='images', workers=None):
+    """Optimize images_dir/<filename> for every filename across a process pool.
+
+    Images that already have a manifest entry with a srcset for every
+    available format and its variants on disk are not reprocessed; blobs
+    are content-addressed, so a changed image is a new filename. Writes the
+    variants manifest (covering exactly filenames) next to the images and
+    returns it.
+    """
+    output_dir = os.path.join(images_dir, OUTPUT_SUBDIR)
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = sorted(set(filenames))
+
+    formats = available_formats()
+    existing = load_variants(images_dir)
+    variants = {
+        filename: existing[filename] for filename in filenames
+        if filename in existing and all(fmt in existing[filename] for fmt in formats)
+        and os.path.exists(os.path.join(images_dir, existing[filename]['src']))
+    }
+    pending = [filename for filename in filenames if filename not in variants]
+
+    if pending:
+        skipped = sorted(set(FORMATS) - set(formats))
+        if skipped:
+            print(f"Pillow {Image.__version__} cannot encode {', '.join(skipped)}, skipping those variants")
+        sources = [os.path.join(images_dir, filename) for filename in pending]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = executor.map(optimize_image, sources, [output_dir] * len(sources),
+                                   [formats] * len(sources))
+            variants.update(zip(pending, entries))
+
+    manifest_path = os.path.join(images_dir, VARIANTS_FILENAME)
+    write_json_atomic(manifest_path, variants, indent=2, sort_keys=True)
+    return variants
@@ -0,0 +1,148 @@
+"""Brand palette extraction from the page screenshot.
+
+The screenshot is box-downsampled and its pixels are quantized to 5 bits
+per channel. This leaves a few thousand distinct colors, each weighted by
+its pixel count. A median cut over those colors seeds a weighted k-means
+(both vectorized with NumPy), and the resulting clusters are the palette,
+each with its share of the page. The dominant cluster is the page
+background, the cluster with the most contrast against it is the text
+color, and saturated clusters are the brand colors. No browser round trips
+are involved, and the clustering itself takes a few milliseconds.
+"""
+import numpy as np
+from PIL import Image
+
+from yume_tools import trace
+
+# Longest side of the downsampled screenshot
+MAX_SIDE = 480
+
+# Bits kept per channel before clustering
+QUANT_BITS = 5
+
+PALETTE_SIZE = 8
+KMEANS_ITERATIONS = 20
+
+# Clusters covering less of the page than this are dropped as noise
+MIN_SHARE = 0.002
+
+# (max - min) / max channel spread above which a color counts as a brand
+# color rather than a neutral
+BRAND_SATURATION = 0.25
+
+
+def load_pixels(path, max_side=MAX_SIDE):
+    """Decode an image and return its downsampled pixels as an (N, 3) uint8 array."""
+    with trace.span('decode', path=path, palette=True), Image.open(path) as img:
+        factor = max(1, max(img.size) // max_side)
+        small = img.convert('RGB').reduce(factor) if factor > 1 else img.convert('RGB')
+    return np.asarray(small, dtype=np.uint8).reshape(-1, 3)
+
+
+def weighted_colors(pixels, bits=QUANT_BITS):
+    """Quantize pixels and return the distinct colors (bin centres) with their pixel counts."""
+    shift = 8 - bits
+    quantized = (pixels >> shift).astype(np.uint32)
+    packed = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+    codes, counts = np.unique(packed, return_counts=True)
+    mask = (1 << bits) - 1
+    channels = np.stack([codes >> (2 * bits), (codes >> bits) & mask, codes & mask], axis=1)
+    return (channels << shift) + (1 << shift >> 1), counts.astype(np.float64)
+
+
+def median_cut(colors, weights, k):
+    """Split the color set into k boxes at weighted medians and return their weighted means."""
+    boxes = [np.arange(len(colors))]
+    while len(boxes) < k:
+        # Split the box with the widest channel range, weighted by its pixel count
+        spans = [(np.ptp(colors[box], axis=0).max() * weights[box].sum(), i)
+                 for i, box in enumerate(boxes) if len(box) > 1]
+        if not spans:
+            break
+        _, index = max(spans)
+        box = boxes.pop(index)
+        channel = np.ptp(colors[box], axis=0).argmax()
+        box = box[np.argsort(colors[box, channel], kind='stable')]
+        cumulative = np.cumsum(weights[box])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), len(box) - 1)
+        boxes.extend([box[:split], box[split:]])
+    return np.array([np.average(colors[box], axis=0, weights=weights[box]) for box in boxes])
+
+
+def kmeans(colors, weights, centers, iterations=KMEANS_ITERATIONS):
+    """Refine centers with weighted k-means; return (centers, labels)."""
+    colors = colors.astype(np.float64)
+    labels = None
+    for _ in range(iterations):
+        distances = ((colors[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, weights=weights * colors[:, c], minlength=len(centers))
+                         for c in range(3)], axis=1)
+        occupied = totals > 0
+        centers = centers.copy()
+        centers[occupied] = sums[occupied] / totals[occupied, None]
+    return centers, labels
+
+
+def extract_palette(path, size=PALETTE_SIZE, min_share=MIN_SHARE):
+    """Return [((r, g, b), share)] for the screenshot's main colors, largest share first."""
+    colors, weights = weighted_colors(load_pixels(path))
+    centers, labels = kmeans(colors, weights, median_cut(colors, weights, size))
+    shares = np.bincount(labels, weights=weights, minlength=len(centers)) / weights.sum()
+    palette = [(tuple(int(round(c)) for c in center), float(share))
+               for center, share in zip(centers, shares) if share >= min_share]
+    return sorted(palette, key=lambda item: -item[1])
+
+
+def _luminance(rgb):
+    """Relative luminance as defined by WCAG."""
+    channels = np.array(rgb) / 255
+    linear = np.where(channels <= 0.03928, channels / 12.92, ((channels + 0.055) / 1.055) ** 2.4)
+    return float(linear @ [0.2126, 0.7152, 0.0722])
+
+
+def _contrast(a, b):
+    high, low = sorted((_luminance(a), _luminance(b)), reverse=True)
+    return (high + 0.05) / (low + 0.05)
+
+
+def _saturation(rgb):
+    return (max(rgb) - min(rgb)) / max(rgb) if max(rgb) else 0.0
+
+
+def _css(rgb):
+    return f"rgb({rgb[0]}, {rgb[1]}, {rgb[2]})"
+
+
+def palette_colors(palette):
+    """Name a palette in the yume-colors.json format.
+
+    bg-body is the dominant color and text-body the one with the most
+    contrast against it; the rest are brand-N (saturated) or neutral-N,
+    numbered by share.
+    """
+    if not palette:
+        return {}
+    background = palette[0][0]
+    rest = [rgb for rgb, _ in palette[1:]]
+    colors = {'bg-body': _css(background)}
+    if rest:
+        text = max(rest, key=lambda rgb: _contrast(rgb, background))
+        colors['text-body'] = _css(text)
+        rest.remove(text)
+
+    brands = [rgb for rgb in rest if _saturation(rgb) >= BRAND_SATURATION]
+    neutrals = [rgb for rgb in rest if _saturation(rgb) < BRAND_SATURATION]
+    colors.update((f"brand-{i}", _css(rgb)) for i, rgb in enumerate(brands, 1))
+    colors.update((f"neutral-{i}", _css(rgb)) for i, rgb in enumerate(neutrals, 1))
+    return colors
+
+
+def screenshot_colors(path, size=PALETTE_SIZE):
+    """Extract and name the palette of a screenshot in one call."""
+    return palette_colors(extract_palette(path, size))
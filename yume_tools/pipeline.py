@@ -0,0 +1,429 @@
+"""Make-like runner for the refresh stages.
+
+A refresh is a small DAG::
+
+    scrape -> colors -----------------------------> api
+           -> download -> placeholders ----------> api -> manifest
+                       -> optimize, sprites -----> manifest -> deploy
+
+Every stage declares the files it reads and writes. After a stage succeeds,
+the runner records a fingerprint of both sets (SHA-256 of each file,
+cached by size and mtime) in ``.pipeline-state.json``. On the next run, a
+stage whose inputs and outputs still match its record is skipped.
+``scrape`` and ``download`` always run, because their real input is the
+live site: ``download`` revalidates every product image, so a new picture
+under an old URL is found even when the page is unchanged. Both are cheap
+thanks to the HTTP cache, and when neither changes a file, nothing
+downstream runs. The catalog is passed between stages in the catalog store,
+and ``api`` exports ``camera-data.json`` from it for ``manifest``. A stage's own module is one of its inputs, so changing
+how a stage works also reruns it.
+
+``catalog.db`` is written by ``download`` and then by ``placeholders``. Its
+WAL is checkpointed before it is fingerprinted, so the file holds every
+committed write. When a stage rewrites an output it shares with a stage it
+depends on, that stage's record is brought up to date too, so the earlier
+stage is not rerun for a change that was part of the refresh.
+
+Stages run on a thread pool as soon as their dependencies finish. Palette
+extraction overlaps the image downloads, and placeholders, srcset variants
+and sprite atlases are built at the same time. If a stage fails, the
+stages that depend on it are skipped; the others still run. Whatever a
+stage prints is held back and printed in one piece when it finishes, so
+the output of parallel stages does not interleave.
+"""
+import glob
+import hashlib
+import io
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from yume_tools import trace
+from yume_tools.stream import hash_file
+from yume_tools.sync import write_json_atomic
+
+STATE_FILE = '.pipeline-state.json'
+
+# The scraped page payload handed from the scrape stage to its dependents
+PAYLOAD_FILE = '.page-payload.json'
+
+CATALOG_FILE = 'camera-data.json'
+DB_FILE = 'catalog.db'
+COLORS_FILE = 'yume-colors.json'
+SCREENSHOT_FILE = 'page_screenshot.png'
+
+# Stages run when no targets are given; deploy only runs when asked for
+DEFAULT_TARGETS = ('api', 'manifest')
+
+# Shell command run by the deploy stage from the app root, e.g.
+# "rsync -a --delete dist/ web:/srv/yume/"
+DEPLOY_ENV = 'YUME_DEPLOY_COMMAND'
+
+# Stage outcomes
+RAN, UP_TO_DATE, FAILED, BLOCKED = 'ran', 'up to date', 'failed', 'blocked'
+
+
+@dataclass
+class Stage:
+    """One step of the refresh.
+
+    inputs and outputs are callables returning file paths or glob patterns,
+    evaluated when the stage is about to run, after its dependencies.
+    """
+    name: str
+    run: Callable[[], None]
+    deps: tuple = ()
+    inputs: Callable[[], list] = list
+    outputs: Callable[[], list] = list
+    # Runs every time (its real input is remote)
+    always: bool = False
+    description: Optional[str] = None
+
+
+class FileHashes:
+    """SHA-256 digests of files, reused while a file's size and mtime are unchanged."""
+
+    def __init__(self, cache=None):
+        self.cache = dict(cache or {})
+        self._lock = threading.Lock()
+
+    def digest(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = self.cache.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        digest = hash_file(path)
+        with self._lock:
+            self.cache[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, patterns):
+        """One digest over every file the patterns name (missing files count too)."""
+        combined = hashlib.sha256()
+        for path in expand(patterns):
+            combined.update(f"{path}\0{self.digest(path)}\n".encode('utf-8'))
+        return combined.hexdigest()
+
+    def prune(self):
+        """Forget files that no longer exist."""
+        self.cache = {path: entry for path, entry in self.cache.items() if os.path.exists(path)}
+
+
+def expand(patterns):
+    """Resolve glob patterns to the files they match; plain paths are kept even if missing."""
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            paths.extend(sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)))
+        else:
+            paths.append(pattern)
+    return paths
+
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _say(message):
+    """Print a runner line in one write, so lines from parallel stages do not interleave."""
+    sys.stdout.write(f"{message}\n")
+    sys.stdout.flush()
+
+
+class StageOutput:
+    """Stands in for sys.stdout and keeps what each stage thread prints apart.
+
+    Inside capture() a thread's writes go to its own buffer; every other
+    write goes straight to the real stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    @contextmanager
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _module(name):
+    """Source file of a yume_tools module, so a change to a stage's code reruns it."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py")
+
+
+def _load_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def catalog_db():
+    """catalog.db as a stage input or output, with its WAL checkpointed into the file first."""
+    from yume_tools.catalog_db import CatalogDB
+
+    with CatalogDB(DB_FILE) as db:
+        db.checkpoint()
+    return [DB_FILE]
+
+
+def catalog_images():
+    """Paths of the catalog's images in catalog order (order matters to the atlases)."""
+    from yume_tools.catalog_db import CatalogDB
+
+    with CatalogDB(DB_FILE) as db:
+        return [os.path.join('images', blob) for blob in db.images()]
+
+
+def build_stages(full=False, browser=False, pages=(), workers=None, deploy_command=None):
+    """Return the refresh stages by name, in a valid run order."""
+    from yume_tools import catalog
+
+    def scrape():
+        from yume_tools import http_cache
+
+        payload = catalog.scrape_page(http_cache.HttpCache(), browser, pages, workers)
+        write_json_atomic(PAYLOAD_FILE, payload, indent=2, sort_keys=True)
+
+    def colors():
+        catalog.save_colors(_load_json(PAYLOAD_FILE))
+
+    def download():
+        from yume_tools import http_cache
+
+        # Placeholders are encoded by their own stage, alongside the variants
+        catalog.update_catalog(_load_json(PAYLOAD_FILE), http_cache.HttpCache(), full, encode_placeholders=False)
+
+    def placeholders():
+        from yume_tools.catalog_db import CatalogDB
+
+        with CatalogDB(DB_FILE) as db:
+            encoded = catalog.add_placeholders(db)
+        print(f"Encoded BlurHash placeholders for {encoded} new images")
+
+    def optimize():
+        from yume_tools.optimize import optimize_all
+
+        variants = optimize_all(os.path.basename(path) for path in catalog_images())
+        print(f"Optimized {len(variants)} images and saved srcset manifest to images/variants.json")
+
+    def sprites():
+        from yume_tools.sprites import build_atlases
+
+        manifest = build_atlases(os.path.basename(path) for path in catalog_images())
+        print(f"Packed {len(manifest['sprites'])} thumbnails into {len(manifest['atlases'])} sprite atlas(es)")
+
+    def api():
+        from yume_tools.api import build_api
+
+        print(f"Saved {CATALOG_FILE} and precomputed {len(build_api())} API responses in api/")
+
+    def manifest():
+        from yume_tools.fingerprint import build_dist
+
+        print(f"Copied {len(build_dist())} fingerprinted assets to dist/")
+
+    def deploy():
+        command = deploy_command or os.environ.get(DEPLOY_ENV)
+        if not command:
+            raise RuntimeError(f"no deploy command; pass --deploy-command or set {DEPLOY_ENV}")
+        print(f"$ {command}")
+        subprocess.run(command if os.name == 'nt' else shlex.split(command), check=True)
+
+    stages = [
+        Stage('scrape', scrape, always=True, outputs=lambda: [PAYLOAD_FILE],
+              description="fetch the page and extract its products"),
+        Stage('colors', colors, deps=('scrape',),
+              inputs=lambda: [PAYLOAD_FILE, SCREENSHOT_FILE, _module('catalog'), _module('static_scrape'),
+                              _module('palette')],
+              outputs=lambda: [COLORS_FILE],
+              description="save the page's colors"),
+        # Always run: same-URL images are revalidated, which costs a 304 each
+        Stage('download', download, deps=('scrape',), always=True,
+              inputs=lambda: [PAYLOAD_FILE, _module('catalog'), _module('sync'), _module('download')],
+              outputs=lambda: catalog_db() + ['catalog-state.json', 'images/manifest.json'] + catalog_images(),
+              description="download added and changed product images"),
+        Stage('placeholders', placeholders, deps=('download',),
+              inputs=lambda: catalog_db() + [_module('blurhash')] + catalog_images(),
+              outputs=catalog_db,
+              description="encode BlurHash placeholders"),
+        Stage('optimize', optimize, deps=('download',),
+              inputs=lambda: [_module('optimize')] + catalog_images(),
+              outputs=lambda: ['images/variants.json', 'images/optimized/*'],
+              description="build the AVIF/WebP/JPEG srcset variants"),
+        Stage('sprites', sprites, deps=('download',),
+              inputs=lambda: [_module('sprites')] + catalog_images(),
+              outputs=lambda: ['images/sprites.json', 'images/sprites.css', 'images/sprites/*'],
+              description="pack the grid thumbnails into atlases"),
+        Stage('api', api, deps=('placeholders', 'colors'),
+              inputs=lambda: catalog_db() + [COLORS_FILE, _module('api'), _module('catalog_db')],
+              outputs=lambda: [CATALOG_FILE, 'api/**'],
+              description="export camera-data.json and precompute the API responses"),
+        Stage('manifest', manifest, deps=('api', 'optimize', 'sprites'),
+              inputs=lambda: ['index.html', 'app.js', 'style.css', CATALOG_FILE, 'images/**',
+                              _module('fingerprint')],
+              outputs=lambda: ['dist/**'],
+              description="copy the app to dist/ with content-hashed names"),
+        Stage('deploy', deploy, deps=('manifest',),
+              inputs=lambda: ['dist/**'],
+              description="run the deploy command on dist/"),
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+def _closure(stages, targets):
+    """The targets and everything they depend on, in stage order."""
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(stages[name].deps)
+    return [name for name in stages if name in needed]
+
+
+class PipelineRunner:
+    """Runs the selected stages, skipping up-to-date ones and overlapping independent ones."""
+
+    def __init__(self, stages, state_path=STATE_FILE, force=(), jobs=None):
+        self.stages = stages
+        self.state_path = state_path
+        self.state = load_state(state_path)
+        self.hashes = FileHashes(self.state.get('files'))
+        # Stage names to run even when up to date (True for all of them)
+        self.force = force
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        self._output = None
+
+    def _forced(self, stage):
+        return self.force is True or stage.name in self.force
+
+    def _run_stage(self, stage):
+        with self._lock:
+            record = self.state['stages'].get(stage.name)
+        if record and not stage.always and not self._forced(stage) \
+                and record['inputs'] == self.hashes.fingerprint(stage.inputs()) \
+                and record['outputs'] == self.hashes.fingerprint(stage.outputs()):
+            _say(f"- {stage.name}: up to date")
+            return UP_TO_DATE
+
+        _say(f"▶ {stage.name}: {stage.description}")
+        start = time.perf_counter()
+        with self._output.capture() as output:
+            try:
+                with trace.span('stage', stage=stage.name):
+                    stage.run()
+                error = None
+            except Exception as e:
+                import traceback
+
+                error = e
+                output.write(traceback.format_exc())
+        # The stage's own output goes out in one piece with its outcome
+        captured = output.getvalue()
+        if error is not None:
+            _say(f"{captured}✗ {stage.name} failed: {error}")
+            return FAILED
+
+        # Fingerprinted after the run: a stage may rewrite one of its inputs
+        record = {'inputs': self.hashes.fingerprint(stage.inputs()),
+                  'outputs': self.hashes.fingerprint(stage.outputs())}
+        with self._lock:
+            self.state['stages'][stage.name] = record
+        self._refresh_upstream(stage)
+        _say(f"{captured}✓ {stage.name} ({time.perf_counter() - start:.1f}s)")
+        return RAN
+
+    def _refresh_upstream(self, stage):
+        """Re-fingerprint the outputs of the stages stage depends on that it wrote to as well."""
+        written = set(expand(stage.outputs()))
+        for name in _closure(self.stages, self.stages[stage.name].deps):
+            upstream = self.stages[name]
+            with self._lock:
+                record = self.state['stages'].get(name)
+            if record and written & set(expand(upstream.outputs())):
+                outputs = self.hashes.fingerprint(upstream.outputs())
+                with self._lock:
+                    record['outputs'] = outputs
+
+    def run(self, targets):
+        """Run targets and their dependencies; return {stage name: outcome}."""
+        selected = _closure(self.stages, targets)
+        results = {}
+        self._output = StageOutput(sys.stdout)
+        sys.stdout = self._output
+        try:
+            self._run_all(selected, results)
+        finally:
+            sys.stdout = self._output.stream
+
+        self.hashes.prune()
+        self.state['files'] = self.hashes.cache
+        write_json_atomic(self.state_path, self.state, indent=2, sort_keys=True)
+        return results
+
+    def _run_all(self, selected, results):
+        with ThreadPoolExecutor(max_workers=self.jobs or len(selected)) as executor:
+            running = {}
+            while len(results) < len(selected):
+                for name in selected:
+                    if name in results or name in running.values():
+                        continue
+                    deps = [dep for dep in self.stages[name].deps if dep in selected]
+                    if any(results.get(dep) in (FAILED, BLOCKED) for dep in deps):
+                        results[name] = BLOCKED
+                        _say(f"✗ {name}: skipped, a stage it depends on failed")
+                    elif all(dep in results for dep in deps):
+                        running[executor.submit(self._run_stage, self.stages[name])] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+
+
+def run_pipeline(targets=(), force=False, full=False, jobs=None, browser=False, pages=(), workers=None,
+                 deploy_command=None):
+    """Bring targets (default: the API and dist/) up to date. Returns True if no stage failed."""
+    stages = build_stages(full, browser, pages, workers, deploy_command)
+    forced = True if force else ({'download'} if full else set())
+    start = time.perf_counter()
+    results = PipelineRunner(stages, force=forced, jobs=jobs).run(targets or DEFAULT_TARGETS)
+
+    counts = {outcome: sum(1 for result in results.values() if result == outcome)
+              for outcome in (RAN, UP_TO_DATE, FAILED, BLOCKED)}
+    print(f"\nPipeline finished in {time.perf_counter() - start:.1f}s: "
+          + ", ".join(f"{count} {outcome}" for outcome, count in counts.items() if count))
+    return not counts[FAILED] and not counts[BLOCKED]
@@ -0,0 +1,181 @@
+"""Header-sniffing image prefilter.
+
+Instead of guessing from ``Content-Length`` or downloading and decoding a
+whole file, fetch only the first few KB of every candidate with an HTTP
+``Range`` request and read format, width and height straight from the
+image header. Icons, sprites and vector logos are rejected before any full
+download happens.
+"""
+import asyncio
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+
+from yume_tools import ratelimit, trace
+from yume_tools.download import DEFAULT_CONCURRENCY, DEFAULT_HEADERS, DEFAULT_PER_HOST, limit_hosts
+
+# Bytes requested per candidate; enough for PNG/GIF/WebP headers and for
+# JPEG SOF markers behind typical EXIF blocks
+PROBE_BYTES = 16384
+
+# Anything smaller than this in either dimension is treated as an icon
+MIN_DIMENSION = 100
+
+# JPEG start-of-frame markers that carry the image size
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+@dataclass
+class ImageInfo:
+    """Format and dimensions sniffed from the start of an image."""
+    url: str
+    format: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _jpeg_size(data):
+    """Walk JPEG markers up to the first SOF segment and return (width, height)."""
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[i + 5:i + 9])
+            return width, height
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # Standalone markers
+            i += 2
+            continue
+        segment_length = struct.unpack('>H', data[i + 2:i + 4])[0]
+        i += 2 + segment_length
+    return None
+
+
+def _webp_size(data):
+    """Return (width, height) from a VP8, VP8L or VP8X WebP header."""
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        b0, b1, b2, b3 = data[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b'VP8X' and len(data) >= 30:
+        width = 1 + int.from_bytes(data[24:27], 'little')
+        height = 1 + int.from_bytes(data[27:30], 'little')
+        return width, height
+    return None
+
+
+def sniff_image(data):
+    """Return (format, width, height) from the leading bytes of an image.
+
+    Width and height are None when the header is not fully contained in
+    data or the format carries no pixel size (SVG). format is None for
+    unrecognized content.
+    """
+    size = None
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        fmt = 'png'
+        if len(data) >= 24:
+            size = struct.unpack('>II', data[16:24])
+    elif data.startswith(b'\xff\xd8'):
+        fmt = 'jpeg'
+        size = _jpeg_size(data)
+    elif data[:6] in (b'GIF87a', b'GIF89a'):
+        fmt = 'gif'
+        if len(data) >= 10:
+            size = struct.unpack('<HH', data[6:10])
+    elif data.startswith(b'RIFF') and data[8:12] == b'WEBP':
+        fmt = 'webp'
+        size = _webp_size(data)
+    elif data[4:8] == b'ftyp' and data[8:12] in (b'avif', b'avis'):
+        fmt = 'avif'
+    elif b'<svg' in data[:1024].lower():
+        fmt = 'svg'
+    else:
+        fmt = None
+
+    width, height = size if size else (None, None)
+    return fmt, width, height
+
+
+def is_photo(info, min_dimension=MIN_DIMENSION):
+    """Decide whether a probed candidate looks like a product photo.
+
+    Candidates that could not be probed or whose size is unknown are kept,
+    so the prefilter never drops an image it has not actually seen.
+    """
+    if info.error:
+        return True
+    if info.format == 'svg':
+        return False
+    if info.width is None or info.height is None:
+        return True
+    return info.width >= min_dimension and info.height >= min_dimension
+
+
+async def _probe_one(session, semaphore, url, probe_bytes, cache):
+    """Sniff one URL from the cache or from a ranged GET."""
+    if cache is not None and cache.lookup(url):
+        return ImageInfo(url, *sniff_image(cache.read_body(url, limit=probe_bytes)))
+
+    async with semaphore:
+        with trace.http_span(url) as event:
+            event['probe'] = True
+            timing = {}
+            timer = trace.HttpTimer(event)
+            try:
+                headers = {'Range': f"bytes=0-{probe_bytes - 1}"}
+                async with ratelimit.get_async(session, url, headers=headers,
+                                               trace_request_ctx=timing) as response:
+                    timer.headers_received(response.status)
+                    if response.status not in (200, 206):
+                        return ImageInfo(url, error=f"HTTP {response.status}")
+                    # Servers that ignore Range still only get read this far
+                    data = await response.content.read(probe_bytes)
+                    timer.body_received(len(data))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                event['error'] = str(e) or type(e).__name__
+                return ImageInfo(url, error=event['error'])
+            finally:
+                if 'connect' in timing:
+                    event['connect'] = timing['connect']
+
+    return ImageInfo(url, *sniff_image(data))
+
+
+async def probe_batch_async(urls, headers=None, concurrency=DEFAULT_CONCURRENCY,
+                            per_host=DEFAULT_PER_HOST, timeout=10,
+                            probe_bytes=PROBE_BYTES, cache=None):
+    """Probe every URL concurrently and return one ImageInfo per URL, in order.
+
+    URLs already in the HttpCache are sniffed from the cached body without
+    touching the network.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limit_hosts(urls, per_host)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host or 0,
+                                     keepalive_timeout=30)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers=headers or DEFAULT_HEADERS,
+                                     trace_configs=trace.aiohttp_trace_configs()) as session:
+        tasks = [_probe_one(session, semaphore, url, probe_bytes, cache) for url in urls]
+        return await asyncio.gather(*tasks)
+
+
+def probe_batch(urls, **kwargs):
+    """Blocking wrapper around probe_batch_async for the command-line scripts."""
+    return asyncio.run(probe_batch_async(list(urls), **kwargs))
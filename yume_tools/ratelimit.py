@@ -0,0 +1,276 @@
+"""Adaptive per-host rate limiting shared by every fetch path.
+
+Each host gets a token bucket for its request rate and an AIMD limit on the
+number of requests in flight. Successful responses raise both additively,
+so a healthy host is pushed towards the highest throughput it tolerates.
+429 and 503 responses, other 5xx errors and connection failures halve them
+and block the host for its ``Retry-After`` time or for a jittered
+exponential backoff, whichever is longer. The decrease is applied at most
+once per interval, so one burst of failures does not collapse the limit to
+its floor.
+
+``get_async`` (aiohttp) and ``request`` (requests) wrap a single request.
+They wait for a slot, retry throttled and failed attempts that have not
+started returning a body yet, and report the outcome to the limiter. The
+download, probe and HTTP cache paths all go through the module-level
+``LIMITER``, so one process keeps one view of every host.
+"""
+import email.utils
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from yume_tools import trace, urls
+
+# Starting point and bounds of each host's request rate (requests/second)
+INITIAL_RATE = 10.0
+MIN_RATE = 0.5
+MAX_RATE = 50.0
+RATE_STEP = 0.5
+BURST = 10
+
+# Starting point and bounds of each host's concurrency
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+# Backoff after the nth consecutive failure: uniform(0, BASE * 2**(n - 1)),
+# capped; Retry-After values are honoured up to MAX_RETRY_AFTER
+BACKOFF_BASE = 0.5
+MAX_BACKOFF = 30.0
+MAX_RETRY_AFTER = 120.0
+
+# Minimum time between two multiplicative decreases for one host
+DECREASE_INTERVAL = 1.0
+
+# How often a request waiting only for a free concurrency slot re-checks
+POLL_INTERVAL = 0.02
+
+MAX_ATTEMPTS = 4
+THROTTLE_STATUSES = (429, 503)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def retry_after(headers):
+    """Seconds to wait from a Retry-After header (delta or HTTP date), or None."""
+    value = (headers.get('Retry-After') or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+@dataclass
+class HostState:
+    """Token bucket, AIMD window and backoff state of one host."""
+    rate: float = INITIAL_RATE
+    concurrency: float = INITIAL_CONCURRENCY
+    max_concurrency: int = MAX_CONCURRENCY
+    tokens: float = BURST
+    in_flight: int = 0
+    failures: int = 0
+    blocked_until: float = 0.0
+    decreased_at: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+
+
+class Slot:
+    """One admitted request; record() reports how the host answered."""
+
+    def __init__(self, limiter, host, waited):
+        self.limiter = limiter
+        self.host = host
+        self.waited = waited
+        self.status = None
+        self.retry_after = None
+        self.failed = False
+
+    def record(self, status, headers=None):
+        self.status = status
+        self.retry_after = retry_after(headers) if headers is not None and status in THROTTLE_STATUSES else None
+
+    def record_error(self):
+        self.failed = True
+
+
+class RateLimiter:
+    """Per-host token buckets with AIMD concurrency, safe across threads and event loops."""
+
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def state(self, host):
+        with self._lock:
+            return self._hosts.setdefault(host, HostState())
+
+    def configure(self, host, max_concurrency=None):
+        """Cap a host's concurrency (for hosts that must be treated gently)."""
+        state = self.state(host)
+        with self._lock:
+            if max_concurrency is not None:
+                state.max_concurrency = max(1, max_concurrency)
+                state.concurrency = min(state.concurrency, state.max_concurrency)
+
+    def blocked_for(self, url):
+        """Seconds until url's host accepts requests again after a failure (0 if it does now)."""
+        with self._lock:
+            state = self._hosts.get(urlsplit(url).netloc)
+            return max(0.0, state.blocked_until - time.monotonic()) if state else 0.0
+
+    def _try_acquire(self, host):
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._hosts.setdefault(host, HostState())
+            state.tokens = min(BURST, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.in_flight >= int(state.concurrency):
+                return POLL_INTERVAL
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+            state.in_flight += 1
+            return 0
+
+    def _release(self, slot):
+        now = time.monotonic()
+        with self._lock:
+            state = self._hosts[slot.host]
+            state.in_flight -= 1
+            if slot.failed or (slot.status is not None and slot.status >= 500) or slot.status in THROTTLE_STATUSES:
+                state.failures += 1
+                if now - state.decreased_at >= DECREASE_INTERVAL:
+                    state.decreased_at = now
+                    state.concurrency = max(1.0, state.concurrency / 2)
+                    state.rate = max(MIN_RATE, state.rate / 2)
+                backoff = random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2 ** (state.failures - 1)))
+                state.blocked_until = max(state.blocked_until, now + max(slot.retry_after or 0, backoff))
+            elif slot.status is not None:
+                state.failures = 0
+                state.concurrency = min(state.max_concurrency, state.concurrency + 1 / state.concurrency)
+                state.rate = min(MAX_RATE, state.rate + RATE_STEP)
+
+    def _admitted(self, host, waited):
+        if waited:
+            trace.record('throttle', host=host, duration=round(waited, 6))
+        return Slot(self, host, waited)
+
+    @contextmanager
+    def slot(self, url, errors=()):
+        """Block until url's host admits another request; exceptions in errors count as failures."""
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                break
+            time.sleep(wait)
+        slot = self._admitted(host, time.perf_counter() - start)
+        try:
+            yield slot
+        except errors:
+            slot.record_error()
+            raise
+        finally:
+            self._release(slot)
+
+    @asynccontextmanager
+    async def slot_async(self, url, errors=()):
+        """slot() for asyncio: waits without blocking the event loop."""
+        import asyncio
+
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+        slot = self._admitted(host, time.perf_counter() - start)
+        try:
+            yield slot
+        except errors:
+            slot.record_error()
+            raise
+        finally:
+            self._release(slot)
+
+
+# Shared by every fetch path in the process
+LIMITER = RateLimiter()
+
+
+@asynccontextmanager
+async def get_async(session, url, limiter=None, **kwargs):
+    """``session.get(url)`` (aiohttp) through the limiter, yielding the response.
+
+    Throttled, 5xx and failed attempts are retried up to MAX_ATTEMPTS times
+    before any of the body is handed to the caller. The last response is
+    yielded whatever its status.
+    """
+    import asyncio
+
+    import aiohttp
+
+    limiter = limiter or LIMITER
+    errors = (aiohttp.ClientError, asyncio.TimeoutError)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        async with limiter.slot_async(url, errors) as slot:
+            try:
+                response = await session.get(urls.resolve(url), **kwargs)
+            except errors:
+                if attempt < MAX_ATTEMPTS:
+                    slot.record_error()
+                    continue
+                raise
+            slot.record(response.status, response.headers)
+            if response.status in RETRY_STATUSES and attempt < MAX_ATTEMPTS:
+                response.release()
+                continue
+            try:
+                yield response
+            finally:
+                response.release()
+            return
+
+
+@contextmanager
+def request(url, method='GET', session=None, limiter=None, **kwargs):
+    """``requests.request(method, url)`` through the limiter, yielding the response.
+
+    Retries like get_async. Pass stream=True to time or stream the body.
+    """
+    import requests
+
+    client = session or requests
+    limiter = limiter or LIMITER
+    errors = (requests.ConnectionError, requests.Timeout)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        with limiter.slot(url, errors) as slot:
+            try:
+                response = client.request(method, urls.resolve(url), **kwargs)
+            except errors:
+                if attempt < MAX_ATTEMPTS:
+                    slot.record_error()
+                    continue
+                raise
+            slot.record(response.status_code, response.headers)
+            if response.status_code in RETRY_STATUSES and attempt < MAX_ATTEMPTS:
+                response.close()
+                continue
+            try:
+                yield response
+            finally:
+                response.close()
+            return
@@ -0,0 +1,93 @@
+"""Selenium helpers for scraping the yume.rent catalog.
+
+Everything the scraper needs from the rendered page (CSS custom
+properties, product titles, image sources and natural image sizes) is
+collected by a single script call and returned as one JSON payload, instead
+of one WebDriver round trip per element and attribute. Colors beyond the
+CSS variables come from the screenshot (see yume_tools.palette), not from
+computed styles.
+"""
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from yume_tools import trace
+from yume_tools.static_scrape import PRODUCT_SELECTORS, SECONDARY_PRODUCT_SELECTORS, TITLE_SELECTORS
+
+# How long to wait for products to render before extracting anyway
+READY_TIMEOUT = 15
+
+# True once the document has loaded and the client-side app has rendered
+# product elements. Images not loaded yet report no natural size and are
+# sized by the header probe instead.
+READY_SCRIPT = """
+    return document.readyState === 'complete' &&
+        (document.querySelector(arguments[0]) !== null || document.querySelector(arguments[1]) !== null);
+"""
+
+EXTRACT_SCRIPT = """
+    var productSelectors = arguments[0], secondarySelectors = arguments[1],
+        titleSelectors = arguments[2];
+
+    function imageInfo(img) {
+        return {
+            src: img.currentSrc || img.src || '',
+            alt: img.getAttribute('alt') || '',
+            width: img.naturalWidth || null,
+            height: img.naturalHeight || null
+        };
+    }
+
+    var styles = getComputedStyle(document.documentElement);
+    var cssVars = {};
+    for (var i = 0; i < styles.length; i++) {
+        var prop = styles[i];
+        if (prop.startsWith('--')) {
+            cssVars[prop] = styles.getPropertyValue(prop).trim();
+        }
+    }
+
+    var level = 'primary';
+    var elements = document.querySelectorAll(productSelectors);
+    if (!elements.length) {
+        level = 'secondary';
+        elements = document.querySelectorAll(secondarySelectors);
+    }
+    var products = Array.prototype.map.call(elements, function (elem) {
+        var title = elem.querySelector(titleSelectors);
+        var img = elem.querySelector('img');
+        return {
+            title: title ? title.innerText.trim() : null,
+            image: img ? imageInfo(img) : null
+        };
+    });
+
+    return {
+        cssVars: cssVars,
+        productLevel: level,
+        products: products,
+        images: products.length ? [] : Array.prototype.map.call(document.images, imageInfo)
+    };
+"""
+
+
+def wait_until_ready(driver, timeout=READY_TIMEOUT):
+    """Wait until the page has loaded and products have rendered.
+
+    Returns False if the page was still not ready after timeout seconds;
+    extraction can still proceed on whatever has rendered.
+    """
+    with trace.span('webdriver', call='wait_until_ready') as event:
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script(READY_SCRIPT, PRODUCT_SELECTORS, SECONDARY_PRODUCT_SELECTORS))
+            event['ready'] = True
+        except TimeoutException:
+            event['ready'] = False
+        return event['ready']
+
+
+def extract_page(driver):
+    """Extract CSS variables, products and images from the rendered page in one script call."""
+    with trace.span('webdriver', call='execute_script'):
+        return driver.execute_script(EXTRACT_SCRIPT, PRODUCT_SELECTORS, SECONDARY_PRODUCT_SELECTORS,
+                                     TITLE_SELECTORS)
@@ -0,0 +1,218 @@
+"""Perceptual-hash near-duplicate detection.
+
+Content addressing already stores byte-identical images once. This module
+catches the same photo at another size, crop-free rescale or encoding. Every
+image is decoded once into a 32x32 grayscale thumbnail (JPEGs in draft mode
+at up to 1/8 scale), and dHash and pHash for the whole batch are computed
+with array operations: gradient signs for dHash, and a DCT by two matrix
+products for pHash. Both are 64-bit integers, so the Hamming distance is an
+XOR plus a popcount. All pairs are compared in row blocks, which handles
+thousands of images in well under a second.
+
+Images within the threshold on both hashes are grouped, and each group is
+ordered best first: most pixels, then most bytes (less compression), then
+filename. Hashes are cached per file, so repeated runs only decode new
+images.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from yume_tools import trace
+from yume_tools.sync import write_json_atomic
+
+# Side of the grayscale thumbnail the hashes are computed from
+THUMB_SIZE = 32
+
+# Side of the low-frequency DCT block (pHash) and of the gradient grid (dHash)
+HASH_SIZE = 8
+
+# Maximum Hamming distance (of 64 bits) on each hash for a near-duplicate;
+# rescaled or re-encoded copies of one photo typically differ by 0-6 bits
+PHASH_THRESHOLD = 10
+DHASH_THRESHOLD = 10
+
+# Per-file hash cache, validated by size and mtime
+HASH_CACHE_FILE = '.phash-cache.json'
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif')
+
+# Rows of the pairwise distance matrix computed at a time
+BLOCK_ROWS = 512
+
+
+@dataclass
+class ImageHash:
+    """Perceptual hashes and quality hints for one image file."""
+    path: str
+    width: int
+    height: int
+    size: int
+    dhash: int
+    phash: int
+
+    @property
+    def pixels(self):
+        return self.width * self.height
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis as an n x n matrix."""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    basis[0] /= np.sqrt(2)
+    return basis
+
+
+_DCT = _dct_matrix(THUMB_SIZE)
+
+
+def _thumbnails(path):
+    """Decode one image to (width, height, 32x32 and 8x9 grayscale arrays)."""
+    with trace.span('decode', path=path, thumbnail=True), Image.open(path) as img:
+        width, height = img.size
+        img.draft('L', (THUMB_SIZE, THUMB_SIZE))
+        if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+            # Transparent backgrounds count as white, as they are shown
+            rgba = img.convert('RGBA')
+            gray = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            gray.alpha_composite(rgba)
+            gray = gray.convert('L')
+        else:
+            gray = img.convert('L')
+        thumb = gray.resize((THUMB_SIZE, THUMB_SIZE), Image.BOX)
+        grid = thumb.resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX)
+    return width, height, np.asarray(thumb, dtype=np.float32), np.asarray(grid, dtype=np.int16)
+
+
+def _pack_bits(bits):
+    """Pack an (N, 64) boolean array into N unsigned 64-bit integers."""
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def dhash_batch(grids):
+    """dHash of (N, 8, 9) grayscale grids: is each pixel brighter than its right neighbour."""
+    return _pack_bits((grids[:, :, :-1] > grids[:, :, 1:]).reshape(len(grids), -1))
+
+
+def phash_batch(thumbs):
+    """pHash of (N, 32, 32) thumbnails: low DCT frequencies above their median."""
+    coefficients = (_DCT @ thumbs @ _DCT.T)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(thumbs), -1)
+    # The DC term only reflects overall brightness, so it is left out of the median
+    medians = np.median(coefficients[:, 1:], axis=1)
+    return _pack_bits(coefficients > medians[:, None])
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(values):
+        return np.bitwise_count(values)
+else:
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        return _BYTE_COUNTS[values.view(np.uint8)].reshape(*values.shape, 8).sum(axis=-1)
+
+
+def _load_cache(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def hash_images(paths, cache_file=HASH_CACHE_FILE, workers=None):
+    """Return an ImageHash for every readable image in paths, in order.
+
+    Cached hashes are reused while a file's size and mtime are unchanged.
+    Files Pillow cannot open are skipped. Decoding runs on a thread pool;
+    Pillow releases the GIL while decoding and resizing.
+    """
+    cache = _load_cache(cache_file)
+    stats = {path: os.stat(path) for path in paths}
+    keys = {path: [stats[path].st_size, stats[path].st_mtime_ns] for path in paths}
+    pending = [path for path in paths if cache.get(path, {}).get('key') != keys[path]]
+
+    def decode(path):
+        try:
+            return path, _thumbnails(path)
+        except (OSError, ValueError) as e:
+            print(f"✗ Could not read {path}: {e}")
+            return path, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        decoded = [(path, result) for path, result in executor.map(decode, pending) if result]
+
+    if decoded:
+        thumbs = np.stack([result[2] for _, result in decoded])
+        grids = np.stack([result[3] for _, result in decoded])
+        for (path, (width, height, _, _)), dhash, phash in zip(decoded, dhash_batch(grids), phash_batch(thumbs)):
+            cache[path] = {'key': keys[path], 'width': width, 'height': height,
+                           'dhash': f"{int(dhash):016x}", 'phash': f"{int(phash):016x}"}
+
+    hashes = [
+        ImageHash(path, cache[path]['width'], cache[path]['height'], stats[path].st_size,
+                  int(cache[path]['dhash'], 16), int(cache[path]['phash'], 16))
+        for path in paths if path in cache and cache[path]['key'] == keys[path]
+    ]
+
+    if cache_file and decoded:
+        # Only files that still exist are kept in the cache
+        live = {path: entry for path, entry in cache.items() if os.path.exists(path)}
+        write_json_atomic(cache_file, live, sort_keys=True)
+    return hashes
+
+
+def near_duplicate_pairs(hashes, phash_threshold=PHASH_THRESHOLD, dhash_threshold=DHASH_THRESHOLD):
+    """Return (i, j) index pairs, i < j, within both thresholds."""
+    dhashes = np.array([h.dhash for h in hashes], dtype=np.uint64)
+    phashes = np.array([h.phash for h in hashes], dtype=np.uint64)
+    pairs = []
+    for start in range(0, len(hashes), BLOCK_ROWS):
+        rows = slice(start, start + BLOCK_ROWS)
+        close = ((popcount(phashes[rows, None] ^ phashes[None, :]) <= phash_threshold)
+                 & (popcount(dhashes[rows, None] ^ dhashes[None, :]) <= dhash_threshold))
+        i, j = np.nonzero(close)
+        i += start
+        upper = i < j
+        pairs.extend(zip(i[upper].tolist(), j[upper].tolist()))
+    return pairs
+
+
+def near_duplicate_groups(hashes, phash_threshold=PHASH_THRESHOLD, dhash_threshold=DHASH_THRESHOLD):
+    """Group near-duplicate images, each group ordered best first.
+
+    Groups are the connected components of the near-duplicate pairs, so a
+    chain of close images ends up in one group. Images without a
+    near-duplicate are left out.
+    """
+    parent = list(range(len(hashes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in near_duplicate_pairs(hashes, phash_threshold, dhash_threshold):
+        parent[find(i)] = find(j)
+
+    components = {}
+    for i in range(len(hashes)):
+        components.setdefault(find(i), []).append(hashes[i])
+    groups = [sorted(members, key=lambda h: (-h.pixels, -h.size, h.path))
+              for members in components.values() if len(members) > 1]
+    return sorted(groups, key=lambda group: group[0].path)
+
+
+def image_files(directory):
+    """Return the image files directly inside directory, sorted."""
+    return sorted(
+        os.path.join(directory, filename) for filename in os.listdir(directory)
+        if filename.lower().endswith(IMAGE_EXTENSIONS) and not filename.startswith('.')
+        and os.path.isfile(os.path.join(directory, filename))
+    )
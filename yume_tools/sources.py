@@ -0,0 +1,319 @@
+"""Sample camera image sources for the five catalog placeholders.
+
+Each source fills ``images/`` with the same five target filenames from a
+different place: the images on yume.rent itself (falling back to Wikimedia
+Commons), Pixabay, Flickr or Unsplash. ``SOURCES`` maps the names used by
+``yume-tools download`` to the function that runs each one.
+
+``MIRROR_TABLES`` lists the same tables as mirrors of one another. The
+``mirrors`` source fetches each file with hedged requests across all of
+them and keeps the first valid image, instead of running the sources one
+after another until one works.
+
+aiohttp (through yume_tools.download and yume_tools.probe), lxml and
+Pillow are only imported by the sources that need them.
+"""
+import os
+
+from yume_tools import http_cache, trace
+
+IMAGES_DIR = 'images'
+
+# Target filenames
+TARGET_FILENAMES = [
+    'sony-a7iii.jpg',
+    'canon-eos-r5.jpg',
+    'nikon-z6ii.jpg',
+    'blackmagic-pocket-6k.jpg',
+    'fujifilm-xt4.jpg'
+]
+
+YUME_URL = 'https://yume.rent'
+
+# Headers to mimic a browser visit
+BROWSER_HEADERS = {
+    'User-Agent': http_cache.USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,ru;q=0.8',
+    'Referer': 'https://www.google.com/'
+}
+
+# Add Mozilla user agent and referrer to avoid being blocked
+REFERER_HEADERS = {
+    'User-Agent': http_cache.USER_AGENT,
+    'Referer': 'https://www.google.com/'
+}
+
+# Fallback when yume.rent has no usable images
+WIKIMEDIA_IMAGES = {
+    'sony-a7iii.jpg': 'https://upload.wikimedia.org/wikipedia/commons/thumb/0/0d/Sony_Alpha_7_II.jpg/1200px-Sony_Alpha_7_II.jpg',
+    'canon-eos-r5.jpg': 'https://upload.wikimedia.org/wikipedia/commons/thumb/2/25/Canon_EOS_R5_with_mount_cap.jpg/1200px-Canon_EOS_R5_with_mount_cap.jpg',
+    'nikon-z6ii.jpg': 'https://upload.wikimedia.org/wikipedia/commons/thumb/9/9c/Nikon_Z6_II_%28cropped%29.jpg/1200px-Nikon_Z6_II_%28cropped%29.jpg',
+    'blackmagic-pocket-6k.jpg': 'https://upload.wikimedia.org/wikipedia/commons/d/d7/Blackmagic_Pocket_Cinema_Camera_6K.jpg',
+    'fujifilm-xt4.jpg': 'https://upload.wikimedia.org/wikipedia/commons/b/be/Fujifilm_X-T4.jpg'
+}
+
+# Camera image sources (using reliable, public domain or freely licensed sources)
+PIXABAY_IMAGES = {
+    'sony-a7iii.jpg': 'https://cdn.pixabay.com/photo/2019/10/14/13/38/sony-4549262_1280.jpg',
+    'canon-eos-r5.jpg': 'https://cdn.pixabay.com/photo/2020/08/05/20/56/camera-5466033_1280.jpg',
+    'nikon-z6ii.jpg': 'https://cdn.pixabay.com/photo/2021/01/01/21/09/nikon-5880661_1280.jpg',
+    'blackmagic-pocket-6k.jpg': 'https://cdn.pixabay.com/photo/2021/01/05/07/02/video-camera-5890781_1280.jpg',
+    'fujifilm-xt4.jpg': 'https://cdn.pixabay.com/photo/2019/12/31/09/13/camera-4730434_1280.jpg'
+}
+
+# Camera image URLs from reliable sources that allow direct linking
+FLICKR_IMAGES = {
+    'sony-a7iii.jpg': 'https://live.staticflickr.com/5564/30725680245_6e01dfa2de_b.jpg',
+    'canon-eos-r5.jpg': 'https://live.staticflickr.com/65535/50138388087_db620284c5_b.jpg',
+    'nikon-z6ii.jpg': 'https://live.staticflickr.com/65535/51051550162_6b147605e2_b.jpg',
+    'blackmagic-pocket-6k.jpg': 'https://live.staticflickr.com/65535/48486111867_d496c1ecc5_b.jpg',
+    'fujifilm-xt4.jpg': 'https://live.staticflickr.com/65535/49600169533_cafef60bd5_b.jpg'
+}
+
+# Direct image URLs for cameras from online sources that allow direct embedding
+UNSPLASH_IMAGES = {
+    # Sony Alpha
+    'sony-a7iii.jpg': 'https://images.unsplash.com/photo-1621520291095-aa6c7137f548?q=80&w=1200&auto=format',
+    # Canon camera
+    'canon-eos-r5.jpg': 'https://images.unsplash.com/photo-1502920917128-1aa500764cbd?q=80&w=1200&auto=format',
+    # Nikon camera
+    'nikon-z6ii.jpg': 'https://images.unsplash.com/photo-1617866582289-bbc3e69a682b?q=80&w=1200&auto=format',
+    # Professional video camera
+    'blackmagic-pocket-6k.jpg': 'https://images.unsplash.com/photo-1589872307379-0ffdf9829123?q=80&w=1200&auto=format',
+    # Fujifilm style camera
+    'fujifilm-xt4.jpg': 'https://images.unsplash.com/photo-1588458030516-dbf4dfd41a0d?q=80&w=1200&auto=format'
+}
+
+# Every table that has a copy of each target file, as (mirror name, table,
+# Mirror options), in order of preference. Wikimedia has the actual models;
+# Flickr serves a small "unavailable" image for removed photos.
+MIRROR_TABLES = [
+    ('wikimedia', WIKIMEDIA_IMAGES, {'headers': BROWSER_HEADERS}),
+    ('flickr', FLICKR_IMAGES, {'headers': REFERER_HEADERS, 'min_size': 10000}),
+    ('pixabay', PIXABAY_IMAGES, {'require_image': True}),
+    ('unsplash', UNSPLASH_IMAGES, {}),
+]
+
+# Placeholder colors for Flickr images that could not be downloaded
+PLACEHOLDER_COLORS = {
+    'sony-a7iii.jpg': (30, 144, 255),       # DodgerBlue
+    'canon-eos-r5.jpg': (220, 20, 60),      # Crimson
+    'nikon-z6ii.jpg': (255, 215, 0),        # Gold
+    'blackmagic-pocket-6k.jpg': (0, 0, 0),  # Black
+    'fujifilm-xt4.jpg': (46, 139, 87)       # SeaGreen
+}
+
+
+def list_images(images_dir=IMAGES_DIR):
+    """Print every file in images_dir with its size (partial downloads are hidden)."""
+    print("\nFiles in images directory:")
+    for filename in sorted(os.listdir(images_dir)):
+        file_path = os.path.join(images_dir, filename)
+        if os.path.isfile(file_path) and not filename.startswith('.'):
+            size_kb = os.path.getsize(file_path) / 1024
+            print(f" - {filename} ({size_kb:.1f} KB)")
+
+
+def scrape_yume_rent(cache=None):
+    """Return the URLs of every image referenced on the yume.rent home page.
+
+    img and <source> sources and srcsets, lazy-loading data-* attributes and
+    CSS url() references are collected in one streaming pass (see
+    static_scrape.extract_assets), resolved and deduplicated.
+    """
+    from yume_tools.static_scrape import extract_assets
+
+    print("Scraping yume.rent for camera images...")
+
+    try:
+        # Get the main page (revalidated against the cached copy if we have one)
+        response = http_cache.get(YUME_URL, headers=BROWSER_HEADERS, timeout=10, cache=cache)
+        if response.status_code != 200:
+            print(f"Failed to access yume.rent - Status code: {response.status_code}")
+            return []
+
+        images = extract_assets(response.text, YUME_URL)
+        print(f"Found {len(images)} potential images on yume.rent")
+        return images
+
+    except Exception as e:
+        print(f"Error scraping yume.rent: {e}")
+        return []
+
+
+def download_yume():
+    """Download the product photos from yume.rent, or the Wikimedia fallbacks."""
+    from yume_tools.download import download_batch, print_report
+    from yume_tools.probe import is_photo, probe_batch
+
+    cache = http_cache.HttpCache()
+    yume_images = scrape_yume_rent(cache)
+
+    # Filter for likely camera images (larger images, not icons)
+    camera_images = []
+
+    if yume_images:
+        print("Analyzing images to find camera equipment...")
+
+        # Read width/height from the first few KB of each image instead of
+        # downloading it; icons, sprites and SVG logos are dropped here
+        infos = probe_batch(dict.fromkeys(yume_images), headers=BROWSER_HEADERS, cache=cache)
+        camera_images = [info.url for info in infos if is_photo(info)]
+
+        print(f"Found {len(camera_images)} potential camera images")
+
+    # If we found any images, download them
+    if camera_images:
+        print("\nDownloading images from yume.rent...")
+
+        # Get top 5 images or as many as available; keep per-host concurrency
+        # low to avoid overloading the server
+        jobs = dict(zip(camera_images, TARGET_FILENAMES))
+        print_report(download_batch(jobs, headers=BROWSER_HEADERS, timeout=10, per_host=2, cache=cache))
+    else:
+        print("No suitable images found on yume.rent")
+
+        # Fallback to Wikimedia Commons images
+        print("\nFalling back to Wikimedia Commons images...")
+        jobs = {url: filename for filename, url in WIKIMEDIA_IMAGES.items()}
+        print_report(download_batch(jobs, headers=BROWSER_HEADERS, timeout=10, cache=cache))
+
+    print("\nImage download complete.")
+    print("\nIMPORTANT: Review the downloaded images to make sure they're suitable.")
+    print("If needed, download more specific images manually from yume.rent")
+    list_images()
+
+
+def download_pixabay():
+    """Download the Pixabay sample images."""
+    from yume_tools.download import download_batch, print_report
+
+    print("Downloading camera equipment images...")
+
+    # Download all camera images concurrently
+    jobs = {url: filename for filename, url in PIXABAY_IMAGES.items()}
+    results = download_batch(jobs, require_image=True, cache=http_cache.HttpCache())
+    success_count = print_report(results)
+
+    print(f"\nDownloaded {success_count} of {len(PIXABAY_IMAGES)} images")
+    list_images()
+
+    print("\nIMPORTANT: These are sample public domain images.")
+    print("For your production app, you should download actual product images from yume.rent")
+
+
+def mirrors(filename):
+    """Return every known Mirror of a target file, in order of preference."""
+    from yume_tools.download import Mirror
+
+    return [Mirror(name, table[filename], **options)
+            for name, table, options in MIRROR_TABLES if filename in table]
+
+
+def download_mirrors():
+    """Download each target file from whichever mirror delivers a valid image first."""
+    from yume_tools.download import download_hedged, print_report
+
+    print("Downloading camera images from the fastest mirror...")
+
+    jobs = {filename: mirrors(filename) for filename in TARGET_FILENAMES}
+    results = download_hedged(jobs, cache=http_cache.HttpCache())
+    success_count = print_report(results)
+
+    print(f"\nDownloaded {success_count} of {len(jobs)} camera images")
+    list_images()
+
+    print("\nIMPORTANT: These are sample images from Wikimedia Commons, Flickr, Pixabay and Unsplash.")
+    print("For your production app, download actual product images from yume.rent")
+
+
+def create_placeholder(filename, images_dir=IMAGES_DIR):
+    """Draw a solid-color 800x600 placeholder labelled with the camera model."""
+    from PIL import Image, ImageDraw
+
+    color = PLACEHOLDER_COLORS.get(filename, (100, 100, 100))
+
+    # Create a colored image with text
+    img = Image.new('RGB', (800, 600), color)
+    d = ImageDraw.Draw(img)
+
+    # Add text (camera model)
+    model_name = filename.replace('.jpg', '').replace('-', ' ').upper()
+    d.text((400, 300), model_name, fill=(255, 255, 255), anchor="mm")
+
+    # Save the image
+    path = os.path.join(images_dir, filename)
+    with trace.span('encode', path=path, format='jpeg'):
+        img.save(path)
+
+
+def download_flickr():
+    """Download the Flickr sample images, drawing placeholders for any that fail."""
+    from yume_tools.download import download_batch, print_report
+
+    print("Downloading camera equipment images...")
+
+    # Download all camera images concurrently
+    jobs = {url: filename for filename, url in FLICKR_IMAGES.items()}
+    results = download_batch(jobs, headers=REFERER_HEADERS, min_size=10000, cache=http_cache.HttpCache())  # Larger than 10KB is likely a real image
+    success_count = print_report(results)
+
+    # If we failed to download any images, use a fallback method
+    if success_count < len(FLICKR_IMAGES):
+        print("\nSome images couldn't be downloaded. Creating placeholder images...")
+
+        # Create placeholder colored images for any missing files (downloads
+        # are verified before they are renamed into place, so an existing
+        # file is always a complete image)
+        try:
+            for filename in FLICKR_IMAGES:
+                path = os.path.join(IMAGES_DIR, filename)
+                if not os.path.exists(path):
+                    create_placeholder(filename)
+                    print(f"Created placeholder image for {filename}")
+                    success_count += 1
+        except ImportError:
+            print("PIL (Pillow) library not available. Can't create placeholder images.")
+            print("Install with: pip install Pillow")
+
+    print(f"\nSuccessfully prepared {success_count} of {len(FLICKR_IMAGES)} camera images")
+    list_images()
+
+    print("\nIMPORTANT: These are sample images.")
+    print("For your production app, download actual product images from yume.rent")
+
+
+def download_unsplash():
+    """Download the Unsplash sample images."""
+    from yume_tools.download import download_batch, print_report
+
+    print("Downloading camera equipment images...")
+
+    # Download images concurrently
+    jobs = {url: filename for filename, url in UNSPLASH_IMAGES.items()}
+    results = download_batch(jobs, cache=http_cache.HttpCache())
+    success_count = print_report(results)
+
+    print(f"\nDownloaded {success_count} of {len(UNSPLASH_IMAGES)} camera images.")
+    list_images()
+
+    print("\nIMPORTANT: These are sample images from Unsplash.")
+    print("For your production app, download actual product images from yume.rent")
+    print("Attribution: Images from Unsplash.com used under Unsplash License")
+
+
+# Source name -> (function, script it replaces)
+SOURCES = {
+    'yume': (download_yume, 'parse-yume-images.py'),
+    'camera': (download_pixabay, 'download-camera-images.py'),
+    'direct': (download_flickr, 'download-direct-images.py'),
+    'unsplash': (download_unsplash, 'download-unsplash-images.py'),
+    'mirrors': (download_mirrors, 'download-images.sh'),
+}
+
+
+def download_source(name):
+    """Run one named source, creating images/ first."""
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    SOURCES[name][0]()
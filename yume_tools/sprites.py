@@ -0,0 +1,222 @@
+"""Sprite atlases for the catalog grid.
+
+Every distinct catalog image is scaled to fit a 2x thumbnail box and packed
+into one or a few atlases, so the first render of the grid costs a couple of
+image requests instead of one per product. The layout is shelf packing with
+the thumbnails sorted by decreasing height. Atlases are filled in catalog
+order, so the first atlas holds the images at the top of the grid, and an
+atlas never exceeds MAX_ATLAS_SIDE in either direction. Each atlas is
+written as WebP with a progressive JPEG fallback under a content-hashed
+name. The thumbnails are flattened onto white, so the fallback needs no
+alpha and is a fraction of the size a lossless PNG would be.
+
+``images/sprites.json`` maps every catalog image to its atlas and offsets
+in CSS pixels, and is what ``app.js`` uses. ``images/sprites.css`` has the
+same data as classes, for pages that do not run the app script.
+"""
+import hashlib
+import json
+import math
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from yume_tools import trace
+from yume_tools.stream import write_atomic
+
+# Thumbnails fit this box in device pixels and are shown at half size, so
+# they stay sharp on 2x screens and fit the grid's 130px image area
+THUMB_BOX = (260, 260)
+SCALE = 2
+
+# Largest atlas width and height in device pixels; more images start
+# another atlas
+MAX_ATLAS_SIDE = 2048
+
+# White gap around every thumbnail so neighbours never bleed in (a multiple
+# of SCALE, keeping offsets in whole CSS pixels)
+PADDING = 2
+
+ATLAS_SUBDIR = 'sprites'
+SPRITES_FILENAME = 'sprites.json'
+CSS_FILENAME = 'sprites.css'
+
+WEBP_OPTIONS = {'format': 'WEBP', 'quality': 80, 'method': 4}
+JPEG_OPTIONS = {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}
+
+# Manifest key, file extension and encoder settings of every atlas file
+ATLAS_FORMATS = (('webp', '.webp', WEBP_OPTIONS), ('jpeg', '.jpg', JPEG_OPTIONS))
+
+
+def _thumbnail(path):
+    """Decode an image, flatten it onto white and scale it to fit THUMB_BOX."""
+    with trace.span('decode', path=path, sprite=True), Image.open(path) as img:
+        img.draft('RGB', THUMB_BOX)
+        if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+            rgba = img.convert('RGBA')
+            thumb = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            thumb.alpha_composite(rgba)
+            thumb = thumb.convert('RGB')
+        else:
+            thumb = img.convert('RGB')
+    thumb.thumbnail(THUMB_BOX, Image.LANCZOS)
+    return thumb
+
+
+def shelf_pack(sizes, width):
+    """Place (w, h) rectangles on shelves of the given width.
+
+    Returns one (x, y) per size and the total height. Rectangles are placed
+    tallest first, left to right, and a new shelf starts when the current
+    one is full.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w > width:
+            y += shelf_height
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def _round_up(value):
+    return SCALE * math.ceil(value / SCALE)
+
+
+def _chunks(sizes, max_side=MAX_ATLAS_SIDE):
+    """Split padded sizes, in order, into groups whose area fits one atlas."""
+    budget = max_side * max_side * 0.8
+    chunk, area = [], 0
+    for i, (w, h) in enumerate(sizes):
+        if chunk and area + w * h > budget:
+            yield chunk
+            chunk, area = [], 0
+        chunk.append(i)
+        area += w * h
+    if chunk:
+        yield chunk
+
+
+def _layout(sizes, max_side=MAX_ATLAS_SIDE):
+    """Shelf-pack padded sizes into a roughly square atlas; return (width, positions, height)."""
+    area = sum(w * h for w, h in sizes)
+    width = min(max_side, max(max(w for w, _ in sizes), _round_up(math.sqrt(area * 1.1))))
+    positions, height = shelf_pack(sizes, width)
+    return width, positions, height
+
+
+def layouts(sizes, max_side=MAX_ATLAS_SIDE):
+    """Split padded sizes, in order, into atlases at most max_side wide and high.
+
+    Yields (indexes, width, positions, height) per atlas. A group whose
+    shelves come out taller than max_side is cut short and the rest moves
+    on to the next atlas.
+    """
+    pending = list(range(len(sizes)))
+    while pending:
+        chunk = next(_chunks([sizes[i] for i in pending], max_side))
+        chunk = [pending[i] for i in chunk]
+        while True:
+            width, positions, height = _layout([sizes[i] for i in chunk], max_side)
+            if height <= max_side or len(chunk) == 1:
+                break
+            chunk = chunk[:min(len(chunk) - 1, max(1, len(chunk) * max_side // height))]
+        yield chunk, width, positions, height
+        pending = pending[len(chunk):]
+
+
+def _encode(img, options):
+    buffer = BytesIO()
+    with trace.span('encode', format=options['format'].lower(), width=img.width) as event:
+        img.save(buffer, **options)
+        event['bytes'] = buffer.tell()
+    return buffer.getvalue()
+
+
+def load_sprites(images_dir='images'):
+    """Return the current sprite manifest, or {} if there is none."""
+    manifest_path = os.path.join(images_dir, SPRITES_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def build_atlases(filenames, images_dir='images'):
+    """Pack images_dir/<filename> for every distinct filename into sprite atlases.
+
+    filenames are taken in catalog order. Nothing is rebuilt if the
+    manifest was made from the same images with the same settings. Returns
+    the manifest.
+    """
+    filenames = list(dict.fromkeys(filenames))
+    key = hashlib.sha256(json.dumps([filenames, THUMB_BOX, SCALE, MAX_ATLAS_SIDE, PADDING,
+                                     ATLAS_FORMATS]).encode('utf-8')).hexdigest()[:16]
+    existing = load_sprites(images_dir)
+    if existing.get('key') == key and all(
+            os.path.exists(os.path.join(images_dir, atlas[fmt])) for atlas in existing['atlases']
+            for fmt, _, _ in ATLAS_FORMATS):
+        return existing
+
+    thumbs = [_thumbnail(os.path.join(images_dir, filename)) for filename in filenames]
+    # Slots are rounded up to whole CSS pixels so every offset is integral
+    padded = [(_round_up(thumb.width + 2 * PADDING), _round_up(thumb.height + 2 * PADDING)) for thumb in thumbs]
+
+    output_dir = os.path.join(images_dir, ATLAS_SUBDIR)
+    os.makedirs(output_dir, exist_ok=True)
+    atlases, sprites = [], {}
+    for index, (chunk, width, positions, height) in enumerate(layouts(padded)):
+        sheet = Image.new('RGB', (width, height), (255, 255, 255))
+        for i, (x, y) in zip(chunk, positions):
+            sheet.paste(thumbs[i], (x + PADDING, y + PADDING))
+            sprites[filenames[i]] = {
+                'atlas': index,
+                'x': (x + PADDING) // SCALE, 'y': (y + PADDING) // SCALE,
+                'width': thumbs[i].width / SCALE, 'height': thumbs[i].height / SCALE,
+            }
+
+        atlas = {'width': width // SCALE, 'height': height // SCALE}
+        for fmt, ext, options in ATLAS_FORMATS:
+            data = _encode(sheet, options)
+            filename = f"atlas-{index}-{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            write_atomic(os.path.join(output_dir, filename), data)
+            atlas[fmt] = f"{ATLAS_SUBDIR}/{filename}"
+        atlases.append(atlas)
+
+    # Atlases from earlier builds are no longer referenced
+    current = {os.path.basename(atlas[fmt]) for atlas in atlases for fmt, _, _ in ATLAS_FORMATS}
+    for filename in os.listdir(output_dir):
+        if filename.startswith('atlas-') and filename not in current:
+            os.remove(os.path.join(output_dir, filename))
+
+    manifest = {'key': key, 'atlases': atlases, 'sprites': sprites}
+    write_atomic(os.path.join(images_dir, CSS_FILENAME), sprites_css(manifest).encode('utf-8'))
+    write_atomic(os.path.join(images_dir, SPRITES_FILENAME),
+                 json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def sprite_class(filename):
+    """CSS class name for a catalog image's sprite."""
+    return f"sprite-{os.path.splitext(filename)[0]}"
+
+
+def sprites_css(manifest):
+    """Render the manifest as CSS classes (paths relative to images/)."""
+    lines = []
+    for index, atlas in enumerate(manifest['atlases']):
+        lines.append(
+            f".sprite-atlas-{index} {{ background-image: url({atlas['jpeg']}); "
+            f"background-image: image-set(url({atlas['webp']}) type(\"image/webp\"), url({atlas['jpeg']}) type(\"image/jpeg\")); "
+            f"background-size: {atlas['width']:g}px {atlas['height']:g}px; background-repeat: no-repeat; }}")
+    for filename, sprite in sorted(manifest['sprites'].items()):
+        lines.append(
+            f".{sprite_class(filename)} {{ width: {sprite['width']:g}px; height: {sprite['height']:g}px; "
+            f"background-position: -{sprite['x']:g}px -{sprite['y']:g}px; }}")
+    return '\n'.join(lines) + '\n'
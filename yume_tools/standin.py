@@ -0,0 +1,190 @@
+"""Local stand-in for yume.rent and the image CDNs.
+
+The server answers ``/<host>/<path>`` for any host: the yume.rent home page
+is the checked-in ``page_source.html`` and every other path gets one of the
+images in ``images/``, picked deterministically from the path. Latency,
+bandwidth and error injection (404, 429, truncated bodies) are
+configurable, and bytes sent are counted, so the pipeline scripts can be
+benchmarked without touching the network.
+
+Clients are pointed at a running stand-in by setting ``YUME_STANDIN_URL``;
+every fetch path passes its URLs through yume_tools.urls.resolve(). This
+module is only loaded by the benchmarks.
+"""
+import email.utils
+import hashlib
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Hosts whose root path is served from page_source.html
+PAGE_HOSTS = ('yume.rent', 'www.yume.rent')
+
+CONTENT_TYPES = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg',
+                 '.webp': 'image/webp', '.avif': 'image/avif', '.gif': 'image/gif'}
+
+ERROR_KINDS = ('404', '429', 'truncate')
+
+
+class StandinConfig:
+    """Behaviour knobs and traffic counters shared by all request handlers."""
+
+    def __init__(self, root='.', latency=0.0, bandwidth=None, error_rate=0.0,
+                 errors=ERROR_KINDS, seed=0, host_latency=None):
+        self.page_path = os.path.join(root, 'page_source.html')
+        images_dir = os.path.join(root, 'images')
+        self.images = sorted(
+            os.path.join(images_dir, filename) for filename in os.listdir(images_dir)
+            if os.path.splitext(filename)[1].lower() in CONTENT_TYPES
+        )
+        self.latency = latency
+        # Host -> latency overriding the default, to simulate a slow mirror
+        self.host_latency = dict(host_latency or {})
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.errors = tuple(errors)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero the request and byte counters."""
+        with self.lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.injected = {kind: 0 for kind in ERROR_KINDS}
+
+    def pick_error(self):
+        """Return an error kind to inject for this request, or None."""
+        with self.lock:
+            if self.errors and self.random.random() < self.error_rate:
+                kind = self.random.choice(self.errors)
+                self.injected[kind] += 1
+                return kind
+        return None
+
+    def count(self, sent):
+        with self.lock:
+            self.bytes_sent += sent
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _resolve(self):
+        """Return (file path, content type) for the requested /<host>/<path>."""
+        host, _, path = urlsplit(self.path).path.lstrip('/').partition('/')
+        if host in PAGE_HOSTS and path in ('', 'index.html'):
+            return self.config.page_path, 'text/html; charset=utf-8'
+        if not self.config.images:
+            return None, None
+        index = zlib.crc32(f"{host}/{path}".encode('utf-8')) % len(self.config.images)
+        image_path = self.config.images[index]
+        return image_path, CONTENT_TYPES[os.path.splitext(image_path)[1].lower()]
+
+    def _send_body(self, data):
+        """Write data, throttled to the configured bandwidth."""
+        chunk_size = 16 * 1024
+        for offset in range(0, len(data), chunk_size):
+            chunk = data[offset:offset + chunk_size]
+            if self.config.bandwidth:
+                time.sleep(len(chunk) / self.config.bandwidth)
+            try:
+                self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            self.config.count(len(chunk))
+
+    def _respond(self, send_body):
+        with self.config.lock:
+            self.config.requests += 1
+        host = urlsplit(self.path).path.lstrip('/').partition('/')[0]
+        latency = self.config.host_latency.get(host, self.config.latency)
+        if latency:
+            time.sleep(latency)
+
+        error = self.config.pick_error()
+        if error == '429':
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        path, content_type = self._resolve()
+        if error == '404' or path is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+        last_modified = email.utils.formatdate(os.path.getmtime(path), usegmt=True)
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        # Single byte ranges, honoured only while If-Range (if sent) still matches
+        status = 200
+        total = len(data)
+        range_header = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if range_header.startswith('bytes=') and if_range in (None, etag, last_modified):
+            start, _, end = range_header[len('bytes='):].partition('-')
+            if start.isdigit() and int(start) >= total:
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{total}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if start.isdigit() and (not end or end.isdigit()):
+                start = int(start)
+                end = min(int(end), total - 1) if end else total - 1
+                if (start, end) != (0, total - 1):
+                    status = 206
+                    data = data[start:end + 1]
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f"bytes {start}-{end}/{total}")
+        if error == 'truncate':
+            # Promise the full length, send half, then drop the connection
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+
+        if send_body:
+            self._send_body(data[:len(data) // 2] if error == 'truncate' else data)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+
+def start_standin(config, host='127.0.0.1', port=0):
+    """Start the stand-in in a background thread and return (server, base URL)."""
+    handler = type('ConfiguredStandinHandler', (StandinHandler,), {'config': config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
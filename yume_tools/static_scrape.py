@@ -0,0 +1,221 @@
+"""Browserless catalog extraction from the served HTML.
+
+The product markup of yume.rent is already present in the HTML the server
+returns, so most runs do not need a browser at all. This module applies the
+same selector cascade the Selenium scraper uses, compiled once to XPath
+with cssselect and evaluated by lxml, and returns a payload in the same
+shape as ``yume_tools.scrape.extract_page``.
+
+``extract_assets`` finds every image a page references in a single pass
+over lxml's parser events, without building a tree: ``<img>`` and
+``<source>`` sources and srcsets, lazy-loading ``data-*`` attributes,
+``url()`` in inline styles and ``<style>`` blocks. HTML can be fed to it in
+chunks as it arrives.
+"""
+import re
+from urllib.parse import urljoin
+
+import lxml.etree
+import lxml.html
+from cssselect import HTMLTranslator
+
+# Selector cascade used to find product elements, most specific first
+PRODUCT_SELECTORS = '.product-card, .camera-card, .equipment-card, [class*="product"], [class*="camera"], [class*="equipment"]'
+SECONDARY_PRODUCT_SELECTORS = 'div:has(img):has(h2), div:has(img):has(h3), div:has(img):has(h4), div:has(img):has(p)'
+TITLE_SELECTORS = 'h2, h3, h4, [class*="title"], [class*="name"]'
+
+# Hex-valued CSS custom properties declared in <style> blocks
+CSS_VAR_PATTERN = re.compile(r'(--[\w-]+)\s*:\s*(#[0-9a-fA-F]{3,8})\b')
+
+_translator = HTMLTranslator()
+_PRODUCT_XPATH = lxml.etree.XPath(_translator.css_to_xpath(PRODUCT_SELECTORS))
+_SECONDARY_XPATH = lxml.etree.XPath(_translator.css_to_xpath(SECONDARY_PRODUCT_SELECTORS))
+# Descendants only, like element.querySelector()
+_TITLE_XPATH = lxml.etree.XPath(_translator.css_to_xpath(TITLE_SELECTORS, prefix='descendant::'))
+_IMG_XPATH = lxml.etree.XPath('descendant::img')
+
+# url(...) in CSS, quoted or not
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)')
+
+# One srcset candidate's URL (its descriptors run to the next comma)
+SRCSET_URL_PATTERN = re.compile(r'[\s,]*(\S+)')
+
+# Attributes that hold a single image URL or a srcset, on any element;
+# the data-* ones are used by lazy-loading scripts
+URL_ATTRIBUTES = ('src', 'data-src', 'data-lazy-src', 'data-original', 'poster')
+SRCSET_ATTRIBUTES = ('srcset', 'data-srcset', 'imagesrcset')
+
+# Elements whose URL attributes are images (<link> only with rel=preload as=image)
+IMAGE_ELEMENTS = {'img', 'source', 'video', 'input'}
+
+# url() references in CSS also point at fonts and cursors; only these are kept
+CSS_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif')
+
+# Bytes of HTML handed to the parser at a time when given a whole document
+FEED_SIZE = 64 * 1024
+
+
+def _dimension(value):
+    """Parse a width/height attribute, or None when it is not a plain integer."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _image_info(img, base_url):
+    src = img.get('src') or ''
+    return {
+        'src': urljoin(base_url, src) if src else '',
+        'alt': img.get('alt') or '',
+        'width': _dimension(img.get('width')),
+        'height': _dimension(img.get('height')),
+    }
+
+
+def _text(elem):
+    return ' '.join(elem.text_content().split())
+
+
+def extract_html(html, base_url):
+    """Extract CSS variables, products and images from an HTML document."""
+    doc = lxml.html.fromstring(html)
+
+    css_vars = {}
+    for style in doc.iter('style'):
+        css_vars.update(CSS_VAR_PATTERN.findall(style.text or ''))
+
+    level = 'primary'
+    elements = _PRODUCT_XPATH(doc)
+    if not elements:
+        level = 'secondary'
+        elements = _SECONDARY_XPATH(doc)
+
+    products = []
+    for elem in elements:
+        titles = _TITLE_XPATH(elem)
+        images = _IMG_XPATH(elem)
+        products.append({
+            'title': _text(titles[0]) if titles else None,
+            'image': _image_info(images[0], base_url) if images else None,
+        })
+
+    return {
+        'cssVars': css_vars,
+        'productLevel': level,
+        'products': products,
+        'images': [] if products else [_image_info(img, base_url) for img in doc.iter('img')],
+    }
+
+
+def page_colors(payload):
+    """Build the yume-colors.json mapping from the page's hex CSS custom properties.
+
+    Returns {} when the page defines none; the palette of the screenshot is
+    used instead (see yume_tools.palette).
+    """
+    return {var_name.replace('--', ''): color_value
+            for var_name, color_value in payload['cssVars'].items()
+            if color_value.startswith('#')}
+
+
+def srcset_urls(srcset):
+    """Return the URLs of a srcset attribute's candidates, as the HTML spec splits them."""
+    urls = []
+    position = 0
+    while True:
+        match = SRCSET_URL_PATTERN.match(srcset, position)
+        if not match:
+            return urls
+        url, position = match.group(1), match.end()
+        if url.endswith(','):
+            url = url.rstrip(',')
+        else:
+            comma = srcset.find(',', position)
+            position = len(srcset) if comma < 0 else comma + 1
+        if url:
+            urls.append(url)
+
+
+def css_image_urls(css):
+    """Return the image URLs referenced with url() in a stylesheet or style attribute."""
+    return [url for _, url in CSS_URL_PATTERN.findall(css)
+            if url.split('?', 1)[0].split('#', 1)[0].lower().endswith(CSS_IMAGE_EXTENSIONS)]
+
+
+class AssetCollector:
+    """lxml parser target that records image URLs as start tags stream past.
+
+    No elements are built; only the text of <style> blocks is buffered.
+    close() returns the URLs, resolved against the page (or its <base>) and
+    deduplicated in document order.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.urls = {}
+        self._style = None
+        self._base_seen = False
+
+    def _add(self, url):
+        url = url.strip()
+        if url and not url.startswith(('data:', 'javascript:', '#')):
+            self.urls.setdefault(urljoin(self.base_url, url))
+
+    def start(self, tag, attrib):
+        if tag == 'base' and attrib.get('href') and not self._base_seen:
+            # Only the first <base> counts
+            self._base_seen = True
+            self.base_url = urljoin(self.base_url, attrib['href'])
+        elif tag == 'style':
+            self._style = []
+        if tag in IMAGE_ELEMENTS or (tag == 'link' and attrib.get('as') == 'image'):
+            if tag == 'link' and attrib.get('href'):
+                self._add(attrib['href'])
+            for name in URL_ATTRIBUTES:
+                if attrib.get(name):
+                    self._add(attrib[name])
+            for name in SRCSET_ATTRIBUTES:
+                for url in srcset_urls(attrib.get(name) or ''):
+                    self._add(url)
+        elif 'data-src' in attrib or 'data-srcset' in attrib:
+            # Lazy-loaded backgrounds on arbitrary elements
+            self._add(attrib.get('data-src') or '')
+            for url in srcset_urls(attrib.get('data-srcset') or ''):
+                self._add(url)
+        style = attrib.get('style')
+        if style and 'url(' in style:
+            for url in css_image_urls(style):
+                self._add(url)
+
+    def data(self, text):
+        if self._style is not None:
+            self._style.append(text)
+
+    def end(self, tag):
+        if tag == 'style' and self._style is not None:
+            for url in css_image_urls(''.join(self._style)):
+                self._add(url)
+            self._style = None
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return list(self.urls)
+
+
+def extract_assets(html, base_url):
+    """Return every image URL referenced by an HTML document, in one streaming pass.
+
+    html is a str, bytes, or an iterable of str/bytes chunks (e.g. a
+    response body as it downloads). URLs are absolute and unique, in the
+    order they first appear.
+    """
+    parser = lxml.etree.HTMLParser(target=AssetCollector(base_url))
+    chunks = html
+    if isinstance(html, (str, bytes)):
+        chunks = (html[offset:offset + FEED_SIZE] for offset in range(0, len(html), FEED_SIZE))
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
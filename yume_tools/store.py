@@ -0,0 +1,93 @@
+"""Content-addressed image store.
+
+Blobs are stored once under their content hash (``<sha256 prefix><ext>``) and
+a JSON manifest maps catalog names to blob filenames. Byte-identical images
+scraped under different product names therefore share a single file, which
+is also downloaded and cached only once by the Telegram WebView.
+"""
+import hashlib
+import json
+import os
+
+from yume_tools.stream import copy_file, hash_file, write_atomic
+from yume_tools.sync import write_json_atomic
+
+STORE_DIR = 'images'
+MANIFEST_FILENAME = 'manifest.json'
+
+# Hex digits of the SHA-256 digest kept in blob filenames
+HASH_LENGTH = 16
+
+
+def content_hash(data):
+    """Return the hex SHA-256 digest of data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_filename(digest, ext):
+    """Build the blob filename for a digest, e.g. ``cf9acb07d5e9b445.png``."""
+    return f"{digest[:HASH_LENGTH]}{ext}"
+
+
+class ImageStore:
+    """Hash -> blob storage plus a name -> blob manifest."""
+
+    def __init__(self, root=STORE_DIR, manifest_filename=MANIFEST_FILENAME):
+        self.root = root
+        self.manifest_path = os.path.join(root, manifest_filename)
+        os.makedirs(root, exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def path(self, blob):
+        """Return the on-disk path of a blob."""
+        return os.path.join(self.root, blob)
+
+    def get(self, name):
+        """Return the blob filename for a catalog name, or None."""
+        return self.manifest.get(name)
+
+    def put_bytes(self, name, data, ext):
+        """Store data under its content hash and point name at it.
+
+        Returns the blob filename. Nothing is written if an identical blob
+        is already in the store.
+        """
+        blob = blob_filename(content_hash(data), ext)
+        path = self.path(blob)
+        if not os.path.exists(path):
+            write_atomic(path, data)
+        self.manifest[name] = blob
+        return blob
+
+    def put_file(self, name, file_path, ext=None, move=False, digest=None):
+        """Store an existing file and return the blob filename.
+
+        The file is hashed in chunks rather than read into memory (pass
+        digest if it is already known). ext defaults to the file's own
+        extension. With move=True the file is renamed into the store instead
+        of copied.
+        """
+        if ext is None:
+            ext = os.path.splitext(file_path)[1].lower()
+        blob = blob_filename(digest or hash_file(file_path), ext)
+        path = self.path(blob)
+        if os.path.exists(path):
+            if move:
+                os.remove(file_path)
+        elif move:
+            os.replace(file_path, path)
+        else:
+            copy_file(file_path, path)
+        self.manifest[name] = blob
+        return blob
+
+    def blobs(self):
+        """Return the set of blob filenames referenced by the manifest."""
+        return set(self.manifest.values())
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        write_json_atomic(self.manifest_path, self.manifest, indent=2, sort_keys=True)
@@ -0,0 +1,243 @@
+"""Bounded-memory streaming writes.
+
+Downloads are written chunk by chunk to a temp file next to their
+destination while a running SHA-256 and byte count are kept. A hard
+per-file size cap aborts oversized bodies early. Only a complete file is
+renamed into place, so memory use stays flat however large the source is
+and an interrupted transfer never leaves a truncated file behind.
+
+A resumable writer uses a fixed temp path (``.<name>.part``) instead of a
+random one, and keeps it when the transfer is interrupted. A sidecar file
+records the source URL and its validator, so the next attempt can ask for
+the remaining bytes with an HTTP Range request.
+
+Exports use the same writer: ``JsonArrayWriter`` streams a JSON array
+element by element, so a catalog export never holds the whole list.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from yume_tools import trace
+
+CHUNK_SIZE = 64 * 1024
+
+# Hard cap on a single downloaded file (after content decoding)
+MAX_BYTES = 50 * 1024 * 1024
+
+# mkstemp creates files readable only by their owner; committed files get
+# the usual permissions instead
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+
+class SizeLimitExceeded(Exception):
+    """Raised when a streamed body grows past its size cap."""
+
+
+def partial_path(dest_path):
+    """Fixed temp path that a resumable download of dest_path writes to."""
+    directory, filename = os.path.split(dest_path)
+    return os.path.join(directory, f".{filename}.part")
+
+
+class HashingWriter:
+    """Write chunks to a temp file, hashing and counting them as they arrive.
+
+    Use as a context manager: the temp file is removed unless commit() was
+    called. With resume=True the writer continues an earlier partial file
+    (size, sha256 and source describe what is already there). The partial
+    file is kept if the block exits with an exception other than
+    SizeLimitExceeded, so an interrupted transfer can be resumed.
+    """
+
+    def __init__(self, dest_path, max_bytes=MAX_BYTES, resume=False):
+        self.dest_path = dest_path
+        self.max_bytes = max_bytes
+        self.resume = resume
+        self.size = 0
+        self.source = {}
+        self._hash = hashlib.sha256()
+        self._write_time = 0.0
+        if resume:
+            self.tmp_path = partial_path(dest_path)
+            if os.path.exists(self.tmp_path) and os.path.exists(self._source_path):
+                with open(self._source_path) as f:
+                    self.source = json.load(f)
+                # The hash has to cover the bytes already on disk
+                for chunk in iter_file(self.tmp_path):
+                    self._hash.update(chunk)
+                    self.size += len(chunk)
+            self._file = open(self.tmp_path, 'ab' if self.size else 'wb')
+        else:
+            fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest_path) or '.',
+                                                 prefix='.', suffix='.part')
+            self._file = os.fdopen(fd, 'wb')
+
+    @property
+    def _source_path(self):
+        return f"{self.tmp_path}.json"
+
+    def begin(self, source):
+        """Record where the partial file's bytes come from (URL and validator)."""
+        self.source = source
+        if self.resume:
+            with open(self._source_path, 'w') as f:
+                json.dump(source, f)
+
+    def restart(self):
+        """Drop the bytes written so far and start the file over."""
+        self._file.seek(0)
+        self._file.truncate()
+        self.size = 0
+        self.source = {}
+        self._hash = hashlib.sha256()
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise SizeLimitExceeded(f"body exceeds the {self.max_bytes}-byte size cap")
+        self._hash.update(chunk)
+        start = time.perf_counter()
+        self._file.write(chunk)
+        self._write_time += time.perf_counter() - start
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def close(self):
+        """Flush the temp file so it can be read (e.g. verified) before commit()."""
+        if not self._file.closed:
+            self._file.close()
+
+    def commit(self):
+        """Flush and atomically rename the temp file to its destination."""
+        start = time.perf_counter()
+        self.close()
+        os.chmod(self.tmp_path, FILE_MODE)
+        os.replace(self.tmp_path, self.dest_path)
+        self._remove_source()
+        self.tmp_path = None
+        # Time spent in write() calls plus the final flush and rename
+        trace.record('write', path=self.dest_path, bytes=self.size,
+                     duration=self._write_time + time.perf_counter() - start)
+
+    def commit_if_changed(self):
+        """Commit unless the destination already holds the same bytes; return True if it was written.
+
+        Leaving an unchanged file alone keeps its mtime, so watchers and
+        fingerprint caches do not see a change.
+        """
+        self.close()
+        if os.path.exists(self.dest_path) and os.path.getsize(self.dest_path) == self.size \
+                and hash_file(self.dest_path) == self.sha256:
+            self.abort()
+            return False
+        self.commit()
+        return True
+
+    def abort(self):
+        """Discard the temp file."""
+        self.close()
+        if self.tmp_path and os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self._remove_source()
+        self.tmp_path = None
+
+    def keep(self):
+        """Close the temp file but leave it, with its source, for a later resume."""
+        self.close()
+        self.tmp_path = None
+
+    def _remove_source(self):
+        if self.resume and os.path.exists(self._source_path):
+            os.remove(self._source_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.tmp_path:
+            interrupted = exc_type is not None and not issubclass(exc_type, SizeLimitExceeded)
+            if self.resume and interrupted and self.size:
+                self.keep()
+            else:
+                self.abort()
+        return False
+
+
+def write_atomic(path, data, skip_unchanged=False):
+    """Write bytes to path through a temp file and rename, so readers never see a partial file.
+
+    With skip_unchanged a file that already holds data is left untouched.
+    Every whole-file write in the package goes through here.
+    """
+    with HashingWriter(path, max_bytes=None) as writer:
+        writer.write(data)
+        if skip_unchanged:
+            return writer.commit_if_changed()
+        writer.commit()
+        return True
+
+
+class JsonArrayWriter:
+    """Write a JSON array to sink (anything with write(bytes)) one element at a time.
+
+    kwargs are passed to json.dumps for each element. The output is
+    byte for byte what json.dumps(items, **kwargs) gives for the whole list.
+    """
+
+    def __init__(self, sink, **kwargs):
+        self.sink = sink
+        self.kwargs = kwargs
+        self.count = 0
+        indent = kwargs.get('indent')
+        if indent is None:
+            self._open, self._close, self._newline = '[', ']', None
+            self._separator = kwargs.get('separators', (', ', ': '))[0]
+        else:
+            # Each element is indented one level further inside the array
+            self._newline = '\n' + (' ' * indent if isinstance(indent, int) else indent)
+            self._open, self._close = '[' + self._newline, '\n]'
+            self._separator = kwargs.get('separators', (',', ': '))[0] + self._newline
+
+    def append(self, item):
+        text = json.dumps(item, **self.kwargs)
+        if self._newline:
+            text = text.replace('\n', self._newline)
+        self.sink.write(((self._separator if self.count else self._open) + text).encode('utf-8'))
+        self.count += 1
+
+    def close(self):
+        self.sink.write((self._close if self.count else '[]').encode('utf-8'))
+
+
+def iter_file(path, chunk_size=CHUNK_SIZE):
+    """Yield a file's contents in chunks."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def hash_file(path):
+    """Return the hex SHA-256 of a file without reading it into memory at once."""
+    digest = hashlib.sha256()
+    for chunk in iter_file(path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file(src_path, dest_path, max_bytes=None):
+    """Stream src_path to dest_path atomically and return the writer (size, sha256)."""
+    with HashingWriter(dest_path, max_bytes) as writer:
+        for chunk in iter_file(src_path):
+            writer.write(chunk)
+        writer.commit()
+    return writer
@@ -0,0 +1,95 @@
+"""Incremental catalog sync.
+
+A persistent state file records, for every catalog entry, the source URL
+its image came from and the content hash of the stored blob. Each run
+diffs the products found on the live page against that state, so only
+added or changed products are downloaded and processed. A product whose
+URL is the same is revalidated with a conditional request: a body with the
+recorded hash (a 304 reuses the cached one) keeps the stored blob, and a new
+hash refetches it.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+
+from yume_tools.stream import write_atomic
+
+STATE_FILE = 'catalog-state.json'
+
+
+@dataclass
+class CatalogDiff:
+    """Names of live catalog entries grouped by what changed since the last sync."""
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    # Names in to_fetch whose download failed; filled in by the caller
+    failed: list = field(default_factory=list)
+
+    @property
+    def to_fetch(self):
+        """Names whose images must be downloaded."""
+        return set(self.added) | set(self.changed)
+
+    def summary(self):
+        summary = (f"{len(self.added)} added, {len(self.changed)} changed, "
+                   f"{len(self.removed)} removed, {len(self.unchanged)} unchanged")
+        return f"{summary}, {len(self.failed)} failed" if self.failed else summary
+
+
+def write_json_atomic(path, data, **kwargs):
+    """Dump data as JSON to path atomically (see stream.write_atomic)."""
+    write_atomic(path, json.dumps(data, **kwargs).encode('utf-8'))
+
+
+def load_state(path=STATE_FILE):
+    """Return the saved {name: {"src", "image", "sha256"}} state, or {} on first run."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    """Persist the sync state atomically."""
+    write_json_atomic(path, state, indent=2, sort_keys=True)
+
+
+def _digest(digests, src, revalidate):
+    """revalidate(src), asked once per URL however many entries share it."""
+    if src not in digests:
+        digests[src] = revalidate(src)
+    return digests[src]
+
+
+def diff_catalog(state, candidates, store, revalidate=None, refetch=False):
+    """Compare live (name, src) candidates with the saved state.
+
+    An entry is unchanged only if its source URL is the same, its blob is
+    still present in the store and, when revalidate is given, the URL still
+    serves the recorded content; anything else is refetched. revalidate(src)
+    returns the SHA-256 of the current body, or None if it could not be
+    checked. With refetch every known entry counts as changed, but removed
+    entries are still found against the state.
+    """
+    diff = CatalogDiff()
+    live_names = set()
+    digests = {}
+    for name, src in candidates:
+        if name in live_names:
+            continue
+        live_names.add(name)
+
+        entry = state.get(name)
+        if entry is None:
+            diff.added.append(name)
+        elif refetch or entry['src'] != src or not os.path.exists(store.path(entry['image'])):
+            diff.changed.append(name)
+        elif revalidate is not None and _digest(digests, src, revalidate) not in (None, entry['sha256']):
+            diff.changed.append(name)
+        else:
+            diff.unchanged.append(name)
+
+    diff.removed = sorted(set(state) - live_names)
+    return diff
@@ -0,0 +1,120 @@
+"""Structured timing trace for the scrape and download pipeline.
+
+When ``YUME_TRACE`` names a file, every HTTP fetch, WebDriver call, image
+decode/encode and file write appends one JSON line to it with its timings,
+byte count and status. The variable is inherited by subprocesses and
+process-pool workers, so one trace covers a whole run. With it unset,
+recording is a no-op.
+
+HTTP events carry ``connect`` (new connection setup, when one was made),
+``ttfb`` (request start to response headers) and ``transfer`` (headers to
+end of body) in seconds, plus ``duration`` for the whole step.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+TRACE_ENV = 'YUME_TRACE'
+
+_lock = threading.Lock()
+_handle = None
+_handle_key = None
+
+
+def enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+
+def configure(path):
+    """Start tracing to path in this process and any it starts."""
+    os.environ[TRACE_ENV] = os.path.abspath(path)
+
+
+def _output():
+    """Return the open trace file, reopening it after a fork or path change."""
+    global _handle, _handle_key
+    key = (os.getpid(), os.environ.get(TRACE_ENV))
+    if _handle_key != key:
+        _handle = open(key[1], 'a', buffering=1, encoding='utf-8')
+        _handle_key = key
+    return _handle
+
+
+def record(event, **fields):
+    """Append one event to the trace."""
+    if not enabled():
+        return
+    line = json.dumps({'ts': time.time(), 'pid': os.getpid(), 'event': event, **fields}, default=str)
+    with _lock:
+        _output().write(line + '\n')
+
+
+@contextmanager
+def span(event, **fields):
+    """Time a block and record it as one event.
+
+    Yields the event's field dict so the block can add details (status,
+    bytes, sub-step timings). Exceptions are recorded as ``error`` and
+    re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        fields.setdefault('error', f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        fields['duration'] = time.perf_counter() - start
+        record(event, **fields)
+
+
+def http_span(url, method='GET'):
+    """Span for one HTTP request, tagged with its URL and host."""
+    return span('http', method=method, url=url, host=urlsplit(url).netloc)
+
+
+class HttpTimer:
+    """Collect TTFB and transfer times for an http_span as a request progresses."""
+
+    def __init__(self, event):
+        self.event = event
+        self.start = time.perf_counter()
+        self.headers_at = None
+
+    def headers_received(self, status):
+        self.headers_at = time.perf_counter()
+        self.event['status'] = status
+        self.event['ttfb'] = self.headers_at - self.start
+
+    def body_received(self, size):
+        if self.headers_at is not None:
+            self.event['transfer'] = time.perf_counter() - self.headers_at
+        self.event['bytes'] = size
+
+
+def aiohttp_trace_configs():
+    """TraceConfigs that store connection setup time in the request's trace_request_ctx dict."""
+    if not enabled():
+        return []
+    import aiohttp
+
+    async def on_connection_create_start(session, context, params):
+        context.trace_request_ctx['connect_start'] = time.perf_counter()
+
+    async def on_connection_create_end(session, context, params):
+        timing = context.trace_request_ctx
+        timing['connect'] = time.perf_counter() - timing.pop('connect_start')
+
+    config = aiohttp.TraceConfig()
+    config.on_connection_create_start.append(on_connection_create_start)
+    config.on_connection_create_end.append(on_connection_create_end)
+    return [config]
+
+
+def load(path):
+    """Read every event from a trace file."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,27 @@
+"""Where outgoing requests go.
+
+Every fetch path passes its absolute URLs through resolve(). Normally they
+are returned unchanged. When ``YUME_STANDIN_URL`` points at a running
+stand-in server (see yume_tools.standin, used by the benchmarks), they are
+rewritten to it, so the scrapers can run without touching the network.
+"""
+import os
+from urllib.parse import urlsplit
+
+STANDIN_ENV = 'YUME_STANDIN_URL'
+
+
+def resolve(url):
+    """Rewrite an absolute URL to the stand-in when YUME_STANDIN_URL is set.
+
+    ``https://host/path?q`` becomes ``<standin>/host/path?q``; without the
+    variable, URLs are returned unchanged.
+    """
+    base = os.environ.get(STANDIN_ENV)
+    if not base:
+        return url
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+    rewritten = f"{base.rstrip('/')}/{parts.netloc}{parts.path or '/'}"
+    return f"{rewritten}?{parts.query}" if parts.query else rewritten